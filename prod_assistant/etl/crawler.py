@@ -0,0 +1,222 @@
+"""
+Catalog-wide crawl engine for BooksToScrapeScraper.
+
+Category listings, their paginated pages and book detail pages all go
+through one deduplicated URL frontier persisted in SQLite, so an
+interrupted crawl resumes where it stopped instead of starting over:
+
+    crawler = CatalogCrawler(BooksToScrapeScraper())
+    books = crawler.crawl(max_books_per_category=50)     # whole site, one run
+
+Pages are fetched concurrently through the scraper's AsyncFetcher (pooled
+connections, per-host limits, politeness token bucket).
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urldefrag
+
+from prod_assistant.etl.streaming_pipeline import iter_async
+
+
+def _normalize_url(url: str) -> str:
+    return urldefrag(url)[0]
+
+
+class CrawlState:
+    """SQLite frontier (url -> kind, category, status) plus the parsed book records."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            "url TEXT PRIMARY KEY, kind TEXT, category TEXT, status TEXT, attempts INTEGER, updated_at REAL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS books (url TEXT PRIMARY KEY, category TEXT, record TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+
+    def get_meta(self, key: str):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def reset(self):
+        with self._db:
+            self._db.execute("DELETE FROM frontier")
+            self._db.execute("DELETE FROM books")
+            self._db.execute("DELETE FROM meta")
+
+    def add(self, items):
+        """Insert (url, kind, category) items not seen before; returns the new ones."""
+        added = []
+        now = time.time()
+        with self._db:
+            for url, kind, category in items:
+                url = _normalize_url(url)
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO frontier VALUES (?, ?, ?, 'pending', 0, ?)", (url, kind, category, now)
+                )
+                if cursor.rowcount:
+                    added.append((url, kind, category))
+        return added
+
+    def pending(self, max_attempts: int = 3):
+        return self._db.execute(
+            "SELECT url, kind, category FROM frontier WHERE status = 'pending' "
+            "OR (status = 'failed' AND attempts < ?) ORDER BY kind DESC, rowid", (max_attempts,)
+        ).fetchall()
+
+    def count_details(self, category: str) -> int:
+        row = self._db.execute(
+            "SELECT COUNT(*) FROM frontier WHERE kind = 'detail' AND category = ?", (category,)
+        ).fetchone()
+        return row[0]
+
+    def mark(self, url: str, status: str):
+        with self._db:
+            self._db.execute(
+                "UPDATE frontier SET status = ?, attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (status, time.time(), url),
+            )
+
+    def store_book(self, url: str, category: str, record: dict):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO books VALUES (?, ?, ?)",
+                             (url, category, json.dumps(record, ensure_ascii=False)))
+            self._db.execute("UPDATE frontier SET status = 'done', attempts = attempts + 1, updated_at = ? "
+                             "WHERE url = ?", (time.time(), url))
+
+    def books(self):
+        return [json.loads(record) for (record,) in self._db.execute("SELECT record FROM books ORDER BY rowid")]
+
+    def counts(self) -> dict:
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall())
+
+
+class CatalogCrawler:
+    """Walk every category (or a chosen subset) of the catalog through a persisted frontier."""
+
+    def __init__(self, scraper, state_path: str | None = None, max_attempts: int = 3):
+        self.scraper = scraper
+        if state_path is None:
+            state_path = os.path.join(scraper.output_dir, "crawl_state.sqlite")
+        self.state = CrawlState(state_path)
+        self.max_attempts = max_attempts
+
+    async def _abegin(self, fetcher, categories, max_books_per_category, resume: bool):
+        """Continue an unfinished crawl with the same parameters, or reset and seed a new one."""
+        signature = json.dumps({"base_url": self.scraper.BASE_URL, "categories": categories,
+                                "max_books": max_books_per_category}, sort_keys=True)
+        unfinished = self.state.get_meta("signature") == signature and self.state.get_meta("finished") != "1"
+        if resume and unfinished:
+            counts = self.state.counts()
+            print(f"Resuming crawl: {counts.get('done', 0)} pages done, {counts.get('pending', 0)} pending.")
+            return
+        self.state.reset()
+        self.state.set_meta("signature", signature)
+
+        # Through the crawl's fetcher: a blocking request here would stall the event loop
+        index = await self.scraper._acategories(fetcher)
+        wanted = {name.lower() for name in categories} if categories else None
+        selected = [c for c in index if wanted is None or c["name"].lower() in wanted]
+        self.state.add((c["url"], "listing", c["name"]) for c in selected)
+
+    async def aiter_books(self, categories=None, max_books_per_category=None, resume=True, status_callback=None):
+        """
+        Async generator of book records as their detail pages are parsed. Listing
+        pages enqueue their books and next page; every URL is fetched at most once.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        progress = {"pages": 0, "books": 0}
+
+        async with self.scraper.fetcher() as fetcher:
+            await self._abegin(fetcher, categories, max_books_per_category, resume)
+            for item in self.state.pending(self.max_attempts):
+                queue.put_nowait(item)
+
+            async def handle(url, kind, category):
+                page = await self.scraper.aload_page(fetcher, url, kind, category)
+                if page is None:
+                    self.state.mark(url, "failed")
+                    return
+                if kind == "listing":
+                    book_urls, next_url = page
+                    if max_books_per_category:
+                        remaining = max_books_per_category - self.state.count_details(category)
+                        book_urls = book_urls[:max(remaining, 0)]
+                        if remaining - len(book_urls) <= 0:
+                            next_url = None
+                    items = [(u, "detail", category) for u in book_urls]
+                    if next_url:
+                        items.append((next_url, "listing", category))
+                    for item in self.state.add(items):
+                        queue.put_nowait(item)
+                    self.state.mark(url, "done")
+                else:
+                    book = page
+                    self.state.store_book(url, category, book)
+                    progress["books"] += 1
+                    await results.put(book)
+
+            async def worker():
+                while True:
+                    url, kind, category = await queue.get()
+                    try:
+                        await handle(url, kind, category)
+                    except Exception as e:
+                        print(f"❌ Error crawling {url}: {e}")
+                        self.state.mark(url, "failed")
+                    finally:
+                        progress["pages"] += 1
+                        if status_callback and progress["pages"] % 10 == 0:
+                            status_callback(f"🕸️ Crawled {progress['pages']} pages, {progress['books']} books, "
+                                            f"{queue.qsize()} queued...", None)
+                        queue.task_done()
+
+            async def close_when_drained():
+                await queue.join()
+                await results.put(None)
+
+            tasks = [asyncio.create_task(worker()) for _ in range(self.scraper.concurrency)]
+            tasks.append(asyncio.create_task(close_when_drained()))
+            try:
+                while (book := await results.get()) is not None:
+                    yield book
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not self.state.pending(self.max_attempts):
+            self.state.set_meta("finished", "1")
+
+    def iter_books(self, categories=None, max_books_per_category=None, resume=True, status_callback=None):
+        """Synchronous ``aiter_books``: yield book records while the crawl runs in the background."""
+        return iter_async(lambda: self.aiter_books(categories, max_books_per_category, resume, status_callback))
+
+    async def acrawl(self, categories=None, max_books_per_category=None, resume=True, status_callback=None):
+        async for _ in self.aiter_books(categories, max_books_per_category, resume, status_callback):
+            pass
+        return self.state.books()
+
+    def crawl(self, categories=None, max_books_per_category=None, resume=True, status_callback=None):
+        """
+        Crawl the catalog and return every book of this crawl, including those
+        fetched before an interruption.
+        """
+        books = asyncio.run(self.acrawl(categories, max_books_per_category, resume, status_callback))
+        counts = self.state.counts()
+        print(f"🕸️ Crawl finished: {len(books)} books, {counts.get('done', 0)} pages done, "
+              f"{counts.get('failed', 0)} failed.")
+        if self.scraper.http_cache is not None:
+            print(f"HTTP cache: {self.scraper.http_cache.stats()}")
+        return books
@@ -1,27 +1,56 @@
 import os
+import csv
+import sys
+import argparse
+import hashlib
+import time
 import pandas as pd
 from dotenv import load_dotenv
-from typing import List
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
 from langchain_core.documents import Document
-from langchain_astradb import AstraDBVectorStore
 from prod_assistant.utils.model_loader import ModelLoader
 from prod_assistant.utils.config_loader import load_config
+from prod_assistant.retriever.backends import lexical_index_path, load_vector_store, required_env_vars, vector_backend
+from prod_assistant.retriever.lexical import InvertedIndex
+from prod_assistant.utils.semantic_cache import bump_catalog_version
+from prod_assistant.etl.ingestion_state import IngestionState, content_hash, document_id
+from prod_assistant.etl.streaming_pipeline import StreamingPipeline
+from prod_assistant.etl.embedding_stage import EmbeddingStage
+from prod_assistant.etl.embedding_snapshot import EmbeddingSnapshot, snapshot_dir
+from prod_assistant.etl.dedup import ALIAS_FIELDS, NearDuplicateIndex, collapse_near_duplicates, merge_aliases
+from prod_assistant.etl.review_summaries import summarizer_from_config
+from prod_assistant.utils.embedding_cache import CachedEmbeddings
+from prod_assistant.utils.product_record import ProductRecord
+from prod_assistant.utils.context_cards import card_store_from_config, render_card
+
+EXPECTED_COLUMNS = {'product_id','product_title', 'rating', 'total_reviews','price', 'top_reviews'}
 
 class DataIngestion:
     """
-    Class to handle data transformation and ingestion into AstraDB vector store.
+    Class to handle data transformation and ingestion into the configured vector store
+    (AstraDB or the local index).
     """
 
-    def __init__(self):
+    def __init__(self, streaming: bool | None = None, require_csv: bool = True):
         """
         Initialize environment variables, embedding model, and set CSV file path.
+        In streaming mode (default: ingestion.mode == "streaming") the CSV is not
+        loaded up front; rows are read lazily by run_streaming(). Loading from an
+        embedding snapshot does not need the CSV (require_csv=False). With
+        ingestion.summaries enabled, an LLM review summary is generated per product.
         """
         print("Initializing DataIngestion pipeline...")
         self.model_loader=ModelLoader()
-        self._load_env_variables()
-        self.csv_path = self._get_csv_path()
-        self.product_data = self._load_csv()
         self.config=load_config()
+        self._load_env_variables()
+        self.csv_path = self._get_csv_path() if require_csv else None
+        if streaming is None:
+            streaming = self.config.get("ingestion", {}).get("mode", "batch") == "streaming"
+        self.streaming = streaming
+        self.product_data = None if streaming or not require_csv else self._load_csv()
+        self.card_store = card_store_from_config(self.config)
+        self.summarizer = summarizer_from_config(self.config, self.model_loader.load_llm)
 
     def _load_env_variables(self):
         """
@@ -29,7 +58,7 @@ class DataIngestion:
         """
         load_dotenv()
         
-        required_vars = ["GOOGLE_API_KEY", "ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
+        required_vars = required_env_vars(self.config)
         
         missing_vars = [var for var in required_vars if os.getenv(var) is None]
         if missing_vars:
@@ -58,72 +87,563 @@ class DataIngestion:
         """
         Load product data from CSV.
         """
-        df = pd.read_csv(self.csv_path)
-        expected_columns = {'product_id','product_title', 'rating', 'total_reviews','price', 'top_reviews'}
+        # Every cell as text, like the streaming reader: inferred ints would change the content hash
+        df = pd.read_csv(self.csv_path, dtype=str, keep_default_na=False)
 
-        if not expected_columns.issubset(set(df.columns)):
-            raise ValueError(f"CSV must contain columns: {expected_columns}")
+        if not EXPECTED_COLUMNS.issubset(set(df.columns)):
+            raise ValueError(f"CSV must contain columns: {EXPECTED_COLUMNS}")
         
-        # Replace NaN with None for JSON compliance
-        df = df.astype(object).where(pd.notnull(df), None)
+        # Empty cells -> None, as in _iter_csv_rows
+        df = df.astype(object).where(df != "", None)
 
         return df
 
+    def _iter_csv_rows(self) -> Iterator[dict]:
+        """
+        Stream CSV rows as plain dicts (empty cells -> None) without pandas.
+        """
+        csv.field_size_limit(sys.maxsize)
+        with open(self.csv_path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if not EXPECTED_COLUMNS.issubset(set(reader.fieldnames or [])):
+                raise ValueError(f"CSV must contain columns: {EXPECTED_COLUMNS}")
+            for row in reader:
+                yield {key: (value if value != "" else None) for key, value in row.items()}
+
+    @staticmethod
+    def _row_to_document(row: dict) -> Document:
+        """
+        Map one product row to a LangChain Document (reviews as content).
+        """
+        return ProductRecord.from_row(row).to_document()
+
     def transform_data(self):
         """
         Transform product data into list of LangChain Document objects.
         """
-        product_list = []
+        documents = [self._row_to_document(row) for row in self.product_data.to_dict("records")]
 
-        for _, row in self.product_data.iterrows():
-            product_entry = {
-                    "product_id": row["product_id"],
-                    "product_title": row["product_title"],
-                    "rating": row["rating"],
-                    "total_reviews": row["total_reviews"],
-                    "price": row["price"],
-                    "top_reviews": row["top_reviews"]
-                }
-            product_list.append(product_entry)
+        print(f"Transformed {len(documents)} documents.")
 
-        documents = []
-        for entry in product_list:
-            metadata = {
-                    "product_id": entry["product_id"],
-                    "product_title": entry["product_title"],
-                    "rating": entry["rating"],
-                    "total_reviews": entry["total_reviews"],
-                    "price": entry["price"]
-            }
-            doc = Document(page_content=entry["top_reviews"], metadata=metadata)
-            documents.append(doc)
+        dedup_cfg = self.config.get("ingestion", {}).get("dedup", {})
+        if dedup_cfg.get("enabled", False):
+            documents, duplicates = collapse_near_duplicates(
+                documents,
+                threshold=dedup_cfg.get("threshold", 0.8),
+                num_perm=dedup_cfg.get("num_perm", 128),
+                bands=dedup_cfg.get("bands", 16),
+            )
+            print(f"Collapsed {duplicates} near-duplicate products into their canonical records "
+                  f"({duplicates} embedding calls saved).")
 
-        print(f"Transformed {len(documents)} documents.")
+        # Local BM25 index over titles and reviews for hybrid retrieval
+        index_path = lexical_index_path(self.config)
+        InvertedIndex().add_documents(documents).save(index_path)
+        print(f"Lexical index written to {index_path}")
         return documents
 
-    def store_in_vector_db(self, documents: List[Document]):
+    def _ingestion_state(self):
+        ingestion_cfg = self.config.get("ingestion", {})
+        state_path = ingestion_cfg.get("state_path", os.path.join("data", "ingestion_state.sqlite"))
+        scope = f"{vector_backend(self.config)}:{self.config['astra_db']['collection_name']}"
+        return IngestionState(state_path, scope)
+
+    def _ingestion_embeddings(self):
+        """
+        Embeddings for ingestion, always behind CachedEmbeddings: the embed stage
+        primes the cache so the vector store's own add_documents call does not
+        embed the same texts again.
+        """
+        embeddings = self.model_loader.load_embeddings()
+        if not isinstance(embeddings, CachedEmbeddings):
+            embeddings = CachedEmbeddings(embeddings, self.config["embedding_model"]["model_name"])
+        return embeddings
+
+    def _resume_default(self, resume: bool | None) -> bool:
+        return self.config.get("ingestion", {}).get("resume", True) if resume is None else resume
+
+    def _embedding_snapshot(self, directory: str | None = None):
         """
-        Store documents into AstraDB vector store.
+        Snapshot of every embedded product (ingestion.snapshot), or None when disabled
+        and no explicit directory is given.
         """
-        collection_name=self.config["astra_db"]["collection_name"]
-        vstore = AstraDBVectorStore(
-            embedding= self.model_loader.load_embeddings(),
-            collection_name=collection_name,
-            api_endpoint=self.db_api_endpoint,
-            token=self.db_application_token,
-            namespace=self.db_keyspace,
+        snapshot_cfg = self.config.get("ingestion", {}).get("snapshot", {})
+        if directory is None:
+            if not snapshot_cfg.get("enabled", False):
+                return None
+            directory = snapshot_dir(snapshot_cfg.get("dir", os.path.join("data", "embedding_snapshot")),
+                                     self.config["embedding_model"]["model_name"])
+        return EmbeddingSnapshot(directory, self.config["embedding_model"]["model_name"])
+
+    @staticmethod
+    def _add_with_vectors(vstore, embeddings, documents: List[Document], vectors, ids: List[str]):
+        """
+        Write documents whose vectors are already known without embedding them again:
+        directly for stores that accept vectors, otherwise through the primed cache.
+        """
+        if hasattr(vstore, "add_embeddings"):
+            vstore.add_embeddings([doc.page_content for doc in documents], vectors,
+                                  [doc.metadata for doc in documents], ids)
+        else:
+            embeddings.prime([doc.page_content for doc in documents], vectors)
+            vstore.add_documents(documents, ids=ids)
+
+    @staticmethod
+    def _is_unchanged(product_id: str, digest: str, known: dict, snapshot_hashes: dict | None) -> bool:
+        # With a snapshot enabled, products missing from it are re-embedded once so it covers the catalog
+        if known.get(product_id) != digest:
+            return False
+        return snapshot_hashes is None or snapshot_hashes.get(product_id) == digest
+
+    def _write_cards(self, documents: Iterable[Document]):
+        """
+        Pre-render each product's token-budgeted prompt card (context_cards) into
+        the card store. Cards are cheap to render, so every ingested product gets
+        one, including products whose vectors were unchanged.
+        """
+        if self.card_store is None:
+            return
+        max_tokens = self.config.get("context_cards", {}).get("max_tokens", 200)
+        self.card_store.put_many(
+            (str(doc.metadata["product_id"]), render_card(ProductRecord.from_document(doc), max_tokens))
+            for doc in documents
         )
 
-        inserted_ids = vstore.add_documents(documents)
-        print(f"Successfully inserted {len(inserted_ids)} documents into AstraDB.")
+    def _finish_snapshot(self, snapshot, removed: List[str]):
+        if snapshot is None:
+            return
+        snapshot.remove(removed)
+        if snapshot.stale_ratio() > 0.5:
+            snapshot.compact()
+
+    @staticmethod
+    def _alias_changes(state, current: Dict[str, Optional[dict]]) -> Dict[str, Optional[dict]]:
+        """The products whose alias metadata differs from what the ingestion state holds."""
+        stored = state.aliases_for(current)
+        return {pid: metadata for pid, metadata in current.items() if metadata != stored.get(pid)}
+
+    def _rewrite_aliases(self, changes: Dict[str, Optional[dict]], vstore, embeddings, state, **upsert_kwargs) -> int:
+        """
+        Give stored canonical products the alias metadata in ``changes`` (None: no
+        aliases) and record it. Streaming ingestion writes a canonical product
+        before it has seen its duplicates, so its aliases are settled afterwards;
+        the content is unchanged, so its vector usually comes from the embedding cache.
+        """
+        documents = []
+        for doc in vstore.get_by_ids([document_id(pid) for pid in changes]):
+            metadata = {key: value for key, value in doc.metadata.items() if key not in ALIAS_FIELDS}
+            metadata.update(changes.get(str(metadata["product_id"])) or {})
+            if metadata != doc.metadata:
+                documents.append(Document(page_content=doc.page_content, metadata=metadata))
+        for doc in documents:
+            doc.metadata["_content_hash"] = content_hash(doc)
+        self._upsert(documents, vstore, embeddings, state, **upsert_kwargs)
+        self._write_cards(documents)
+        state.record_aliases(changes)
+        return len(documents)
+
+    def _upsert(self, documents: Iterable[Document], vstore, embeddings, state, on_write=None, snapshot=None,
+                run_id: str | None = None, batch_size: int | None = None, checkpoint=None):
+        """
+        Embed and write documents in batches. Each document carries its content
+        hash in metadata["_content_hash"] and its input position in
+        metadata["_offset"]; both are recorded in the ingestion state (the hash
+        also in the embedding snapshot) once its batch is written, which
+        checkpoints ``run_id`` at the batch's last offset. Embedding
+        runs up to ingestion.embedding.max_concurrency batches at once under a
+        shared requests-per-minute budget, overlapping with inserts of earlier batches.
+
+        ``checkpoint()`` is for writes that only become durable later (a local
+        store with autopersist off, the lexical index): the ingestion state is
+        then recorded only after checkpoint() has run, at most every
+        ingestion.checkpoint_seconds and once at the end, so a crashed run never
+        marks rows as stored that were not saved.
+        """
+        ingestion_cfg = self.config.get("ingestion", {})
+        embedding_cfg = ingestion_cfg.get("embedding", {})
+        stage = EmbeddingStage(
+            embeddings,
+            requests_per_minute=embedding_cfg.get("requests_per_minute"),
+            max_retries=embedding_cfg.get("max_retries", 5),
+        )
+
+        checkpoint_seconds = ingestion_cfg.get("checkpoint_seconds", 30)
+        unrecorded = []
+        last_checkpoint = time.monotonic()
+
+        def record_durable():
+            nonlocal last_checkpoint
+            checkpoint()
+            for rows, end_offset in unrecorded:
+                state.record(rows, run_id=run_id, end_offset=end_offset)
+            unrecorded.clear()
+            last_checkpoint = time.monotonic()
+
+        def write(batch, vectors):
+            rows = []
+            end_offset = -1
+            for doc in batch:
+                product_id = str(doc.metadata["product_id"])
+                rows.append((product_id, document_id(product_id), doc.metadata.pop("_content_hash")))
+                end_offset = max(end_offset, doc.metadata.pop("_offset", -1))
+            ids = [doc_id for _, doc_id, _ in rows]
+            self._add_with_vectors(vstore, embeddings, batch, vectors, ids)
+            if snapshot is not None:
+                snapshot.append(batch, vectors, ids, [digest for _, _, digest in rows])
+            if on_write is not None:
+                on_write(batch)
+            if checkpoint is None:
+                state.record(rows, run_id=run_id, end_offset=end_offset)
+                return
+            unrecorded.append((rows, end_offset))
+            if time.monotonic() - last_checkpoint >= checkpoint_seconds:
+                record_durable()
+
+        pipeline = StreamingPipeline(
+            stage, write,
+            batch_size=batch_size or ingestion_cfg.get("batch_size", 64),
+            queue_size=ingestion_cfg.get("queue_size", 4),
+            max_concurrency=embedding_cfg.get("max_concurrency", 4),
+        )
+        stats = pipeline.run(documents)
+        if checkpoint is not None:
+            record_durable()
+        return stats
+
+    def store_in_vector_db(self, documents: List[Document], prune: bool | None = None,
+                           resume: bool | None = None):
+        """
+        Incrementally store documents into the configured vector store.
+
+        Each product is written under a stable document id derived from its
+        product_id, and only when its content hash differs from the last run.
+        With ``prune`` (default: ingestion.prune_deleted), products that are
+        no longer in the input are deleted from the store. With ``resume``
+        (default: ingestion.resume), an interrupted run over the same input
+        continues after its last committed batch.
+        """
+        embeddings = self._ingestion_embeddings()
+        vstore = load_vector_store(self.config, embeddings)
+        # A local store is saved at checkpoints and once at the end, not after every batch
+        autopersist = getattr(vstore, "autopersist", None)
+        if autopersist:
+            vstore.autopersist = False
+        state = self._ingestion_state()
+        known = state.hashes()
+        snapshot = self._embedding_snapshot()
+        snapshot_hashes = snapshot.hashes() if snapshot is not None else None
+        if prune is None:
+            prune = self.config.get("ingestion", {}).get("prune_deleted", False)
+
+        # Last occurrence of a product_id wins
+        latest = {str(doc.metadata["product_id"]): doc for doc in documents}
+        if self.summarizer is not None:
+            # Before hashing: a product's summary is stored with it, so a new summary is an update
+            self.summarizer.summarize(latest.values())
+        digests = {product_id: content_hash(doc) for product_id, doc in latest.items()}
+        # Recorded so streaming runs hash canonical products with the same aliases
+        alias_changes = self._alias_changes(state, {
+            product_id: {field: doc.metadata[field] for field in ALIAS_FIELDS} if "aliases" in doc.metadata else None
+            for product_id, doc in latest.items()
+        })
+        source = hashlib.sha1("".join(f"{pid}:{h}\n" for pid, h in digests.items()).encode("utf-8")).hexdigest()
+        run_id, resume_after = state.begin_run(f"documents:{source}", self._resume_default(resume))
+        if resume_after >= 0:
+            print(f"Resuming ingestion run {run_id} after offset {resume_after}")
+
+        changed = []
+        for offset, (product_id, doc) in enumerate(latest.items()):
+            digest = digests[product_id]
+            if offset <= resume_after or self._is_unchanged(product_id, digest, known, snapshot_hashes):
+                continue
+            doc.metadata["_content_hash"] = digest
+            doc.metadata["_offset"] = offset
+            changed.append(doc)
+
+        inserted_ids = [document_id(doc.metadata["product_id"]) for doc in changed]
+        self._write_cards(latest.values())
+        stats = self._upsert(changed, vstore, embeddings, state, snapshot=snapshot, run_id=run_id,
+                             checkpoint=vstore.persist if autopersist else None)
+
+        removed = [pid for pid in known if pid not in latest] if prune else []
+        if removed:
+            vstore.delete([document_id(pid) for pid in removed])
+            if autopersist:
+                vstore.persist()
+            state.remove(removed)
+            if self.card_store is not None:
+                self.card_store.remove(removed)
+        self._finish_snapshot(snapshot, removed)
+        if autopersist:
+            vstore.autopersist = True
+        state.record_aliases(alias_changes)
+        state.finish_run(run_id)
+
+        print(
+            f"Upserted {len(inserted_ids)} changed documents, skipped {len(latest) - len(changed)} unchanged, "
+            f"removed {len(removed)} into {vector_backend(self.config)} vector store "
+            f"({stats.rows_per_sec:.1f} rows/sec)."
+        )
+
+        # New products invalidate cached chat answers
+        if inserted_ids or removed:
+            bump_catalog_version()
         return vstore, inserted_ids
 
-    def run_pipeline(self):
+    def run_streaming(self, resume: bool | None = None):
+        """
+        Stream the CSV through reader -> embed -> upsert stages with bounded
+        queues. Only rows whose content hash changed are embedded and written.
+        Peak memory depends on batch_size * queue_size, not on the catalog size:
+        stored hashes are looked up per batch in the ingestion state, the rows
+        read are recorded there for pruning, and near-duplicate signatures and
+        aliases are kept in a temporary SQLite file. What still grows with the
+        catalog is the lexical index (when hybrid retrieval is on) and the local
+        vector store itself, which keep every product in memory by design.
+
+        Near-duplicates (ingestion.dedup) are collapsed into the first product of
+        their cluster as in batch mode. That product may be written before its
+        duplicates are read, so products whose aliases changed are re-written at
+        the end of the run.
+
+        With ``resume`` (default: ingestion.resume), an interrupted run over the
+        same CSV file skips straight past its last committed row; those rows are
+        only re-added to the lexical index, which is saved at the end of a run.
+        """
+        csv_stat = os.stat(self.csv_path)
+        source = f"csv:{os.path.abspath(self.csv_path)}:{csv_stat.st_size}:{csv_stat.st_mtime_ns}"
+        return self._stream_rows(
+            self._iter_csv_rows(), source, self._resume_default(resume),
+            prune=self.config.get("ingestion", {}).get("prune_deleted", False),
+        )
+
+    def ingest_stream(self, rows: Iterable[dict], status_callback=None):
+        """
+        Ingest product rows as they are produced, e.g. a live scrape:
+
+            rows = map(scraper.to_product_row, scraper.iter_category("Travel", max_books=50))
+            DataIngestion(streaming=True, require_csv=False).ingest_stream(rows)
+
+        Rows are embedded and written in batches of ingestion.stream_batch_size
+        while later rows are still being scraped; no CSV is written or read.
+        The input is usually a partial catalog, so nothing is pruned, stored
+        aliases are only added to, and a re-run skips rows already stored
+        unchanged instead of resuming by offset. ``status_callback(message)`` is
+        called after each written batch.
+        """
+        return self._stream_rows(
+            rows, "stream", resume=False, prune=False, partial=True,
+            batch_size=self.config.get("ingestion", {}).get("stream_batch_size", 16),
+            status_callback=status_callback,
+        )
+
+    def _stream_rows(self, rows: Iterable[dict], source: str, resume: bool, prune: bool,
+                     batch_size: int | None = None, status_callback=None, partial: bool = False):
+        ingestion_cfg = self.config.get("ingestion", {})
+        embeddings = self._ingestion_embeddings()
+        vstore = load_vector_store(self.config, embeddings)
+        autopersist = getattr(vstore, "autopersist", None)
+        if autopersist:
+            vstore.autopersist = False
+
+        state = self._ingestion_state()
+        snapshot = self._embedding_snapshot()
+        if snapshot is not None:
+            state.load_snapshot_hashes(snapshot.iter_hashes())
+        lookup_size = batch_size or ingestion_cfg.get("batch_size", 64)
+        read = 0
+        hybrid = self.config.get("retriever", {}).get("hybrid", {}).get("enabled", False)
+        index_path = lexical_index_path(self.config)
+        lexical_index = None
+        if hybrid:
+            lexical_index = InvertedIndex.load(index_path) if os.path.exists(index_path) else InvertedIndex()
+
+        dedup_cfg = ingestion_cfg.get("dedup", {})
+        dedup_index = None
+        if dedup_cfg.get("enabled", False):
+            dedup_index = NearDuplicateIndex(
+                threshold=dedup_cfg.get("threshold", 0.8),
+                num_perm=dedup_cfg.get("num_perm", 128),
+                bands=dedup_cfg.get("bands", 16),
+                on_disk=True,
+            )
+        duplicates = 0
+        # Canonical products read with stored aliases (a small share of the catalog)
+        had_aliases = set()
+
+        run_id, resume_after = state.begin_run(source, resume)
+        if resume_after >= 0:
+            print(f"Resuming ingestion run {run_id} after row {resume_after}")
+
+        documents = (self._row_to_document(row) for row in rows)
+        if self.summarizer is not None:
+            documents = self.summarizer.iter_summarized(documents)
+
+        def changed_documents():
+            nonlocal duplicates, read
+            rows_read = enumerate(documents)
+            # Hashes are looked up a batch at a time rather than loading the whole manifest
+            while chunk := list(islice(rows_read, lookup_size)):
+                kept = []
+                for offset, doc in chunk:
+                    product_id = str(doc.metadata["product_id"])
+                    if dedup_index is not None:
+                        canonical = dedup_index.add(product_id, doc.metadata["product_title"], doc.page_content)
+                        if canonical is not None and canonical != product_id:
+                            # The canonical row may already be written: its aliases are settled after the run
+                            dedup_index.record_alias(canonical, product_id, doc.metadata["product_title"])
+                            duplicates += 1
+                            continue
+                    kept.append((offset, product_id, doc))
+                read += len(kept)
+                # Hash canonical products with the aliases they were stored with, as batch mode would
+                stored_aliases = state.aliases_for(product_id for _, product_id, _ in kept)
+                had_aliases.update(stored_aliases)
+                if dedup_index is not None:
+                    for _, product_id, doc in kept:
+                        doc.metadata.update(stored_aliases.get(product_id, {}))
+                if prune:
+                    state.mark_seen(run_id, [product_id for _, product_id, _ in kept])
+                if self.card_store is not None:
+                    self._write_cards(doc for _, _, doc in kept)
+
+                fresh = [(offset, product_id, doc) for offset, product_id, doc in kept if offset > resume_after]
+                if lexical_index is not None:
+                    for offset, product_id, doc in kept:
+                        if offset <= resume_after:
+                            lexical_index.add(product_id, doc.page_content, doc.metadata)
+                product_ids = [product_id for _, product_id, _ in fresh]
+                known = state.hashes_for(product_ids)
+                snapshot_hashes = state.snapshot_hashes_for(product_ids) if snapshot is not None else None
+                for offset, product_id, doc in fresh:
+                    digest = content_hash(doc)
+                    if self._is_unchanged(product_id, digest, known, snapshot_hashes):
+                        continue
+                    known[product_id] = digest
+                    doc.metadata["_content_hash"] = digest
+                    doc.metadata["_offset"] = offset
+                    yield doc
+
+        written = 0
+
+        def on_write(batch):
+            nonlocal written
+            if lexical_index is not None:
+                for doc in batch:
+                    lexical_index.add(str(doc.metadata["product_id"]), doc.page_content, doc.metadata)
+            written += len(batch)
+            if status_callback:
+                status_callback(f"🧠 Stored {written} products ({read} read)...")
+
+        def checkpoint():
+            # Written batches count as stored only once the local store and lexical index are on disk
+            if autopersist:
+                vstore.persist()
+            if lexical_index is not None:
+                lexical_index.save(index_path)
+
+        upsert_kwargs = dict(on_write=on_write, snapshot=snapshot, batch_size=batch_size,
+                             checkpoint=checkpoint if autopersist or lexical_index is not None else None)
+        stats = self._upsert(changed_documents(), vstore, embeddings, state, run_id=run_id, **upsert_kwargs)
+
+        realiased = 0
+        if dedup_index is not None or had_aliases:
+            current = dict(dedup_index.aliases()) if dedup_index is not None else {}
+            if partial and dedup_index is not None:
+                # The duplicates of a stored product may just not be in this stream
+                stored = state.aliases_for(set(current) | had_aliases)
+                current = {pid: merge_aliases(stored.get(pid), current.get(pid)) for pid in set(current) | set(stored)}
+            alias_changes = self._alias_changes(state, {pid: current.get(pid) for pid in set(current) | had_aliases})
+            realiased = self._rewrite_aliases(alias_changes, vstore, embeddings, state, **upsert_kwargs)
+        if dedup_index is not None:
+            dedup_index.close()
+
+        removed = state.unseen(run_id) if prune else []
+        if removed:
+            vstore.delete([document_id(pid) for pid in removed])
+            state.remove(removed)
+            if self.card_store is not None:
+                self.card_store.remove(removed)
+            if lexical_index is not None:
+                for pid in removed:
+                    lexical_index.remove(pid)
+        self._finish_snapshot(snapshot, removed)
+
+        if autopersist:
+            vstore.persist()
+            vstore.autopersist = True
+        if lexical_index is not None:
+            lexical_index.save(index_path)
+        state.finish_run(run_id)
+        if stats.rows or removed or realiased:
+            bump_catalog_version()
+
+        print(f"Streaming ingestion done: {stats.rows} rows upserted, {len(removed)} removed, "
+              f"{duplicates} near-duplicates collapsed ({realiased} canonical products re-aliased), "
+              f"{stats.rows_per_sec:.1f} rows/sec.")
+        if self.summarizer is not None:
+            summary_stats = self.summarizer.stats()
+            print(f"Review summaries: {summary_stats['generated']} generated, {summary_stats['cached']} cached, "
+                  f"{summary_stats['failed']} failed.")
+        return vstore, stats
+
+    def load_from_snapshot(self, directory: str | None = None):
+        """
+        Bulk-load the configured vector store from an embedding snapshot with zero
+        embedding API calls, e.g. after renaming the collection, switching backends
+        or restoring AstraDB. The ingestion state and lexical index are rebuilt to match.
+        """
+        if directory is None:
+            snapshot_cfg = self.config.get("ingestion", {}).get("snapshot", {})
+            directory = snapshot_dir(snapshot_cfg.get("dir", os.path.join("data", "embedding_snapshot")),
+                                     self.config["embedding_model"]["model_name"])
+        snapshot = self._embedding_snapshot(directory)
+        if not snapshot.exists():
+            raise FileNotFoundError(f"No embedding snapshot found at: {directory}")
+
+        embeddings = self._ingestion_embeddings()
+        vstore = load_vector_store(self.config, embeddings)
+        autopersist = getattr(vstore, "autopersist", None)
+        if autopersist:
+            vstore.autopersist = False
+        state = self._ingestion_state()
+        hybrid = self.config.get("retriever", {}).get("hybrid", {}).get("enabled", False)
+        lexical_index = InvertedIndex() if hybrid else None
+        misses_before = embeddings.stats()["misses"]
+
+        rows = 0
+        batch_size = self.config.get("ingestion", {}).get("batch_size", 64)
+        for documents, vectors, ids, hashes in snapshot.iter_batches(batch_size):
+            self._add_with_vectors(vstore, embeddings, documents, vectors, ids)
+            self._write_cards(documents)
+            product_ids = [str(doc.metadata["product_id"]) for doc in documents]
+            state.record(zip(product_ids, ids, hashes))
+            if lexical_index is not None:
+                for product_id, doc in zip(product_ids, documents):
+                    lexical_index.add(product_id, doc.page_content, doc.metadata)
+            rows += len(documents)
+
+        if autopersist:
+            vstore.persist()
+            vstore.autopersist = True
+        if lexical_index is not None:
+            lexical_index.save(lexical_index_path(self.config))
+        if rows:
+            bump_catalog_version()
+
+        print(f"Loaded {rows} products from snapshot {directory} into {vector_backend(self.config)} vector store "
+              f"({embeddings.stats()['misses'] - misses_before} texts embedded).")
+        return vstore, rows
+
+    def run_pipeline(self, resume: bool | None = None):
         """
         Run the full data ingestion pipeline: transform data and store into vector DB.
         """
-        documents = self.transform_data()
-        vstore, _ = self.store_in_vector_db(documents)
+        if self.streaming:
+            vstore, _ = self.run_streaming(resume=resume)
+        else:
+            documents = self.transform_data()
+            vstore, _ = self.store_in_vector_db(documents, resume=resume)
 
         #Optionally do a quick search
         query = "Can you tell me the low budget iphone?"
@@ -135,5 +655,20 @@ class DataIngestion:
 
 # Run if this file is executed directly
 if __name__ == "__main__":
-    ingestion = DataIngestion()
-    ingestion.run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ingest product reviews into the vector store.")
+    parser.add_argument("--mode", choices=["batch", "streaming"], help="override ingestion.mode")
+    parser.add_argument("--from-snapshot", nargs="?", const="", metavar="DIR",
+                        help="load vectors from an embedding snapshot instead of embedding the CSV "
+                             "(default DIR: ingestion.snapshot.dir/<model>)")
+    run_group = parser.add_mutually_exclusive_group()
+    run_group.add_argument("--resume", dest="resume", action="store_true", default=None,
+                           help="continue an interrupted run after its last committed batch (default: ingestion.resume)")
+    run_group.add_argument("--restart", dest="resume", action="store_false",
+                           help="abandon any interrupted run and start from the first row")
+    args = parser.parse_args()
+
+    if args.from_snapshot is not None:
+        DataIngestion(streaming=True, require_csv=False).load_from_snapshot(args.from_snapshot or None)
+    else:
+        streaming = None if args.mode is None else args.mode == "streaming"
+        DataIngestion(streaming=streaming).run_pipeline(resume=args.resume)
\ No newline at end of file
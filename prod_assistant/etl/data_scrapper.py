@@ -1,10 +1,87 @@
+import asyncio
+import csv
+import logging
+import httpx
 import requests
-from bs4 import BeautifulSoup
 import json
-import time
 import re
 import os
-from urllib.parse import urljoin
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlsplit
+from prod_assistant.utils.config_loader import load_config
+from prod_assistant.etl.html_parsers import parse_html
+from prod_assistant.etl.http_cache import HttpCache
+from prod_assistant.etl.streaming_pipeline import iter_async
+from prod_assistant.utils.product_record import ProductRecord
+from prod_assistant.utils.rate_limit import TokenBucket, aretry_with_backoff, retry_with_backoff
+
+HEADERS = {"User-Agent": "BooksBot/1.0 (Educational Scraper)"}
+
+# httpx logs every request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def decode_html(content, content_type):
+    """Page text using the charset from Content-Type, UTF-8 otherwise (requests would assume Latin-1)."""
+    match = re.search(r"charset=([\w-]+)", content_type or "", re.IGNORECASE)
+    try:
+        return content.decode(match.group(1) if match else "utf-8", errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
+
+
+class AsyncFetcher:
+    """
+    Pooled httpx client for concurrent crawling: keep-alive connections, at most
+    ``per_host_limit`` requests in flight per host, and a shared politeness
+    token bucket instead of a fixed sleep between requests.
+    """
+
+    def __init__(self, concurrency=16, per_host_limit=8, bucket=None, timeout=15, max_retries=3):
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.bucket = bucket
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._host_limits = {}
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    async def _get(self, url, headers=None):
+        response = await self._client.get(url, headers=headers)
+        if response.status_code != 304:  # a conditional GET hit; httpx treats it as a redirect
+            response.raise_for_status()
+        return response
+
+    async def get(self, url, headers=None):
+        """Fetch a URL; None (after retries on 429/5xx) if it cannot be fetched."""
+        host = urlsplit(url).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with limit:
+            try:
+                return await aretry_with_backoff(self._get, url, headers, max_retries=self.max_retries,
+                                                 bucket=self.bucket)
+            except Exception as e:
+                print(f"❌ Error fetching {url}: {e}")
+                return None
+
+    async def get_text(self, url):
+        response = await self.get(url)
+        return decode_html(response.content, response.headers.get("content-type")) if response is not None else None
+
 
 class BooksToScrapeScraper:
     """Scraper for books.toscrape.com - a friendly educational scraping sandbox."""
@@ -16,32 +93,219 @@ class BooksToScrapeScraper:
         "One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5
     }
 
-    def __init__(self, output_dir="data"):
+    def __init__(self, output_dir="data", base_url=None, config=None):
+        """
+        ``base_url`` points the scraper at a mirror (e.g. a local server with saved
+        pages); crawl settings come from the ``scraper`` block of config.yaml.
+        """
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/") + "/"
+            self.CATALOGUE_URL = self.BASE_URL + "catalogue/"
 
-    def get_soup(self, url):
-        """Fetch a page and return a BeautifulSoup object."""
-        headers = {"User-Agent": "BooksBot/1.0 (Educational Scraper)"}
+        scraper_cfg = (config if config is not None else load_config()).get("scraper", {})
+        self.concurrent = scraper_cfg.get("concurrent", True)
+        self.concurrency = scraper_cfg.get("concurrency", 16)
+        self.per_host_limit = scraper_cfg.get("per_host_limit", 8)
+        self.timeout = scraper_cfg.get("timeout", 15)
+        self.max_retries = scraper_cfg.get("max_retries", 3)
+        requests_per_second = scraper_cfg.get("requests_per_second", 10)
+        self.bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        self.category_cache_path = scraper_cfg.get("category_cache_path", os.path.join("data", "cache", "categories.json"))
+        self.category_cache_ttl = scraper_cfg.get("category_cache_ttl", 86400)
+        self.parser = scraper_cfg.get("parser", "lxml")
+        self.parse_workers = scraper_cfg.get("parse_workers", 0)
+        self._parse_pool = None
+        http_cache_cfg = scraper_cfg.get("http_cache", {})
+        self.http_cache = None
+        if http_cache_cfg.get("enabled", False):
+            self.http_cache = HttpCache(
+                http_cache_cfg.get("dir", os.path.join("data", "cache", "http")),
+                freshness_seconds=http_cache_cfg.get("freshness_seconds", 3600),
+                max_age_seconds=http_cache_cfg.get("max_age_seconds"),
+                max_entries=http_cache_cfg.get("max_entries"),
+            )
+
+        # Keep-alive connection pool for the sequential code path
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+
+    def _fetch(self, url, headers=None):
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def _cached(self, url):
+        """(cache entry or None, whether it is fresh enough to skip the request)."""
+        entry = self.http_cache.lookup(url) if self.http_cache is not None else None
+        return entry, entry is not None and self.http_cache.is_fresh(entry)
+
+    def _accept(self, url, entry, response):
+        """(html, changed) from a response, consulting the HTTP cache; (None, False) if it failed."""
+        if response is None:
+            # Serve the stale copy if the site is unreachable
+            return (entry.text, False) if entry is not None else (None, False)
+        if response.status_code == 304 and entry is not None:
+            self.http_cache.touch(url)
+            return entry.text, False
+        html = decode_html(response.content, response.headers.get("content-type"))
+        if self.http_cache is None:
+            return html, True
+        return html, self.http_cache.store(url, response.headers, html)
+
+    def fetch_page(self, url):
+        """Page HTML and whether it changed since the cached copy (always True without a cache)."""
+        entry, fresh = self._cached(url)
+        if fresh:
+            return entry.text, False
         try:
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
+            response = retry_with_backoff(self._fetch, url, HttpCache.conditional_headers(entry),
+                                          max_retries=self.max_retries, bucket=self.bucket)
         except Exception as e:
             print(f"❌ Error fetching {url}: {e}")
+            response = None
+        return self._accept(url, entry, response)
+
+    async def afetch_page(self, fetcher, url):
+        entry, fresh = self._cached(url)
+        if fresh:
+            return entry.text, False
+        response = await fetcher.get(url, HttpCache.conditional_headers(entry))
+        return self._accept(url, entry, response)
+
+    def get_soup(self, url):
+        """Fetch a page and return a BeautifulSoup object."""
+        html, _ = self.fetch_page(url)
+        return self.make_soup(html) if html is not None else None
+
+    def make_soup(self, html):
+        return parse_html(html, self.parser)
+
+    def fetcher(self):
+        """Async fetcher configured like this scraper; use as ``async with scraper.fetcher() as f``."""
+        return AsyncFetcher(self.concurrency, self.per_host_limit, self.bucket, self.timeout, self.max_retries)
+
+    async def aget_soup(self, fetcher, url):
+        html, _ = await self.afetch_page(fetcher, url)
+        return self.make_soup(html) if html is not None else None
+
+    # ---------- Page loading (fetch + parse, cached) ----------
+    def _reuse_parsed(self, url, kind, changed, category):
+        """Parse result cached for an unchanged page, or None."""
+        if changed or self.http_cache is None:
             return None
+        cached = self.http_cache.get_parsed(url, kind)
+        if cached is not None:
+            if kind == "listing":
+                return tuple(cached)
+            if kind == "detail":
+                cached["category"] = category
+        return cached
+
+    def _remember_parsed(self, url, kind, value):
+        if self.http_cache is not None and value is not None:
+            self.http_cache.set_parsed(url, kind, value)
+        return value
+
+    def parse_page(self, url, kind, html, changed=True, category="Unknown"):
+        """
+        Parse a "categories", "listing" or "detail" page. Unchanged pages reuse
+        the parse result stored in the HTTP cache instead of being parsed again.
+        """
+        cached = self._reuse_parsed(url, kind, changed, category)
+        if cached is not None:
+            return cached
+
+        soup = self.make_soup(html)
+        if kind == "categories":
+            value = self.parse_categories(soup)
+        elif kind == "listing":
+            value = self.parse_listing(soup, url)
+        else:
+            value = self.parse_book_detail(soup, url, category)
+        return self._remember_parsed(url, kind, value)
 
-    def get_categories(self):
-        """Scrape all category names and URLs from the sidebar."""
-        soup = self.get_soup(self.BASE_URL)
-        if not soup:
+    def parse_pool(self):
+        """Process pool for detail-page parsing (scraper.parse_workers > 0), created on first use."""
+        if self._parse_pool is None and self.parse_workers:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self._parse_pool
+
+    def close(self):
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        self.session.close()
+
+    async def aparse_page(self, url, kind, html, changed=True, category="Unknown"):
+        """
+        Like ``parse_page``, but with a parse pool detail pages are parsed in
+        worker processes so the event loop keeps fetching meanwhile.
+        """
+        pool = self.parse_pool() if kind == "detail" else None
+        if pool is None:
+            return self.parse_page(url, kind, html, changed, category)
+        cached = self._reuse_parsed(url, kind, changed, category)
+        if cached is not None:
+            return cached
+        value = await asyncio.get_running_loop().run_in_executor(
+            pool, _parse_detail_page, html, url, category, self.parser
+        )
+        return self._remember_parsed(url, kind, value)
+
+    def load_page(self, url, kind, category="Unknown"):
+        html, changed = self.fetch_page(url)
+        return self.parse_page(url, kind, html, changed, category) if html is not None else None
+
+    async def aload_page(self, fetcher, url, kind, category="Unknown"):
+        html, changed = await self.afetch_page(fetcher, url)
+        return await self.aparse_page(url, kind, html, changed, category) if html is not None else None
+
+    def get_categories(self, refresh=False):
+        """
+        Scrape all category names and URLs from the sidebar. The index is cached
+        on disk for ``scraper.category_cache_ttl`` seconds (per base URL).
+        """
+        if not refresh:
+            cached = self._cached_categories()
+            if cached:
+                return cached
+
+        categories = self.load_page(self.BASE_URL, "categories")
+        if not categories:
             return []
-            
+        self._cache_categories(categories)
+        return categories
+
+    def _cached_categories(self):
+        if not self.category_cache_path or not os.path.exists(self.category_cache_path):
+            return None
+        try:
+            with open(self.category_cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if cached.get("base_url") != self.BASE_URL or time.time() - cached.get("fetched_at", 0) > self.category_cache_ttl:
+            return None
+        return cached["categories"]
+
+    def _cache_categories(self, categories):
+        if not self.category_cache_path or not categories:
+            return
+        os.makedirs(os.path.dirname(self.category_cache_path) or ".", exist_ok=True)
+        tmp = self.category_cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"base_url": self.BASE_URL, "fetched_at": time.time(), "categories": categories}, f)
+        os.replace(tmp, self.category_cache_path)
+
+    def parse_categories(self, soup):
+        """Category names and URLs from the homepage sidebar."""
         sidebar = soup.select_one(".side_categories ul li ul")
         categories = []
         if sidebar:
             for li in sidebar.select("li"):
-                a = li.find("a")
+                a = li.select_one("a")
                 if a:
                     name = a.text.strip()
                     href = a["href"]
@@ -52,10 +316,11 @@ class BooksToScrapeScraper:
 
     def scrape_book_detail(self, book_url, category="Unknown"):
         """Scrape full details from a single book's detail page."""
-        soup = self.get_soup(book_url)
-        if not soup:
-            return None
-        
+        return self.load_page(book_url, "detail", category)
+
+    @classmethod
+    def parse_book_detail(cls, soup, book_url, category="Unknown"):
+        """Extract book fields from a parsed detail page."""
         try:
             # Title
             title = soup.select_one(".product_main h1").text.strip()
@@ -72,7 +337,7 @@ class BooksToScrapeScraper:
             # Star Rating
             star_tag = soup.select_one(".product_main .star-rating")
             rating_class = star_tag["class"][1] if star_tag else "Zero"
-            rating = self.RATING_MAP.get(rating_class, 0)
+            rating = cls.RATING_MAP.get(rating_class, 0)
             
             # Description
             desc_tag = soup.select_one("#product_description ~ p")
@@ -117,44 +382,94 @@ class BooksToScrapeScraper:
             print(f"Error parsing book {book_url}: {e}")
             return None
 
+    def parse_listing(self, soup, page_url):
+        """Book URLs on one listing page and the URL of the next page (or None)."""
+        book_urls = []
+        articles = soup.select("article.product_pod")
+        
+        for article in articles:
+            link = article.select_one("h3 a")
+            if link:
+                href = link["href"]
+                abs_url = urljoin(page_url, href)
+                book_urls.append(abs_url)
+
+        # Check for next page
+        next_btn = soup.select_one(".pager .next a")
+        next_url = urljoin(page_url, next_btn["href"]) if next_btn else None
+        return book_urls, next_url
+
     def scrape_category_books(self, category_url, max_books=None):
         """Scrape book URLs from a category (handles pagination)."""
         book_urls = []
         current_url = category_url
         
         while current_url:
-            soup = self.get_soup(current_url)
-            if not soup:
+            listing = self.load_page(current_url, "listing")
+            if not listing:
                 break
-                
-            articles = soup.select("article.product_pod")
-            
-            for article in articles:
-                link = article.select_one("h3 a")
-                if link:
-                    href = link["href"]
-                    abs_url = urljoin(current_url, href)
-                    book_urls.append(abs_url)
+
+            page_urls, current_url = listing
+            book_urls.extend(page_urls)
             
             if max_books and len(book_urls) >= max_books:
                 return book_urls[:max_books]
-
-            # Check for next page
-            next_btn = soup.select_one(".pager .next a")
-            if next_btn:
-                current_url = urljoin(current_url, next_btn["href"])
-            else:
-                current_url = None
         
         return book_urls
 
-    def scrape_category(self, category_name, max_books=5, status_callback=None):
-        """Scrape books from a specific category by name."""
-        categories = self.get_categories()
+    async def ascrape_category_books(self, fetcher, category_url, max_books=None):
+        """Async variant of scrape_category_books (listing pages are chained by their next link)."""
+        book_urls = []
+        current_url = category_url
+
+        while current_url:
+            listing = await self.aload_page(fetcher, current_url, "listing")
+            if not listing:
+                break
+
+            page_urls, current_url = listing
+            book_urls.extend(page_urls)
+
+            if max_books and len(book_urls) >= max_books:
+                return book_urls[:max_books]
+
+        return book_urls
+
+    async def ascrape_books(self, fetcher, book_urls, category="Unknown", status_callback=None):
+        """Fetch and parse detail pages concurrently; results keep the order of ``book_urls``."""
+        done = 0
+
+        async def one(url):
+            nonlocal done
+            book = await self.aload_page(fetcher, url, "detail", category)
+            done += 1
+            if status_callback:
+                status_callback(f"⚙️ Processed book {done}/{len(book_urls)}...", None)
+            return book
+
+        books = await asyncio.gather(*(one(url) for url in book_urls))
+        return [book for book in books if book]
+
+    def _find_category(self, categories, category_name):
         target_cat = next((c for c in categories if c["name"].lower() == category_name.lower()), None)
-        
         if not target_cat:
             print(f"Category '{category_name}' not found.")
+        return target_cat
+
+    def scrape_category(self, category_name, max_books=5, status_callback=None, concurrent=None):
+        """
+        Scrape books from a specific category by name. With ``concurrent``
+        (default: scraper.concurrent) detail pages are fetched in parallel.
+        """
+        if concurrent is None:
+            concurrent = self.concurrent
+        if concurrent:
+            return asyncio.run(self.ascrape_category(category_name, max_books, status_callback))
+
+        categories = self.get_categories()
+        target_cat = self._find_category(categories, category_name)
+        
+        if not target_cat:
             return []
 
         if status_callback:
@@ -173,10 +488,111 @@ class BooksToScrapeScraper:
             book = self.scrape_book_detail(url, category=target_cat["name"])
             if book:
                 books.append(book)
-                time.sleep(0.2)  # Polite delay
 
         return books
 
+    async def _acategories(self, fetcher):
+        categories = self._cached_categories()
+        if not categories:
+            categories = await self.aload_page(fetcher, self.BASE_URL, "categories") or []
+            self._cache_categories(categories)
+        return categories
+
+    async def ascrape_category(self, category_name, max_books=5, status_callback=None):
+        """Async scrape of one category: pooled connections, per-host limits, token-bucket politeness."""
+        async with self.fetcher() as fetcher:
+            target_cat = self._find_category(await self._acategories(fetcher), category_name)
+            if not target_cat:
+                return []
+
+            if status_callback:
+                status_callback(f"📂 Scraping category: {target_cat['name']}...", None)
+
+            book_urls = await self.ascrape_category_books(fetcher, target_cat["url"], max_books)
+
+            if status_callback:
+                status_callback(f"📚 Found {len(book_urls)} books. Fetching details...", None)
+
+            return await self.ascrape_books(fetcher, book_urls, target_cat["name"], status_callback)
+
+    async def aiter_category(self, category_name, max_books=5, status_callback=None):
+        """
+        Async generator of a category's book records in completion order. Detail
+        pages from a listing page are fetched while the next listing page loads.
+        """
+        async with self.fetcher() as fetcher:
+            target_cat = self._find_category(await self._acategories(fetcher), category_name)
+            if not target_cat:
+                return
+
+            if status_callback:
+                status_callback(f"📂 Scraping category: {target_cat['name']}...", None)
+
+            results: asyncio.Queue = asyncio.Queue()
+            details = []
+
+            async def fetch_detail(url):
+                book = await self.aload_page(fetcher, url, "detail", target_cat["name"])
+                if book:
+                    await results.put(book)
+
+            async def walk_listings():
+                try:
+                    current_url = target_cat["url"]
+                    while current_url and not (max_books and len(details) >= max_books):
+                        listing = await self.aload_page(fetcher, current_url, "listing")
+                        if not listing:
+                            break
+                        page_urls, current_url = listing
+                        if max_books:
+                            page_urls = page_urls[:max_books - len(details)]
+                        details.extend(asyncio.create_task(fetch_detail(url)) for url in page_urls)
+                    await asyncio.gather(*details)
+                finally:
+                    await results.put(None)
+
+            walker = asyncio.create_task(walk_listings())
+            done = 0
+            try:
+                while (book := await results.get()) is not None:
+                    done += 1
+                    if status_callback:
+                        status_callback(f"⚙️ Processed book {done}/{len(details)}...", None)
+                    yield book
+                await walker
+            finally:
+                for task in [walker, *details]:
+                    task.cancel()
+                await asyncio.gather(walker, *details, return_exceptions=True)
+
+    def iter_category(self, category_name, max_books=5, status_callback=None, concurrent=None):
+        """
+        Yield a category's book records as they are scraped, without building the
+        full list; with ``concurrent`` (default: scraper.concurrent) pages are
+        fetched in parallel on a background event loop.
+        """
+        if concurrent is None:
+            concurrent = self.concurrent
+        if concurrent:
+            yield from iter_async(lambda: self.aiter_category(category_name, max_books, status_callback))
+            return
+
+        target_cat = self._find_category(self.get_categories(), category_name)
+        if not target_cat:
+            return
+        for url in self.scrape_category_books(target_cat["url"], max_books):
+            book = self.scrape_book_detail(url, category=target_cat["name"])
+            if book:
+                yield book
+
+    @staticmethod
+    def to_product_row(book):
+        """
+        Map a book record to the product row the ingestion pipeline expects:
+        product_id, product_title, rating, total_reviews, price, top_reviews.
+        """
+        return ProductRecord.from_book(book).to_row()
+
     def save_books(self, books, filename="books_data.json"):
         """Save scraped books to JSON file."""
         path = os.path.join(self.output_dir, filename)
@@ -187,34 +603,23 @@ class BooksToScrapeScraper:
 
     def save_to_csv(self, books, filename="product_reviews.csv"):
         """Save to CSV in the format expected by the UI/ingestion pipeline."""
-        # Map book fields to the expected CSV columns:
-        # product_id, product_title, rating, total_reviews, price, top_reviews
-        
         path = os.path.join(self.output_dir, filename)
         with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
+            writer = csv.DictWriter(f, fieldnames=[
                 "product_id", "product_title", "rating",
                 "total_reviews", "price", "top_reviews",
             ])
-            
+            writer.writeheader()
             for book in books:
-                # Construct a "review" from description since the site doesn't have real reviews
-                review_text = book.get("description", "")
-                if not review_text:
-                    review_text = "No description available."
-                    
-                writer.writerow([
-                    book.get("upc", "N/A"),
-                    book.get("title", "N/A"),
-                    f"{book.get('rating', 0)}/5",
-                    "0",  # No real reviews on this site
-                    book.get("price", "N/A"),
-                    review_text
-                ])
+                writer.writerow(self.to_product_row(book))
         print(f"✅ Data saved to {path}")
 
 
+def _parse_detail_page(html, book_url, category, backend):
+    """Process-pool entry point: parse one detail page with the given backend."""
+    return BooksToScrapeScraper.parse_book_detail(parse_html(html, backend), book_url, category)
+
+
 if __name__ == "__main__":
     scraper = BooksToScrapeScraper()
     print("Fetching categories...")
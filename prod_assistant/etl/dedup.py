@@ -0,0 +1,191 @@
+"""
+MinHash / LSH near-duplicate detection for scraped products.
+
+Each product is reduced to character 5-gram shingles of its normalized title
+and reviews (robust to "128 GB" vs "128GB" style title differences),
+signed with ``num_perm`` MinHash permutations and bucketed into ``bands``
+LSH bands. Products that share a bucket with an earlier product and whose
+estimated Jaccard similarity is at least ``threshold`` are collapsed into
+that earlier (canonical) product.
+
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("p1", "Apple iPhone 15 (128 GB) - Black", reviews)    # -> None (new)
+    index.add("p2", "Apple iPhone 15 128GB Black", reviews)          # -> "p1"
+    index.record_alias("p1", "p2", "Apple iPhone 15 128GB Black")
+    dict(index.aliases())   # {"p1": {"aliases": ["p2"], "alias_titles": ["Apple iPhone 15 128GB Black"]}}
+
+With ``on_disk=True`` the signatures, LSH buckets and aliases live in a
+temporary SQLite file instead of dicts, so streaming ingestion can
+deduplicate a catalog of any size in bounded memory.
+"""
+
+import sqlite3
+from collections import defaultdict
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from prod_assistant.retriever.lexical import tokenize
+
+_PRIME = (1 << 31) - 1   # Mersenne prime: x mod p == (x & p) + (x >> 31), up to one extra p
+_MASK = np.uint64(_PRIME)
+
+# Metadata a canonical product carries about the duplicates collapsed into it
+ALIAS_FIELDS = ("aliases", "alias_titles")
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    """Distinct polynomial hashes of the character k-grams of the normalized text."""
+    data = np.frombuffer("".join(tokenize(text)).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if data.size == 0:
+        return data
+    if data.size <= k:
+        k = data.size
+    hashes = np.zeros(data.size - k + 1, dtype=np.uint64)
+    for j in range(k):
+        hashes = (hashes * np.uint64(257) + data[j:data.size - k + 1 + j]) & _MASK
+    return np.unique(hashes)
+
+
+def alias_metadata(title: Optional[str], duplicates: List[Tuple[str, Optional[str]]]) -> dict:
+    """``aliases`` (product_ids) and ``alias_titles`` (those that differ) for a canonical product titled ``title``."""
+    return {
+        "aliases": [key for key, _ in duplicates],
+        "alias_titles": [alias_title for _, alias_title in duplicates if alias_title != title],
+    }
+
+
+def merge_aliases(*metadata: Optional[dict]) -> Optional[dict]:
+    """Union of alias metadata, first occurrence first; None when there are no aliases."""
+    merged = {field: [] for field in ALIAS_FIELDS}
+    for item in metadata:
+        for field in ALIAS_FIELDS:
+            merged[field].extend(v for v in (item or {}).get(field, []) if v not in merged[field])
+    return merged if merged["aliases"] else None
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash LSH index; the first product seen in a cluster is canonical."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16, seed: int = 1,
+                 on_disk: bool = False):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, str]] = [dict() for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._titles: Dict[str, Optional[str]] = {}
+        self._aliases: Dict[str, List[Tuple[str, Optional[str]]]] = defaultdict(list)
+        self._db = None
+        if on_disk:
+            # An empty filename is a private temporary database, deleted when closed
+            self._db = sqlite3.connect("", check_same_thread=False)
+            self._db.execute("CREATE TABLE signatures (key TEXT PRIMARY KEY, signature BLOB, title TEXT)")
+            self._db.execute("CREATE TABLE buckets (bucket BLOB PRIMARY KEY, key TEXT)")
+            self._db.execute("CREATE TABLE aliases (canonical TEXT, key TEXT, title TEXT)")
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        hashes = shingle_hashes(text)
+        if hashes.size == 0:
+            return None
+        # (a * x + b) mod p for every permutation x shingle, then min over shingles
+        permuted = np.multiply.outer(self._a, hashes)
+        permuted += self._b[:, None]
+        high = permuted >> np.uint64(31)
+        permuted &= _MASK
+        permuted += high
+        return permuted.min(axis=1)
+
+    def add(self, key: str, title: str, content: str) -> Optional[str]:
+        """Index a product; return the canonical key it duplicates, or None if it is new."""
+        signature = self.signature(f"{title or ''} {content or ''}")
+        if signature is None:
+            return None
+        bands = [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+        for candidate, candidate_signature in self._candidates(bands):
+            if float(np.mean(candidate_signature == signature)) >= self.threshold:
+                return candidate
+        self._insert(key, title, signature, bands)
+        return None
+
+    def record_alias(self, canonical: str, key: str, title: Optional[str]):
+        """Note that ``key`` (titled ``title``) was collapsed into ``canonical``."""
+        if self._db is None:
+            self._aliases[canonical].append((key, title))
+        else:
+            self._db.execute("INSERT INTO aliases VALUES (?, ?, ?)", (canonical, key, title))
+
+    def aliases(self) -> Iterator[Tuple[str, dict]]:
+        """(canonical key, its ``alias_metadata``) for every product that has recorded aliases."""
+        if self._db is None:
+            for canonical, duplicates in self._aliases.items():
+                yield canonical, alias_metadata(self._titles.get(canonical), duplicates)
+            return
+        rows = self._db.execute(
+            "SELECT a.canonical, s.title, a.key, a.title FROM aliases a JOIN signatures s ON s.key = a.canonical "
+            "ORDER BY a.canonical, a.rowid"
+        )
+        for (canonical, title), group in groupby(rows, key=lambda row: row[:2]):
+            yield canonical, alias_metadata(title, [(key, alias_title) for _, _, key, alias_title in group])
+
+    def _candidates(self, bands: List[bytes]) -> List[Tuple[str, np.ndarray]]:
+        """(key, signature) of the products sharing at least one bucket."""
+        if self._db is None:
+            keys = {self._buckets[i][band] for i, band in enumerate(bands) if band in self._buckets[i]}
+            return [(k, self._signatures[k]) for k in keys]
+        buckets = [i.to_bytes(2, "big") + band for i, band in enumerate(bands)]
+        rows = self._db.execute(
+            f"SELECT key, signature FROM signatures WHERE key IN "
+            f"(SELECT key FROM buckets WHERE bucket IN ({','.join('?' * len(buckets))}))", buckets
+        )
+        return [(k, np.frombuffer(blob, dtype=np.uint64)) for k, blob in rows]
+
+    def _insert(self, key: str, title: Optional[str], signature: np.ndarray, bands: List[bytes]):
+        if self._db is None:
+            self._signatures[key] = signature
+            self._titles[key] = title
+            for i, band in enumerate(bands):
+                self._buckets[i].setdefault(band, key)
+            return
+        self._db.execute("INSERT OR REPLACE INTO signatures VALUES (?, ?, ?)", (key, signature.tobytes(), title))
+        # The first product in a bucket keeps it, as with dict.setdefault
+        self._db.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?)",
+                             [(i.to_bytes(2, "big") + band, key) for i, band in enumerate(bands)])
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def collapse_near_duplicates(documents: List[Document], threshold: float = 0.8, num_perm: int = 128,
+                             bands: int = 16) -> Tuple[List[Document], int]:
+    """
+    Collapse near-duplicate products into their first occurrence. The canonical
+    document gets ``aliases`` (product_ids) and ``alias_titles`` metadata;
+    returns (canonical documents, number of duplicates removed).
+    """
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm, bands=bands)
+    canonical: Dict[str, Document] = {}
+    duplicates = 0
+    for doc in documents:
+        product_id = str(doc.metadata["product_id"])
+        title = doc.metadata.get("product_title")
+        duplicate_of = index.add(product_id, title, doc.page_content)
+        if duplicate_of is None or duplicate_of == product_id:
+            canonical[product_id] = doc
+        else:
+            index.record_alias(duplicate_of, product_id, title)
+            duplicates += 1
+
+    for product_id, metadata in index.aliases():
+        canonical[product_id].metadata.update(metadata)
+    return list(canonical.values()), duplicates
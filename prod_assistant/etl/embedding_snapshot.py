@@ -0,0 +1,206 @@
+"""
+On-disk snapshot of every embedded product, so a collection can be rebuilt
+(new collection name, another vector backend, AstraDB restored after
+hibernation) without calling the embedding API.
+
+    <dir>/meta.json            {"model": ..., "dim": ..., "generation": n}
+    <dir>/vectors.<n>.f32      float32 rows, appended once per written batch
+    <dir>/records.<n>.jsonl    one line per row: product_id, doc_id, content, metadata, content_hash, row
+
+Records are append-only: the last line for a product_id wins and a
+``{"product_id": ..., "deleted": true}`` line removes it. ``compact()``
+writes generation n+1 with live rows only and switches to it by replacing
+meta.json atomically.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+def snapshot_dir(base_dir: str, model_name: str) -> str:
+    """Snapshots are per embedding model: vectors from different models are not interchangeable."""
+    return os.path.join(base_dir, re.sub(r"[^A-Za-z0-9._-]+", "_", model_name))
+
+
+class EmbeddingSnapshot:
+    def __init__(self, directory: str, model_name: str):
+        self.directory = directory
+        self.model_name = model_name
+        self.meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        self.dim = None
+        self.generation = 0
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["model"] != model_name:
+                raise ValueError(f"Snapshot at {directory} was built with {meta['model']}, not {model_name}")
+            self.dim = meta["dim"]
+            self.generation = meta.get("generation", 0)
+
+    def _paths(self, generation: int) -> Tuple[str, str]:
+        return (os.path.join(self.directory, f"vectors.{generation}.f32"),
+                os.path.join(self.directory, f"records.{generation}.jsonl"))
+
+    @property
+    def vectors_path(self) -> str:
+        return self._paths(self.generation)[0]
+
+    @property
+    def records_path(self) -> str:
+        return self._paths(self.generation)[1]
+
+    def _write_meta(self):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self.dim, "generation": self.generation}, f)
+        os.replace(tmp, self.meta_path)
+
+    def exists(self) -> bool:
+        return self.dim is not None and os.path.exists(self.records_path)
+
+    def _rows_on_disk(self) -> int:
+        if not self.dim or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    # ---------- Writes ----------
+    def append(self, documents: List[Document], vectors: List[List[float]], doc_ids: List[str],
+               hashes: List[str]):
+        if not documents:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.dim = int(block.shape[1])
+                self._write_meta()
+            first_row = self._rows_on_disk()
+            # Vectors first: a record line is only trusted if its row is on disk. A partial
+            # row left by a torn append is cut off, so later rows stay aligned
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(first_row * self.dim * 4)
+                f.write(block.tobytes())
+            with open(self.records_path, "a", encoding="utf-8") as f:
+                for i, (doc, doc_id, digest) in enumerate(zip(documents, doc_ids, hashes)):
+                    f.write(self._record_line(doc, doc_id, digest, first_row + i))
+
+    @staticmethod
+    def _record_line(doc: Document, doc_id: str, digest: str, row: int) -> str:
+        return json.dumps({
+            "product_id": str(doc.metadata["product_id"]), "doc_id": doc_id,
+            "content": doc.page_content, "metadata": doc.metadata,
+            "content_hash": digest, "row": row,
+        }, ensure_ascii=False, default=str) + "\n"
+
+    def remove(self, product_ids: Iterable[str]):
+        lines = [json.dumps({"product_id": str(pid), "deleted": True}) + "\n" for pid in product_ids]
+        if not lines or not self.exists():
+            return
+        with self._lock, open(self.records_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    # ---------- Reads ----------
+    def _records(self) -> Iterator[Tuple[int, Optional[str], Optional[dict]]]:
+        """(byte offset, product_id, record or None if deleted) per line; (offset, None, None) for a torn line."""
+        rows = self._rows_on_disk()
+        with open(self.records_path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    yield offset, None, None  # torn last line after a crash
+                    continue
+                live = not record.get("deleted") and record["row"] < rows
+                yield offset, record["product_id"], record if live else None
+
+    def _scan(self) -> Tuple[Dict[str, int], Dict[str, str], int]:
+        """product_id -> byte offset of its live record, product_id -> content hash, total lines."""
+        offsets, hashes, lines = {}, {}, 0
+        for offset, pid, record in self._records():
+            lines += 1
+            if pid is None:
+                continue
+            if record is None:
+                offsets.pop(pid, None)
+                hashes.pop(pid, None)
+            else:
+                offsets[pid] = offset
+                hashes[pid] = record["content_hash"]
+        return offsets, hashes, lines
+
+    def hashes(self) -> Dict[str, str]:
+        """Content hash of every live product in the snapshot."""
+        return self._scan()[1] if self.exists() else {}
+
+    def iter_hashes(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """(product_id, content hash or None if deleted) in file order, without holding them; the last wins."""
+        if not self.exists():
+            return
+        for _, pid, record in self._records():
+            if pid is not None:
+                yield pid, record["content_hash"] if record is not None else None
+
+    def iter_batches(self, batch_size: int = 256) -> Iterator[Tuple[List[Document], np.ndarray, List[str], List[str]]]:
+        """Yield (documents, vectors, doc_ids, content_hashes) for live products, in file order."""
+        if not self.exists():
+            return
+        offsets, _, _ = self._scan()
+        live = set(offsets.values())
+        vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows_on_disk(), self.dim))
+        batch: list = []
+        with open(self.records_path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if offset not in live:
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield self._to_batch(batch, vectors)
+                    batch = []
+        if batch:
+            yield self._to_batch(batch, vectors)
+
+    @staticmethod
+    def _to_batch(records: List[dict], vectors: np.ndarray):
+        documents = [Document(page_content=r["content"], metadata=r["metadata"]) for r in records]
+        block = np.asarray(vectors[[r["row"] for r in records]])
+        return documents, block, [r["doc_id"] for r in records], [r["content_hash"] for r in records]
+
+    def stale_ratio(self) -> float:
+        if not self.exists():
+            return 0.0
+        offsets, _, lines = self._scan()
+        return 1 - len(offsets) / lines if lines else 0.0
+
+    def compact(self):
+        """Rewrite the snapshot with live rows only, as a new generation."""
+        if not self.exists():
+            return
+        with self._lock:
+            vectors_path, records_path = self._paths(self.generation + 1)
+            row = 0
+            with open(vectors_path, "wb") as vf, open(records_path, "w", encoding="utf-8") as rf:
+                for documents, block, doc_ids, hashes in self.iter_batches():
+                    vf.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+                    for doc, doc_id, digest in zip(documents, doc_ids, hashes):
+                        rf.write(self._record_line(doc, doc_id, digest, row))
+                        row += 1
+            old_vectors, old_records = self.vectors_path, self.records_path
+            self.generation += 1
+            self._write_meta()
+            os.remove(old_vectors)
+            os.remove(old_records)
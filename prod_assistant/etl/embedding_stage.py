@@ -0,0 +1,33 @@
+from typing import List
+
+from langchain_core.documents import Document
+
+from prod_assistant.utils.rate_limit import TokenBucket, retry_with_backoff
+
+
+class EmbeddingStage:
+    """
+    Rate-limited embedding of document batches for ingestion.
+
+    Every embed request, retries included, first takes a token from a shared
+    bucket (``requests_per_minute``) and is retried with jittered exponential
+    backoff on 429/5xx errors. Concurrency is provided by the caller
+    (StreamingPipeline runs up to ``max_concurrency`` batches at once).
+    """
+
+    def __init__(self, embeddings, requests_per_minute: float | None = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 30.0):
+        self.embeddings = embeddings
+        self.bucket = TokenBucket(requests_per_minute / 60.0) if requests_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        return retry_with_backoff(
+            self.embeddings.embed_documents, texts,
+            max_retries=self.max_retries, base_delay=self.base_delay, max_delay=self.max_delay, bucket=self.bucket,
+        )
+
+    def __call__(self, batch: List[Document]) -> List[List[float]]:
+        return self.embed_texts([doc.page_content for doc in batch])
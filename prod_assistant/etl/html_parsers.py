@@ -0,0 +1,98 @@
+"""
+HTML parser backends for the scraper.
+
+Every backend returns a document node with the small BeautifulSoup-like
+surface the extraction code in ``data_scrapper`` uses:
+
+    node.select_one(css) / node.select(css)   CSS queries
+    node.text                                 text content, descendants included
+    node["href"], node["class"]               attributes (``class`` is a list)
+
+so ``parse_categories`` / ``parse_listing`` / ``parse_book_detail`` run
+unchanged on any of them:
+
+    "html.parser"   BeautifulSoup with the pure-Python parser (slowest, no extra deps)
+    "lxml"          lxml.html with CSS selectors compiled once to XPath
+    "selectolax"    selectolax's lexbor engine, if the package is installed
+"""
+
+from functools import lru_cache
+
+import lxml.html
+from bs4 import BeautifulSoup
+from cssselect import HTMLTranslator
+from lxml import etree
+
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+
+def _split_class(name, value):
+    return value.split() if name == "class" else value
+
+
+class LxmlNode:
+    __slots__ = ("_element",)
+
+    def __init__(self, element):
+        self._element = element
+
+    def select(self, css):
+        return [LxmlNode(e) for e in _xpath(css)(self._element)]
+
+    def select_one(self, css):
+        found = _xpath(css)(self._element)
+        return LxmlNode(found[0]) if found else None
+
+    @property
+    def text(self):
+        return self._element.text_content()
+
+    def __getitem__(self, name):
+        value = self._element.get(name)
+        if value is None:
+            raise KeyError(name)
+        return _split_class(name, value)
+
+
+@lru_cache(maxsize=256)
+def _xpath(css):
+    return etree.XPath(HTMLTranslator().css_to_xpath(css))
+
+
+class SelectolaxNode:
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, css):
+        return [SelectolaxNode(n) for n in self._node.css(css)]
+
+    def select_one(self, css):
+        found = self._node.css_first(css)
+        return SelectolaxNode(found) if found is not None else None
+
+    @property
+    def text(self):
+        return self._node.text()
+
+    def __getitem__(self, name):
+        value = self._node.attributes.get(name)
+        if value is None:
+            raise KeyError(name)
+        return _split_class(name, value)
+
+
+def parse_html(html, backend="lxml"):
+    """Parse a page with the named backend and return its document node."""
+    if backend == "html.parser":
+        return BeautifulSoup(html, "html.parser")
+    if backend == "lxml":
+        return LxmlNode(lxml.html.document_fromstring(html))
+    if backend == "selectolax":
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as e:
+            raise ImportError("The selectolax parser backend needs `pip install selectolax`") from e
+        return SelectolaxNode(LexborHTMLParser(html).root)
+    raise ValueError(f"Unsupported HTML parser backend: {backend}")
@@ -0,0 +1,149 @@
+"""
+On-disk HTTP cache for the scraper.
+
+Each URL keeps its last body (zlib-compressed), ETag / Last-Modified
+validators and the result of parsing it. Within ``freshness_seconds`` a
+page is served from disk without a request; after that it is revalidated
+with a conditional GET (If-None-Match / If-Modified-Since). A 304, or a 200
+with an identical body, marks the page unchanged and its cached parse
+result is reused, so refresh crawls spend almost no bandwidth or parse CPU.
+
+The cache is pruned when it is opened: pages not fetched or revalidated for
+``max_age_seconds`` are dropped, then the oldest beyond ``max_entries``.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class HttpCache:
+    def __init__(self, cache_dir: str, freshness_seconds: float = 3600,
+                 max_age_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.freshness_seconds = freshness_seconds
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "responses.sqlite"), timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB, body_hash TEXT, etag TEXT, last_modified TEXT, fetched_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS parsed (url TEXT, kind TEXT, value TEXT, PRIMARY KEY (url, kind))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)")
+        self._db.commit()
+        self.fresh_hits = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+        self.parse_skipped = 0
+        self.pruned = self.prune()
+
+    def prune(self) -> int:
+        """Drop entries older than ``max_age_seconds``, then the oldest beyond ``max_entries``."""
+        removed = 0
+        with self._lock, self._db:
+            if self.max_age_seconds is not None:
+                removed += self._db.execute(
+                    "DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.max_age_seconds,)
+                ).rowcount
+            if self.max_entries is not None:
+                removed += self._db.execute(
+                    "DELETE FROM responses WHERE url IN "
+                    "(SELECT url FROM responses ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                ).rowcount
+            if removed:
+                self._db.execute("DELETE FROM parsed WHERE url NOT IN (SELECT url FROM responses)")
+        return removed
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return CacheEntry(url, zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        fresh = time.time() - entry.fetched_at < self.freshness_seconds
+        if fresh:
+            self.fresh_hits += 1
+        return fresh
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def touch(self, url: str):
+        """Record a 304: the cached body is still current."""
+        self.not_modified += 1
+        with self._lock, self._db:
+            self._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def store(self, url: str, headers, text: str) -> bool:
+        """Save a 200 response; returns False when the body is identical to the cached one."""
+        body_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT body_hash FROM responses WHERE url = ?", (url,)).fetchone()
+            changed = row is None or row[0] != body_hash
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, zlib.compress(text.encode("utf-8")), body_hash,
+                 headers.get("etag"), headers.get("last-modified"), time.time()),
+            )
+            if changed:
+                self._db.execute("DELETE FROM parsed WHERE url = ?", (url,))
+        if changed:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+        return changed
+
+    def get_parsed(self, url: str, kind: str):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM parsed WHERE url = ? AND kind = ?", (url, kind)).fetchone()
+        if row is None:
+            return None
+        self.parse_skipped += 1
+        return json.loads(row[0])
+
+    def set_parsed(self, url: str, kind: str, value):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?)",
+                             (url, kind, json.dumps(value, ensure_ascii=False)))
+
+    def stats(self) -> dict:
+        return {
+            "fresh_hits": self.fresh_hits,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "changed": self.changed,
+            "parse_skipped": self.parse_skipped,
+            "pruned": self.pruned,
+        }
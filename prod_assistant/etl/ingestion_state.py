@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+_ID_NAMESPACE = uuid.UUID("6f1c7a52-3d2b-4b8e-9a51-0c2f3e4d5a61")
+
+
+def document_id(product_id) -> str:
+    """Stable vector-store document id for a product, so re-ingestion upserts instead of duplicating."""
+    return str(uuid.uuid5(_ID_NAMESPACE, str(product_id)))
+
+
+def content_hash(document: Document) -> str:
+    """Hash of everything that ends up in the vector store for a product."""
+    payload = json.dumps(
+        {"content": document.page_content, "metadata": document.metadata},
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IngestionState:
+    """
+    SQLite manifest of what a collection currently holds: product_id -> document id
+    and content hash. Scoped by ``<backend>:<collection>`` so switching backends or
+    collection names starts from an empty manifest.
+
+    The same database journals ingestion runs: every written batch records the
+    input offset it reached, in the same transaction as its manifest rows, so an
+    interrupted run can resume after its last committed batch.
+
+    Streaming runs look hashes up per batch (``hashes_for``) and record the
+    product ids they read in ``run_products`` for pruning, so they never hold
+    the whole manifest in memory.
+
+    The alias metadata of canonical products (see etl/dedup.py) is kept too,
+    so a streaming run can hash a canonical product with the aliases it was
+    stored with before the run has seen its duplicates.
+    """
+
+    def __init__(self, path: str, scope: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.scope = scope
+        # Streaming runs look hashes up on the reader thread while the writer records batches
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "scope TEXT, product_id TEXT, doc_id TEXT, content_hash TEXT, updated_at REAL, "
+            "PRIMARY KEY (scope, product_id))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, scope TEXT, source TEXT, status TEXT, "
+            "started_at REAL, finished_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "run_id TEXT, end_offset INTEGER, rows INTEGER, committed_at REAL, "
+            "PRIMARY KEY (run_id, end_offset))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS run_products (run_id TEXT, product_id TEXT, PRIMARY KEY (run_id, product_id))"
+        )
+        # Copy of the embedding snapshot's content hashes (NULL: deleted), refreshed per streaming run
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshot_hashes ("
+            "scope TEXT, product_id TEXT, content_hash TEXT, PRIMARY KEY (scope, product_id))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS aliases (scope TEXT, product_id TEXT, metadata TEXT, "
+            "PRIMARY KEY (scope, product_id))"
+        )
+        self._db.commit()
+
+    def hashes(self) -> Dict[str, str]:
+        rows = self._db.execute(
+            "SELECT product_id, content_hash FROM products WHERE scope = ?", (self.scope,)
+        )
+        return dict(rows.fetchall())
+
+    def _lookup(self, table: str, product_ids: Iterable[str], column: str = "content_hash") -> Dict[str, str]:
+        found = {}
+        ids = iter(product_ids)
+        while chunk := list(islice(ids, 500)):
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT product_id, {column} FROM {table} WHERE scope = ? AND product_id IN ({marks}) "
+                    f"AND {column} IS NOT NULL", (self.scope, *chunk)
+                ).fetchall()
+            found.update(rows)
+        return found
+
+    def hashes_for(self, product_ids: Iterable[str]) -> Dict[str, str]:
+        """Content hashes of the given products that are stored."""
+        return self._lookup("products", product_ids)
+
+    def load_snapshot_hashes(self, pairs: Iterable[Tuple[str, Optional[str]]]):
+        """Replace the snapshot hash copy with (product_id, content_hash or None) pairs; the last pair wins."""
+        pairs = iter(pairs)
+        with self._db:
+            self._db.execute("DELETE FROM snapshot_hashes WHERE scope = ?", (self.scope,))
+            while chunk := list(islice(pairs, 1000)):
+                self._db.executemany("INSERT OR REPLACE INTO snapshot_hashes VALUES (?, ?, ?)",
+                                     [(self.scope, pid, h) for pid, h in chunk])
+
+    def snapshot_hashes_for(self, product_ids: Iterable[str]) -> Dict[str, str]:
+        return self._lookup("snapshot_hashes", product_ids)
+
+    def aliases_for(self, product_ids: Iterable[str]) -> Dict[str, dict]:
+        """Stored alias metadata of the given products that have aliases."""
+        return {pid: json.loads(metadata) for pid, metadata in self._lookup("aliases", product_ids, "metadata").items()}
+
+    def record_aliases(self, changes: Dict[str, Optional[dict]]):
+        """Store each product's alias metadata; None drops it."""
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)",
+                [(self.scope, pid, json.dumps(metadata)) for pid, metadata in changes.items() if metadata],
+            )
+            self._db.executemany(
+                "DELETE FROM aliases WHERE scope = ? AND product_id = ?",
+                [(self.scope, pid) for pid, metadata in changes.items() if not metadata],
+            )
+
+    def record(self, rows: Iterable[Tuple[str, str, str]], run_id: Optional[str] = None,
+               end_offset: Optional[int] = None):
+        """
+        Store (product_id, doc_id, content_hash) for rows that were written to the
+        vector store, and with ``run_id`` checkpoint the input offset they reached.
+        """
+        now = time.time()
+        rows = list(rows)
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)",
+                [(self.scope, pid, doc_id, h, now) for pid, doc_id, h in rows],
+            )
+            if run_id is not None and end_offset is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?)", (run_id, end_offset, len(rows), now)
+                )
+
+    def mark_seen(self, run_id: str, product_ids: Iterable[str]):
+        """Note products read by a run; ``unseen`` lists the stored ones it never read."""
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR IGNORE INTO run_products VALUES (?, ?)",
+                                 [(run_id, pid) for pid in product_ids])
+
+    def unseen(self, run_id: str) -> List[str]:
+        rows = self._db.execute(
+            "SELECT product_id FROM products WHERE scope = ? AND product_id NOT IN "
+            "(SELECT product_id FROM run_products WHERE run_id = ?)", (self.scope, run_id)
+        )
+        return [pid for pid, in rows]
+
+    def remove(self, product_ids: Iterable[str]):
+        rows = [(self.scope, pid) for pid in product_ids]
+        self._db.executemany("DELETE FROM products WHERE scope = ? AND product_id = ?", rows)
+        self._db.executemany("DELETE FROM aliases WHERE scope = ? AND product_id = ?", rows)
+        self._db.commit()
+
+    # ---------- Run journal ----------
+    def begin_run(self, source: str, resume: bool = True) -> Tuple[str, int]:
+        """
+        Start a run over ``source`` (a fingerprint of the input). With ``resume``, an
+        unfinished run over the same source is continued; returns (run_id, offset to
+        resume after, or -1 to start from the beginning). Other unfinished runs are
+        marked abandoned.
+        """
+        row = self._db.execute(
+            "SELECT run_id FROM runs WHERE scope = ? AND source = ? AND status = 'running' "
+            "ORDER BY started_at DESC LIMIT 1", (self.scope, source)
+        ).fetchone()
+        with self._db:
+            if resume and row:
+                run_id = row[0]
+                self._db.execute(
+                    "UPDATE runs SET status = 'abandoned' WHERE scope = ? AND status = 'running' AND run_id != ?",
+                    (self.scope, run_id),
+                )
+                return run_id, self.committed_offset(run_id)
+            self._db.execute("UPDATE runs SET status = 'abandoned' WHERE scope = ? AND status = 'running'",
+                             (self.scope,))
+            self._db.execute("DELETE FROM run_products WHERE run_id IN "
+                             "(SELECT run_id FROM runs WHERE scope = ? AND status = 'abandoned')", (self.scope,))
+            run_id = uuid.uuid4().hex
+            self._db.execute("INSERT INTO runs VALUES (?, ?, ?, 'running', ?, NULL)",
+                             (run_id, self.scope, source, time.time()))
+        return run_id, -1
+
+    def committed_offset(self, run_id: str) -> int:
+        row = self._db.execute("SELECT MAX(end_offset) FROM batches WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row and row[0] is not None else -1
+
+    def finish_run(self, run_id: str):
+        with self._db:
+            self._db.execute("UPDATE runs SET status = 'finished', finished_at = ? WHERE run_id = ?",
+                             (time.time(), run_id))
+            self._db.execute("DELETE FROM run_products WHERE run_id = ?", (run_id,))
@@ -0,0 +1,133 @@
+"""
+Pages/sec of each HTML parser backend over saved pages, using the same
+extraction code as the scraper.
+
+    python -m prod_assistant.etl.parser_benchmark --pages path/to/saved/site
+    python -m prod_assistant.etl.parser_benchmark --http-cache data/cache/http --workers 4
+
+``--pages`` reads every *.html file under a directory (e.g. a ``wget -r``
+mirror, or the trimmed copy in tests/fixtures/books_site); ``--http-cache`` reads the bodies the scraper's HTTP cache kept
+from earlier crawls. Every backend must extract the same records as
+html.parser, otherwise the run fails.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from prod_assistant.etl.data_scrapper import BooksToScrapeScraper
+from prod_assistant.etl.html_parsers import PARSER_BACKENDS, parse_html
+
+BASE_URL = "https://books.toscrape.com/"
+
+# Extraction only: no config, no HTTP cache, nothing fetched
+_scraper = BooksToScrapeScraper(output_dir=tempfile.gettempdir(), config={})
+
+
+def page_kind(html):
+    if "product_main" in html:
+        return "detail"
+    if "product_pod" in html:
+        return "listing"
+    return "categories"
+
+
+def load_pages(pages_dir=None, http_cache_dir=None):
+    """[(url, html)] from a directory of saved pages or the scraper's HTTP cache."""
+    pages = []
+    if pages_dir:
+        for root, _, files in os.walk(pages_dir):
+            for name in sorted(files):
+                if name.endswith(".html"):
+                    path = os.path.join(root, name)
+                    with open(path, "r", encoding="utf-8") as f:
+                        rel = os.path.relpath(path, pages_dir).replace(os.sep, "/")
+                        pages.append((BASE_URL + rel, f.read()))
+    if http_cache_dir:
+        db = sqlite3.connect(os.path.join(http_cache_dir, "responses.sqlite"))
+        for url, body in db.execute("SELECT url, body FROM responses ORDER BY url"):
+            pages.append((url, zlib.decompress(body).decode("utf-8")))
+        db.close()
+    return pages
+
+
+def extract(backend, url, html):
+    soup = parse_html(html, backend)
+    kind = page_kind(html)
+    if kind == "detail":
+        return _scraper.parse_book_detail(soup, url)
+    if kind == "listing":
+        return _scraper.parse_listing(soup, url)
+    return _scraper.parse_categories(soup)
+
+
+def _extract_all(backend, pages):
+    return [extract(backend, url, html) for url, html in pages]
+
+
+def run(backend, pages, rounds=3, workers=0):
+    """Best pages/sec over ``rounds`` passes and the records of the last pass."""
+    best = 0.0
+    results = None
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            if pool is None:
+                results = _extract_all(backend, pages)
+            else:
+                chunk = max(1, len(pages) // (workers * 4))
+                chunks = [pages[i:i + chunk] for i in range(0, len(pages), chunk)]
+                results = [r for part in pool.map(_extract_all, [backend] * len(chunks), chunks) for r in part]
+            best = max(best, len(pages) / (time.perf_counter() - start))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return best, results
+
+
+def available_backends():
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            parse_html("<html></html>", backend)
+            backends.append(backend)
+        except ImportError:
+            print(f"Skipping {backend}: not installed")
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper's HTML parser backends.")
+    parser.add_argument("--pages", help="directory of saved *.html pages")
+    parser.add_argument("--http-cache", help="scraper HTTP cache directory (scraper.http_cache.dir)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=0, help="also time a process pool of this size")
+    args = parser.parse_args()
+    if not args.pages and not args.http_cache:
+        parser.error("pass --pages and/or --http-cache")
+
+    pages = load_pages(args.pages, args.http_cache)
+    if not pages:
+        parser.error("no pages found")
+    print(f"{len(pages)} pages")
+
+    reference = None
+    for backend in available_backends():
+        modes = [0] + ([args.workers] if args.workers else [])
+        for workers in modes:
+            rate, results = run(backend, pages, args.rounds, workers)
+            if reference is None:
+                reference = results
+            elif results != reference:
+                raise SystemExit(f"{backend} extracted different records than {PARSER_BACKENDS[0]}")
+            label = f"{backend} x{workers} processes" if workers else backend
+            print(f"{label:<28} {rate:10.1f} pages/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Ingestion-time review summaries.
+
+Each product's reviews are summarized once by the LLM into a short summary
+plus pros and cons (PromptType.REVIEW_SUMMARY), stored as document metadata
+(``review_summary``, ``review_pros``, ``review_cons``). Prompt cards and
+``format_docs`` then show the summary instead of the raw reviews, so the
+LLM cost moves from every chat query to ingestion.
+
+Summaries are cached in SQLite by a hash of the title, reviews and prompt,
+so re-ingesting an unchanged product costs no LLM call:
+
+    summarizer = ReviewSummarizer(llm, "data/cache/review_summaries.sqlite", max_concurrency=4)
+    summarizer.summarize(documents)                  # in place, batch by batch
+    for doc in summarizer.iter_summarized(stream):   # lazily, for streaming ingestion
+        ...
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+from prod_assistant.prompts_library.prompts import PROMPT_REGISTRY, PromptType
+from prod_assistant.utils.rate_limit import TokenBucket, retry_with_backoff
+
+SUMMARY_FIELDS = ("review_summary", "review_pros", "review_cons")
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_summary(text: str) -> Dict[str, object]:
+    """The summary metadata from an LLM reply; a reply that is not JSON becomes the summary itself."""
+    match = _JSON_OBJECT.search(text or "")
+    try:
+        payload = json.loads(match.group(0)) if match else None
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return {"review_summary": (text or "").strip(), "review_pros": [], "review_cons": []}
+    return {
+        "review_summary": str(payload.get("summary") or "").strip(),
+        "review_pros": [str(p).strip() for p in payload.get("pros") or [] if str(p).strip()],
+        "review_cons": [str(c).strip() for c in payload.get("cons") or [] if str(c).strip()],
+    }
+
+
+class ReviewSummarizer:
+    """
+    Summarize product reviews in batches of ``batch_size``, with up to
+    ``max_concurrency`` LLM calls in flight under a shared
+    ``requests_per_minute`` budget (jittered backoff on 429/5xx).
+    Products whose reviews are shorter than ``min_review_chars`` are left
+    as they are: a summary would not be shorter.
+    """
+
+    def __init__(self, llm, path: str, batch_size: int = 16, max_concurrency: int = 4,
+                 requests_per_minute: float | None = None, max_retries: int = 5,
+                 min_review_chars: int = 400, max_review_chars: int = 6000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.llm = llm
+        self.prompt = PROMPT_REGISTRY[PromptType.REVIEW_SUMMARY]
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(requests_per_minute / 60.0) if requests_per_minute else None
+        self.max_retries = max_retries
+        self.min_review_chars = min_review_chars
+        self.max_review_chars = max_review_chars
+        self.generated = 0
+        self.cached = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS summaries (summary_key TEXT PRIMARY KEY, summary TEXT)")
+        self._db.commit()
+
+    def _key(self, doc: Document) -> str:
+        payload = json.dumps([self.prompt.version, self.prompt.template,
+                              doc.metadata.get("product_title"), doc.page_content], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cached(self, keys: List[str]) -> Dict[str, dict]:
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db.execute(f"SELECT summary_key, summary FROM summaries WHERE summary_key IN ({marks})", keys)
+            return {key: json.loads(summary) for key, summary in rows}
+
+    def _generate(self, doc: Document) -> Optional[dict]:
+        text = self.prompt.format(product_title=doc.metadata.get("product_title") or "N/A",
+                                  reviews=doc.page_content[:self.max_review_chars])
+        try:
+            reply = retry_with_backoff(self.llm.invoke, text, max_retries=self.max_retries, bucket=self.bucket)
+        except Exception as e:
+            # The product is still ingested with its raw reviews; the next run retries it
+            print(f"Warning: review summary failed for {doc.metadata.get('product_id')} — {e}")
+            return None
+        return parse_summary(getattr(reply, "content", reply))
+
+    def summarize_batch(self, documents: List[Document], pool: ThreadPoolExecutor | None = None) -> List[Document]:
+        """Attach summary metadata to the documents (in place), generating only uncached summaries."""
+        eligible = [doc for doc in documents if len(doc.page_content or "") >= self.min_review_chars]
+        if not eligible:
+            return documents
+        keys = [self._key(doc) for doc in eligible]
+        found = self._cached(keys)
+        missing = [(key, doc) for key, doc in zip(keys, eligible) if key not in found]
+        self.cached += len(eligible) - len(missing)
+
+        if missing:
+            if pool is None:
+                generated = [self._generate(doc) for _, doc in missing]
+            else:
+                generated = list(pool.map(self._generate, [doc for _, doc in missing]))
+            rows = [(key, json.dumps(summary, ensure_ascii=False))
+                    for (key, _), summary in zip(missing, generated) if summary is not None]
+            with self._lock, self._db:
+                self._db.executemany("INSERT OR REPLACE INTO summaries VALUES (?, ?)", rows)
+            found.update((key, summary) for (key, _), summary in zip(missing, generated) if summary is not None)
+            self.generated += len(rows)
+            self.failed += len(missing) - len(rows)
+
+        for key, doc in zip(keys, eligible):
+            if found.get(key, {}).get("review_summary"):
+                doc.metadata.update(found[key])
+        return documents
+
+    def iter_summarized(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Yield the documents with summaries attached, ``batch_size`` at a time."""
+        iterator = iter(documents)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            while batch := list(islice(iterator, self.batch_size)):
+                yield from self.summarize_batch(batch, pool)
+
+    def summarize(self, documents: Iterable[Document]) -> List[Document]:
+        documents = list(self.iter_summarized(documents))
+        print(f"Review summaries: {self.generated} generated, {self.cached} cached, {self.failed} failed.")
+        return documents
+
+    def stats(self) -> dict:
+        return {"generated": self.generated, "cached": self.cached, "failed": self.failed}
+
+
+def summarizer_from_config(config: dict, llm_loader) -> Optional[ReviewSummarizer]:
+    """
+    The configured summarizer (ingestion.summaries.enabled), or None.
+    ``llm_loader()`` is only called when summaries are enabled.
+    """
+    summaries_cfg = config.get("ingestion", {}).get("summaries", {})
+    if not summaries_cfg.get("enabled", False):
+        return None
+    return ReviewSummarizer(
+        llm_loader(),
+        summaries_cfg.get("path", os.path.join("data", "cache", "review_summaries.sqlite")),
+        batch_size=summaries_cfg.get("batch_size", 16),
+        max_concurrency=summaries_cfg.get("max_concurrency", 4),
+        requests_per_minute=summaries_cfg.get("requests_per_minute"),
+        max_retries=summaries_cfg.get("max_retries", 5),
+        min_review_chars=summaries_cfg.get("min_review_chars", 400),
+        max_review_chars=summaries_cfg.get("max_review_chars", 6000),
+    )
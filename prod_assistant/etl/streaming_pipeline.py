@@ -0,0 +1,213 @@
+"""
+Bounded-memory ingestion pipeline.
+
+    reader (iterator of Documents) -> [queue] -> embed stage -> [queue] -> write stage
+
+Each stage runs in its own thread and the queues hold at most ``queue_size``
+batches, so peak memory depends on batch_size * queue_size rather than on
+the size of the input. Embedding batch N+1 overlaps with writing batch N, and
+the embed stage keeps up to ``max_concurrency`` batches in flight. Results are
+still handed to the writer in input order, each one as soon as it and the
+batches before it are embedded, even while the input is slow to arrive.
+
+``iter_async`` turns an async generator (e.g. the concurrent scraper) into a
+plain iterator, so a live scrape can be the pipeline's input.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Iterator, List
+
+from langchain_core.documents import Document
+
+_DONE = object()
+
+
+def iter_async(make_agen: Callable[[], AsyncIterator], maxsize: int = 64) -> Iterator:
+    """
+    Iterate an async generator from synchronous code. ``make_agen()`` runs on
+    its own event loop in a background thread and hands items over through a
+    queue of at most ``maxsize`` items, so a slow consumer pauses the producer.
+    Closing the iterator early stops the producer.
+    """
+    items: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    errors: list = []
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def produce():
+        agen = make_agen()
+        try:
+            async for item in agen:
+                if not await asyncio.to_thread(put, item):
+                    break
+        finally:
+            await agen.aclose()
+
+    def run():
+        try:
+            asyncio.run(produce())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(_DONE)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while (item := items.get()) is not _DONE:
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class PipelineStats:
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"PipelineStats(rows={self.rows}, batches={self.batches}, "
+                f"elapsed={self.elapsed:.2f}s, rows_per_sec={self.rows_per_sec:.1f})")
+
+
+class StreamingPipeline:
+    """
+    Run documents through embed and write callables in bounded batches.
+    ``write_fn(batch, embedded)`` receives each batch with the return value of
+    ``embed_fn(batch)``.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[Document]], object],
+                 write_fn: Callable[[List[Document], object], object],
+                 batch_size: int = 64, queue_size: int = 4, log_every: int = 10,
+                 max_concurrency: int = 1):
+        self.embed_fn = embed_fn
+        self.write_fn = write_fn
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.log_every = log_every
+        self.max_concurrency = max(1, max_concurrency)
+
+    def _put(self, q: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def run(self, documents: Iterable[Document]) -> PipelineStats:
+        stats = PipelineStats()
+        to_embed: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        to_write: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors: list = []
+
+        def reader():
+            iterator = iter(documents)
+            try:
+                while True:
+                    batch = list(islice(iterator, self.batch_size))
+                    if not batch or not self._put(to_embed, batch, stop):
+                        break
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                # Stop a generator input (e.g. a live scrape) if the pipeline ended early
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+                self._put(to_embed, _DONE, stop)
+
+        def embedder():
+            in_flight: deque = deque()
+            reading = True
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                try:
+                    while (reading or in_flight) and not stop.is_set():
+                        # The writer gets each batch as soon as it and every batch before it are embedded
+                        if in_flight and in_flight[0][1].done():
+                            head, future = in_flight.popleft()
+                            if not self._put(to_write, (head, future.result()), stop):
+                                break
+                            continue
+                        if not reading or len(in_flight) >= self.max_concurrency:
+                            wait([in_flight[0][1]], timeout=0.1)
+                            continue
+                        try:
+                            # Poll briefly while batches are in flight so a finished head is not held back
+                            batch = to_embed.get(timeout=0.01 if in_flight else 0.1)
+                        except queue.Empty:
+                            continue
+                        if batch is _DONE:
+                            reading = False
+                        else:
+                            in_flight.append((batch, pool.submit(self.embed_fn, batch)))
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+                finally:
+                    for _, future in in_flight:
+                        future.cancel()
+                    self._put(to_write, _DONE, stop)
+
+        threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=embedder, daemon=True)]
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                item = self._get(to_write, stop)
+                if item is _DONE:
+                    break
+                batch, embedded = item
+                self.write_fn(batch, embedded)
+                stats.rows += len(batch)
+                stats.batches += 1
+                stats.elapsed = time.perf_counter() - stats.started
+                if stats.batches % self.log_every == 0:
+                    print(f"Ingested {stats.rows} rows ({stats.rows_per_sec:.1f} rows/sec)")
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            for t in threads:
+                t.join()
+
+        if errors:
+            raise errors[0]
+        stats.elapsed = time.perf_counter() - stats.started
+        return stats
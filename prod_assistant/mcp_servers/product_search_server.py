@@ -1,5 +1,7 @@
+import json
 from mcp.server.fastmcp import FastMCP
 from retriever.retrieval import Retriever  
+from utils.product_record import format_docs
 from langchain_community.tools import DuckDuckGoSearchRun
 
 # Initialize MCP server
@@ -12,32 +14,21 @@ retriever = retriever_obj.load_retriever()
 # LangChain DuckDuckGo tool
 duckduckgo = DuckDuckGoSearchRun()
 
-# ---------- Helpers ----------
-def format_docs(docs) -> str:
-    """Format retriever docs into readable context."""
-    if not docs:
-        return ""
-    formatted_chunks = []
-    for d in docs:
-        meta = d.metadata or {}
-        formatted = (
-            f"Title: {meta.get('product_title', 'N/A')}\n"
-            f"Price: {meta.get('price', 'N/A')}\n"
-            f"Rating: {meta.get('rating', 'N/A')}\n"
-            f"Reviews:\n{d.page_content.strip()}"
-        )
-        formatted_chunks.append(formatted)
-    return "\n\n---\n\n".join(formatted_chunks)
-
 # ---------- MCP Tools ----------
 @mcp.tool()
-async def get_product_info(query: str) -> str:
-    """Retrieve product information for a given query from local retriever."""
+async def get_product_info(query: str, with_scores: bool = False) -> str:
+    """
+    Retrieve product information for a given query from local retriever.
+    With ``with_scores`` the result is JSON: {"context": ..., "scores": [...]}.
+    Scores are [] when nothing was found and null when some results have no
+    score (retriever.compression.mode "llm" or "none").
+    """
     try:
-        docs = retriever.invoke(query)
-        context = format_docs(docs)
-        if not context.strip():
-            return "No local results found."
+        docs = await retriever.ainvoke(query)
+        context = format_docs(docs, empty="No local results found.")
+        if with_scores:
+            scores = [d.metadata["relevance_score"] for d in docs if "relevance_score" in d.metadata]
+            return json.dumps({"context": context, "scores": scores if len(scores) == len(docs) else None})
         return context
     except Exception as e:
         return f"Error retrieving product info: {str(e)}"
@@ -46,7 +37,7 @@ async def get_product_info(query: str) -> str:
 async def web_search(query: str) -> str:
     """Search the web using DuckDuckGo if retriever has no results."""
     try:
-        return duckduckgo.run(query)
+        return await duckduckgo.ainvoke(query)
     except Exception as e:
         return f"Error during web search: {str(e)}"
 
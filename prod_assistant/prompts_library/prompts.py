@@ -5,6 +5,7 @@ import string
 
 class PromptType(str, Enum):
     PRODUCT_BOT = "product_bot"
+    REVIEW_SUMMARY = "review_summary"
     # REVIEW_BOT = "review_bot"
     # COMPARISON_BOT = "comparison_bot"
 
@@ -44,5 +45,21 @@ PROMPT_REGISTRY: Dict[PromptType, PromptTemplate] = {
         YOUR ANSWER:
         """,
         description="Handles ecommerce QnA & product recommendation flows"
+    ),
+    PromptType.REVIEW_SUMMARY: PromptTemplate(
+        """
+        Summarize the customer reviews of the product below for a shopping assistant.
+        Use only what the reviews say. Keep the summary under 40 words and give at most
+        3 pros and 3 cons of a few words each (an empty list when there are none).
+
+        Respond with JSON only, in this format:
+        {{"summary": "...", "pros": ["..."], "cons": ["..."]}}
+
+        PRODUCT: {product_title}
+
+        REVIEWS:
+        {reviews}
+        """,
+        description="Ingestion-time review summary with pros/cons, stored as product metadata"
     )
 }
\ No newline at end of file
@@ -0,0 +1,48 @@
+import os
+from langchain_astradb import AstraDBVectorStore
+from prod_assistant.retriever.local_store import LocalVectorStore
+
+ASTRA_ENV_VARS = ["ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
+
+
+def vector_backend(config: dict) -> str:
+    """Configured vector store backend: "astra" (default) or "local"."""
+    return config.get("vector_store", {}).get("backend", "astra")
+
+
+def required_env_vars(config: dict) -> list:
+    """Environment variables needed for the configured backend (plus the embedding key)."""
+    required = ["GOOGLE_API_KEY"]
+    if vector_backend(config) == "astra":
+        required += ASTRA_ENV_VARS
+    return required
+
+
+def lexical_index_path(config: dict) -> str:
+    """Location of the BM25 index built at ingestion time, one file per collection."""
+    base_path = config.get("retriever", {}).get("hybrid", {}).get("index_dir", os.path.join("data", "lexical_index"))
+    return os.path.join(base_path, f"{config['astra_db']['collection_name']}.json")
+
+
+def load_vector_store(config: dict, embedding):
+    """
+    Build the vector store selected by ``vector_store.backend`` in config.yaml.
+    The local backend keeps one index directory per collection name.
+    """
+    collection_name = config["astra_db"]["collection_name"]
+    backend = vector_backend(config)
+
+    if backend == "local":
+        base_path = config.get("vector_store", {}).get("local_path", os.path.join("data", "vector_index"))
+        return LocalVectorStore(embedding, path=os.path.join(base_path, collection_name))
+
+    if backend == "astra":
+        return AstraDBVectorStore(
+            api_endpoint=os.getenv("ASTRA_DB_API_ENDPOINT"),
+            collection_name=collection_name,
+            token=os.getenv("ASTRA_DB_APPLICATION_TOKEN"),
+            namespace=os.getenv("ASTRA_DB_KEYSPACE"),
+            embedding=embedding,
+        )
+
+    raise ValueError(f"Unsupported vector store backend: {backend}")
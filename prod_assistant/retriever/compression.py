@@ -0,0 +1,159 @@
+import os
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from pydantic import ConfigDict, PrivateAttr
+
+from prod_assistant.retriever.lexical import InvertedIndex, bm25_scores, reciprocal_rank_fusion
+from prod_assistant.retriever.query_constraints import extract_constraints
+
+
+def _doc_key(doc: Document) -> str:
+    return str(doc.metadata.get("product_id") or doc.id or doc.page_content)
+
+
+class ScoredRetriever(BaseRetriever):
+    """
+    Retriever with a score-based compression stage.
+
+    The query is embedded once and the vector store returns candidates with
+    their similarity scores. Candidates below ``score_threshold`` are dropped
+    and the rest are optionally reranked with a local BM25 pass over title and
+    reviews. No LLM call is made per document. The vector similarity is kept
+    in ``metadata["relevance_score"]``.
+
+    With ``lexical_index_path`` set, results are also fused with a BM25 lookup
+    in the local inverted index (reciprocal-rank fusion), so exact title
+    queries are found even when their embedding match is weak. The index is
+    reloaded whenever ingestion rewrites the file. Lexical-only hits get the
+    lowest kept vector score (``score_threshold`` if none was kept) as their
+    ``relevance_score``, so every result carries one for the grader.
+
+    With ``extract_filters``, price and rating constraints in the query
+    ("under 1,00,000 INR", "4+ stars") are pushed down to both searches as
+    metadata filters.
+
+    With a ``card_store`` (see utils/context_cards.py), each returned document
+    gets its pre-rendered prompt card in ``metadata["context_card"]``.
+    """
+
+    vectorstore: VectorStore
+    embeddings: Embeddings
+    k: int = 4
+    fetch_k: int = 20
+    score_threshold: float = 0.6
+    lexical_rerank: bool = True
+    lexical_weight: float = 0.3
+    lexical_index_path: Optional[str] = None
+    rrf_k: int = 60
+    extract_filters: bool = True
+    card_store: Optional[Any] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _lexical_index: Optional[InvertedIndex] = PrivateAttr(default=None)
+    _lexical_mtime: float = PrivateAttr(default=0.0)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        filter = self._filter(query)
+        vector = self.embeddings.embed_query(query)
+        hits = self.vectorstore.similarity_search_with_score_by_vector(vector, k=self.fetch_k, filter=filter)
+        return self._compress(query, hits, filter)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        filter = self._filter(query)
+        vector = await self.embeddings.aembed_query(query)
+        hits = await self.vectorstore.asimilarity_search_with_score_by_vector(vector, k=self.fetch_k, filter=filter)
+        return self._compress(query, hits, filter)
+
+    def _filter(self, query: str) -> Optional[dict]:
+        if not self.extract_filters:
+            return None
+        filter = extract_constraints(query).to_filter()
+        if filter:
+            print(f"Metadata filter pushed down: {filter}")
+        return filter
+
+    def _lexical(self) -> Optional[InvertedIndex]:
+        if not self.lexical_index_path or not os.path.exists(self.lexical_index_path):
+            return None
+        mtime = os.path.getmtime(self.lexical_index_path)
+        if self._lexical_index is None or mtime != self._lexical_mtime:
+            self._lexical_index = InvertedIndex.load(self.lexical_index_path)
+            self._lexical_mtime = mtime
+        return self._lexical_index
+
+    def _compress(self, query: str, hits: List[Tuple[Document, float]],
+                  filter: Optional[dict] = None) -> List[Document]:
+        return self._attach_cards(self._fuse(query, self._filter_and_rerank(query, hits), filter))
+
+    def _attach_cards(self, docs: List[Document]) -> List[Document]:
+        if self.card_store is None or not docs:
+            return docs
+        cards = self.card_store.get_many([_doc_key(doc) for doc in docs])
+        for doc in docs:
+            card = cards.get(_doc_key(doc))
+            if card:
+                doc.metadata["context_card"] = card
+        return docs
+
+    def _filter_and_rerank(self, query: str, hits: List[Tuple[Document, float]]) -> List[Document]:
+        kept = [(doc, score) for doc, score in hits if score >= self.score_threshold]
+        if not kept:
+            return []
+
+        ranked = [score for _, score in kept]
+        if self.lexical_rerank:
+            texts = [f"{d.metadata.get('product_title', '')} {d.page_content}" for d, _ in kept]
+            lexical = bm25_scores(query, texts)
+            top = max(lexical) or 1.0
+            ranked = [
+                (1 - self.lexical_weight) * score + self.lexical_weight * (lex / top)
+                for score, lex in zip(ranked, lexical)
+            ]
+
+        order = sorted(range(len(kept)), key=lambda i: ranked[i], reverse=True)
+        docs = []
+        for i in order:
+            doc, score = kept[i]
+            doc.metadata["relevance_score"] = float(score)
+            docs.append(doc)
+        return docs
+
+    def _fuse(self, query: str, vector_docs: List[Document], filter: Optional[dict] = None) -> List[Document]:
+        index = self._lexical()
+        lexical_hits = index.search(query, k=self.fetch_k, filter=filter) if index is not None else []
+        if not lexical_hits:
+            return vector_docs[: self.k]
+
+        by_key = {}
+        vector_ranking = []
+        for doc in vector_docs:
+            key = _doc_key(doc)
+            by_key.setdefault(key, doc)
+            vector_ranking.append(key)
+
+        lexical_ranking = []
+        for doc, score in lexical_hits:
+            key = _doc_key(doc)
+            by_key.setdefault(key, doc).metadata["lexical_score"] = float(score)
+            lexical_ranking.append(key)
+
+        # Lexical-only hits have no vector similarity: score them like the weakest kept vector hit
+        floor = min((doc.metadata["relevance_score"] for doc in vector_docs), default=self.score_threshold)
+        for doc in by_key.values():
+            doc.metadata.setdefault("relevance_score", floor)
+
+        fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking], k=self.rrf_k)
+        return [by_key[key] for key in fused[: self.k]]
@@ -0,0 +1,168 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import List
+
+from langchain_core.documents import Document
+
+from prod_assistant.retriever.local_store import matches_filter
+from prod_assistant.utils.product_record import ProductRecord
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "can", "for", "how", "i", "in", "is", "it", "me",
+    "of", "on", "or", "please", "show", "suggest", "tell", "the", "to", "what",
+    "which", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with common query stopwords removed."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def bm25_scores(query: str, texts: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Okapi BM25 score of each text against the query, using the given texts
+    as the corpus. Cheap enough to rerank a handful of retrieved candidates.
+    """
+    query_terms = set(tokenize(query))
+    if not query_terms or not texts:
+        return [0.0] * len(texts)
+
+    docs = [Counter(tokenize(t)) for t in texts]
+    lengths = [sum(d.values()) for d in docs]
+    avg_len = (sum(lengths) / len(lengths)) or 1.0
+    n = len(docs)
+
+    scores = []
+    for tf, length in zip(docs, lengths):
+        score = 0.0
+        for term in query_terms:
+            freq = tf.get(term)
+            if not freq:
+                continue
+            df = sum(1 for d in docs if term in d)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * freq * (k1 + 1) / (freq + k1 * (1 - b + b * length / avg_len))
+        scores.append(score)
+    return scores
+
+
+class InvertedIndex:
+    """
+    BM25 inverted index over product titles and review text.
+
+    Title terms are counted ``title_weight`` times so exact title lookups
+    ("iPhone 15 price") rank first. Documents are keyed by product_id; adding
+    an existing id replaces it. Persisted as JSON and re-tokenized on load.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._ids: List[str] = []
+        self._records: List[ProductRecord] = []  # content and metadata per position
+        self._positions: dict = {}
+        self._postings: dict = {}
+        self._lengths: List[int] = []
+        self._deleted: set = set()
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted)
+
+    def _term_counts(self, content: str, metadata) -> Counter:
+        counts = Counter(tokenize(content))
+        # Titles of collapsed near-duplicates (see etl/dedup.py) still find the canonical product
+        titles = [metadata.get("product_title") or ""] + list(metadata.get("alias_titles") or [])
+        for term in tokenize(" ".join(str(t) for t in titles)):
+            counts[term] += self.title_weight
+        return counts
+
+    def add(self, doc_id: str, content: str, metadata: dict):
+        doc_id = str(doc_id)
+        if doc_id in self._positions:
+            self._deleted.add(self._positions[doc_id])
+        pos = len(self._ids)
+        self._positions[doc_id] = pos
+        self._ids.append(doc_id)
+        self._records.append(ProductRecord.from_metadata(metadata, content or ""))
+        counts = self._term_counts(content or "", metadata)
+        self._lengths.append(sum(counts.values()))
+        for term, freq in counts.items():
+            self._postings.setdefault(term, []).append((pos, freq))
+
+    def add_documents(self, documents) -> "InvertedIndex":
+        for doc in documents:
+            meta = doc.metadata or {}
+            self.add(meta.get("product_id") or doc.id, doc.page_content, meta)
+        return self
+
+    def remove(self, doc_id: str):
+        pos = self._positions.pop(str(doc_id), None)
+        if pos is not None:
+            self._deleted.add(pos)
+
+    def search(self, query: str, k: int = 10, filter: dict | None = None):
+        """Return up to k (Document, bm25_score) pairs, best first."""
+        live = len(self)
+        if not live:
+            return []
+        avg_len = sum(self._lengths) / len(self._lengths) or 1.0
+        scores: dict = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (live - len(postings) + 0.5) / (len(postings) + 0.5))
+            for pos, freq in postings:
+                if pos in self._deleted:
+                    continue
+                norm = 1 - self.b + self.b * self._lengths[pos] / avg_len
+                scores[pos] = scores.get(pos, 0.0) + idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+
+        hits = []
+        for pos, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            record = self._records[pos]
+            if filter and not matches_filter(record, filter):
+                continue
+            doc = Document(id=self._ids[pos], page_content=record.reviews, metadata=record.to_metadata())
+            hits.append((doc, score))
+            if len(hits) >= k:
+                break
+        return hits
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        live = [i for i in range(len(self._ids)) if i not in self._deleted]
+        payload = {
+            "ids": [self._ids[i] for i in live],
+            "contents": [self._records[i].reviews for i in live],
+            "metadatas": [self._records[i].to_metadata() for i in live],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "InvertedIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        index = cls()
+        for doc_id, content, meta in zip(payload["ids"], payload["contents"], payload["metadatas"]):
+            index.add(doc_id, content, meta)
+        return index
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Fuse several ranked id lists; an id scores sum(1 / (k + rank)) over the lists it appears in."""
+    fused: dict = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
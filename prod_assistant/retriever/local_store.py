@@ -0,0 +1,270 @@
+"""
+In-process vector index used as an alternative to AstraDB.
+
+Vectors live in a unit-normalized float32 matrix, so a search is a single
+matrix-vector product. Appends go into spare rows that grow geometrically,
+so adding N rows in batches copies O(N) data in total. The index is
+persisted to ``<path>/vectors.npy`` (memory-mapped on load) with the ids,
+texts and metadata in a JSON sidecar.
+In memory, metadata is held as compact ProductRecords rather than dicts.
+Scores follow AstraDB's cosine convention, (1 + cos) / 2, so similarity
+thresholds mean the same thing on both backends.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+from prod_assistant.utils.product_record import ProductRecord
+
+_OPERATORS = {
+    "$eq": lambda v, x: v == x,
+    "$ne": lambda v, x: v != x,
+    "$gt": lambda v, x: v is not None and v > x,
+    "$gte": lambda v, x: v is not None and v >= x,
+    "$lt": lambda v, x: v is not None and v < x,
+    "$lte": lambda v, x: v is not None and v <= x,
+    "$in": lambda v, x: v in x,
+    "$nin": lambda v, x: v not in x,
+}
+
+
+def matches_filter(metadata, filter: Optional[dict]) -> bool:
+    """Evaluate an AstraDB-style metadata filter ({"field": value | {"$op": value}}, $and, $or)."""
+    if not filter:
+        return True
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(matches_filter(metadata, f) for f in condition):
+                return False
+        elif field == "$or":
+            if not any(matches_filter(metadata, f) for f in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(field)
+            try:
+                if not all(_OPERATORS[op](value, x) for op, x in condition.items()):
+                    return False
+            except TypeError:
+                return False
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+
+def _unit_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorStore(VectorStore):
+    """NumPy-backed vector store with upserts, metadata filters and MMR."""
+
+    def __init__(self, embedding: Embeddings, path: Optional[str] = None, autopersist: bool = True):
+        self._embedding = embedding
+        self.path = path
+        self.autopersist = autopersist
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._records: List[ProductRecord] = []
+        self._positions: dict = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        # Writable matrix with spare rows; _vectors is a view of its first len(self) rows
+        self._buffer: Optional[np.ndarray] = None
+        if path and os.path.exists(os.path.join(path, "docs.json")):
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ---------- Persistence ----------
+    def _load(self):
+        with open(os.path.join(self.path, "docs.json"), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        self._ids = payload["ids"]
+        self._texts = payload["texts"]
+        self._records = [ProductRecord.from_metadata(meta) for meta in payload["metadatas"]]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+
+    def persist(self):
+        """Write vectors and sidecar atomically to ``self.path``."""
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            vectors_tmp = os.path.join(self.path, "vectors.tmp.npy")
+            docs_tmp = os.path.join(self.path, "docs.json.tmp")
+            np.save(vectors_tmp, self._vectors)
+            with open(docs_tmp, "w", encoding="utf-8") as f:
+                json.dump({"ids": self._ids, "texts": self._texts,
+                           "metadatas": [record.to_metadata() for record in self._records]}, f)
+            os.replace(vectors_tmp, os.path.join(self.path, "vectors.npy"))
+            os.replace(docs_tmp, os.path.join(self.path, "docs.json"))
+
+    # ---------- Writes ----------
+    def _reserve(self, rows: int, dim: int) -> np.ndarray:
+        """The writable matrix, with room for at least ``rows`` vectors."""
+        buffer = self._buffer
+        if buffer is None or buffer.shape[0] < rows:
+            capacity = max(rows, 64, 2 * (buffer.shape[0] if buffer is not None else 0))
+            grown = np.empty((capacity, dim), dtype=np.float32)
+            # Also copies a freshly loaded (read-only) memory map on the first write
+            if self._ids:
+                grown[:len(self._ids)] = self._vectors[:len(self._ids)]
+            self._buffer = grown
+        return self._buffer
+
+    def add_embeddings(self, texts: Iterable[str], embeddings: List[List[float]],
+                       metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None) -> List[str]:
+        """Upsert precomputed vectors: existing ids are replaced in place."""
+        texts = list(texts)
+        if not texts:
+            # An empty batch has no dimension to size the matrix with
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids else [os.urandom(16).hex() for _ in texts]
+        rows = _unit_rows(embeddings)
+
+        with self._lock:
+            new_ids = {doc_id for doc_id in ids if doc_id not in self._positions}
+            vectors = self._reserve(len(self._ids) + len(new_ids), rows.shape[1])
+            for doc_id, text, meta, row in zip(ids, texts, metadatas, rows):
+                pos = self._positions.get(doc_id)
+                if pos is None:
+                    pos = self._positions[doc_id] = len(self._ids)
+                    self._ids.append(doc_id)
+                    self._texts.append(text)
+                    self._records.append(ProductRecord.from_metadata(meta))
+                else:
+                    self._texts[pos] = text
+                    self._records[pos] = ProductRecord.from_metadata(meta)
+                vectors[pos] = row
+            self._vectors = vectors[:len(self._ids)]
+            if self.autopersist:
+                self.persist()
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, *,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self._embedding.embed_documents(texts), metadatas, ids)
+
+    async def aadd_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, *,
+                         ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        vectors = await self._embedding.aembed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            drop = {self._positions[i] for i in map(str, ids) if i in self._positions}
+            if not drop:
+                return False
+            keep = [i for i in range(len(self._ids)) if i not in drop]
+            self._vectors = np.array(self._vectors[keep]) if keep else self._vectors[:0]
+            self._buffer = self._vectors
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._records = [self._records[i] for i in keep]
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            if self.autopersist:
+                self.persist()
+        return True
+
+    # ---------- Reads ----------
+    def _document(self, pos: int) -> Document:
+        return Document(id=self._ids[pos], page_content=self._texts[pos], metadata=self._records[pos].to_metadata())
+
+    def get_by_ids(self, ids: List[str], /) -> List[Document]:
+        return [self._document(self._positions[i]) for i in ids if i in self._positions]
+
+    def _candidates(self, filter: Optional[dict]) -> np.ndarray:
+        if not filter:
+            return np.arange(len(self._ids))
+        return np.array([i for i, record in enumerate(self._records) if matches_filter(record, filter)],
+                        dtype=np.int64)
+
+    def _top(self, embedding: List[float], k: int, filter: Optional[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions and cosine similarities of the k nearest rows passing the filter."""
+        candidates = self._candidates(filter)
+        if len(candidates) == 0 or k <= 0:
+            return candidates[:0], np.zeros(0, dtype=np.float32)
+        query = _unit_rows(embedding)[0]
+        sims = self._vectors[candidates] @ query if filter else self._vectors @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return candidates[top], sims[top]
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[dict] = None, **kwargs: Any
+                                               ) -> List[Tuple[Document, float]]:
+        with self._lock:
+            positions, sims = self._top(embedding, k, filter)
+            return [(self._document(int(p)), float((1 + s) / 2)) for p, s in zip(positions, sims)]
+
+    async def asimilarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                                      filter: Optional[dict] = None, **kwargs: Any
+                                                      ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    filter: Optional[dict] = None, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                          **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, filter: Optional[dict] = None,
+                                                **kwargs: Any) -> List[Document]:
+        with self._lock:
+            positions, _ = self._top(embedding, fetch_k, filter)
+            if len(positions) == 0:
+                return []
+            chosen = maximal_marginal_relevance(
+                np.asarray(embedding, dtype=np.float32), self._vectors[positions], lambda_mult=lambda_mult, k=k
+            )
+            return [self._document(int(positions[i])) for i in chosen]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5, filter: Optional[dict] = None,
+                                      **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult, filter
+        )
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, *,
+                   ids: Optional[List[str]] = None, path: Optional[str] = None, **kwargs: Any
+                   ) -> "LocalVectorStore":
+        store = cls(embedding, path=path)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
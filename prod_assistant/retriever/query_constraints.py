@@ -0,0 +1,163 @@
+"""
+Structured price / rating constraints extracted from free-text queries.
+
+    extract_constraints("budget iPhone under 1,00,000 INR with 4+ stars")
+    -> QueryConstraints(min_price=None, max_price=100000.0, min_rating=4.0)
+
+The constraints are turned into AstraDB-style metadata filters on the
+numeric ``price_numeric`` / ``rating_numeric`` fields that DataIngestion
+writes (see ``parse_price`` / ``parse_rating``), and pushed down to the
+vector store and the lexical index.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+_CURRENCY = r"(?:₹|£|\$|€|\b(?:rs|inr|gbp|usd|eur)\b\.?)"
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "l": 1e5, "lac": 1e5, "lakh": 1e5, "lakhs": 1e5,
+                "cr": 1e7, "crore": 1e7, "crores": 1e7}
+_AMOUNT = (
+    rf"{_CURRENCY}?\s*(\d[\d,]*(?:\.\d+)?)\s*"
+    r"(?:(k|thousand|lakhs?|lac|l|crores?|cr)\b)?\s*" + rf"{_CURRENCY}?"
+)
+
+_RATING_PATTERNS = [
+    # "4+ stars", "at least 4 stars", "4.5 star", "rated 4/5 or above", "4 out of 5"
+    re.compile(r"(?:at least|minimum|min\.?|above|over|rated|rating)?\s*(\d(?:\.\d)?)\s*(?:\+|plus)?\s*"
+               r"(?:stars?|/\s*5|out of 5)(?:\s*(?:or|and)\s*(?:above|more|up|higher))?"),
+    # "rating above 4", "rating of at least 4.2", "rated 4+"
+    re.compile(r"(?:rating|rated)\s*(?:of\s*)?(?:at least|above|over|>=?|minimum|min\.?)?\s*(\d(?:\.\d)?)\s*\+?"),
+]
+_RANGE = re.compile(rf"(?:between|from)\s*{_AMOUNT}\s*(?:and|to|-)\s*{_AMOUNT}|{_AMOUNT}\s*(?:-|to)\s*{_AMOUNT}")
+# A bare "max"/"min" is usually part of a product name ("iphone 15 pro max"):
+# only "max price", "min budget of" or "max ₹..." count as a bound
+_PRICE_WORD = r"(?:\s*(?:price|budget|cost)(?:\s*(?:of|is))?|(?=\s*" + _CURRENCY + r"))"
+_MAX = re.compile(rf"(?:under|below|less than|cheaper than|within|up ?to|upto|max(?:imum)?{_PRICE_WORD}|at most|"
+                  rf"no more than|not more than|<=?|budget(?: of)?)\s*{_AMOUNT}")
+_MIN = re.compile(rf"(?:over|above|more than|greater than|at least|min(?:imum)?{_PRICE_WORD}|"
+                  rf"starting(?: at| from)?|>=?)\s*{_AMOUNT}")
+_AROUND = re.compile(rf"(?:around|about|approx(?:imately)?|~)\s*{_AMOUNT}")
+_PRICE_TERM = rf"{_CURRENCY}|\b(?:price[sd]?|budget|cost|costing|cheap(?:er|est)?|affordable)\b"
+_PRICE_CONTEXT = re.compile(_PRICE_TERM)
+# A price word right before the amount ("price 500 to 900", "budget of 40 to 60"), not anywhere in the query
+_PRICE_BEFORE = re.compile(rf"(?:{_PRICE_TERM})\s*(?:(?:of|is|range|around|about|:)\s*)*$")
+# An amount followed by one of these is a spec or a count, never a price ("256gb", "5000 mah", "100 reviews")
+_SPEC_UNIT = re.compile(
+    r"\s*(?:[kmgt]b|mah|wh|inch(?:es)?|\"|cm|mm|mp|[kmg]?hz|w|watts?|kg|gm?s?|fps|cores?|%|"
+    r"reviews?|ratings?|stars?|units?|pcs|pieces?|years?|yrs?|months?|days?|hours?|hrs?|mins?|minutes?)(?![a-z])"
+)
+
+
+def _is_price(match: re.Match, text: str) -> bool:
+    """
+    Bare numbers are ambiguous ("iphone 14 to 15", "up to 2 years warranty"):
+    accept them only with a currency/unit, a price word right before them, or a
+    value large enough to be a price, and never when a spec unit follows. A price
+    word elsewhere in the query does not count ("price of iphone 12 to 15").
+    """
+    if _SPEC_UNIT.match(text, match.end()):
+        return False
+    units = [g for g in match.groups()[1::2] if g]
+    numbers = [float(g.replace(",", "")) for g in match.groups()[0::2] if g]
+    return bool(units) or bool(_PRICE_CONTEXT.search(match.group(0)) or _PRICE_BEFORE.search(text, 0, match.start())) \
+        or max(numbers, default=0) >= 100
+
+
+def _first_price(pattern: re.Pattern, text: str) -> Optional[re.Match]:
+    """First match of ``pattern`` that reads as a price ("above 5000 mah ... under 20k" -> "under 20k")."""
+    return next((m for m in pattern.finditer(text) if _is_price(m, text)), None)
+
+
+def _amount(number: str, unit: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    return value * _MULTIPLIERS.get((unit or "").lower(), 1.0)
+
+
+@dataclass
+class QueryConstraints:
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return self.min_price is None and self.max_price is None and self.min_rating is None
+
+    def to_filter(self) -> Optional[dict]:
+        """AstraDB / LocalVectorStore metadata filter, or None when unconstrained."""
+        clauses = []
+        price = {}
+        if self.min_price is not None:
+            price["$gte"] = self.min_price
+        if self.max_price is not None:
+            price["$lte"] = self.max_price
+        if price:
+            clauses.append({"price_numeric": price})
+        if self.min_rating is not None:
+            clauses.append({"rating_numeric": {"$gte": self.min_rating}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def extract_constraints(query: str) -> QueryConstraints:
+    """Parse price ranges, price ceilings/floors and rating floors out of a query."""
+    text = (query or "").lower()
+    constraints = QueryConstraints()
+
+    # Ratings first, so "at least 4 stars" is not read as a price floor
+    for pattern in _RATING_PATTERNS:
+        match = pattern.search(text)
+        if match and float(match.group(1)) <= 5:
+            constraints.min_rating = float(match.group(1))
+            text = text[:match.start()] + " " + text[match.end():]
+            break
+
+    match = _first_price(_RANGE, text)
+    if match:
+        groups = [g for g in match.groups()]
+        low, high = (groups[0:2], groups[2:4]) if groups[0] is not None else (groups[4:6], groups[6:8])
+        low_value, high_value = _amount(*low), _amount(*high)
+        # "50-60k" means 50k-60k
+        if low[1] is None and high[1] is not None:
+            low_value = _amount(low[0], high[1])
+        constraints.min_price, constraints.max_price = sorted((low_value, high_value))
+        return constraints
+
+    match = _first_price(_MAX, text)
+    if match:
+        constraints.max_price = _amount(match.group(1), match.group(2))
+    match = _first_price(_MIN, text)
+    if match:
+        constraints.min_price = _amount(match.group(1), match.group(2))
+    if constraints.min_price is None and constraints.max_price is None:
+        match = _first_price(_AROUND, text)
+        if match:
+            value = _amount(match.group(1), match.group(2))
+            constraints.min_price, constraints.max_price = value * 0.9, value * 1.1
+    return constraints
+
+
+def parse_price(value) -> Optional[float]:
+    """Numeric price from catalog strings such as "₹1,29,999", "Â£51.77" or "$20"."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)", str(value))
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def parse_rating(value) -> Optional[float]:
+    """Numeric rating from "4/5", "4.3 out of 5 stars" or a plain number."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"(\d+(?:\.\d+)?)", str(value))
+    return float(match.group(1)) if match else None
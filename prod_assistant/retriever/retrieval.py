@@ -1,5 +1,4 @@
 import os
-from langchain_astradb import AstraDBVectorStore
 from langchain_core.documents import Document
 from typing import List
 from  prod_assistant.utils.config_loader import load_config
@@ -8,19 +7,22 @@ from dotenv import load_dotenv
 
 from langchain.retrievers import ContextualCompressionRetriever
 from langchain.retrievers.document_compressors import LLMChainFilter
+from prod_assistant.retriever.compression import ScoredRetriever
+from prod_assistant.retriever.backends import lexical_index_path, load_vector_store, required_env_vars
+from prod_assistant.utils.context_cards import card_store_from_config
 
 class Retriever:
     def __init__(self):
+        self.config = load_config()
         self._load_env_variables()
         self.model_loader=ModelLoader()
-        self.config = load_config()
         self.vstore = None
         self.retriever = None
 
     def _load_env_variables(self):
         load_dotenv()
         
-        required_vars = ["GOOGLE_API_KEY", "ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
+        required_vars = required_env_vars(self.config)
         
         missing_vars = [var for var in required_vars if os.getenv(var) is None]
         if missing_vars:
@@ -36,28 +38,48 @@ class Retriever:
         """
         Load the retriever
         """
-        if not self.vstore:
-            collection_name = self.config["astra_db"]["collection_name"]
+        if self.vstore is None:
             embedding = self.model_loader.load_embeddings()
-            self.vstore = AstraDBVectorStore(
-                api_endpoint=self.db_api_endpoint,
-                collection_name=collection_name,
-                token=self.db_application_token,
-                namespace=self.db_keyspace,
-                embedding=embedding,
-            )
+            self.vstore = load_vector_store(self.config, embedding)
 
 
         if not self.retriever:
-            top_k = self.config["retriever"]["top_k"] if "retriever" in self.config else 3
+            retriever_cfg = self.config.get("retriever", {})
+            top_k = retriever_cfg.get("top_k", 3)
+            fetch_k = retriever_cfg.get("fetch_k", 20)
+            compression = retriever_cfg.get("compression", {})
+            mode = compression.get("mode", "similarity")
+            hybrid = retriever_cfg.get("hybrid", {})
+
+            if mode == "similarity":
+                self.retriever = ScoredRetriever(
+                    vectorstore=self.vstore,
+                    embeddings=self.vstore.embeddings,
+                    k=top_k,
+                    fetch_k=fetch_k,
+                    score_threshold=compression.get("similarity_threshold", 0.6),
+                    lexical_rerank=compression.get("lexical_rerank", True),
+                    lexical_weight=compression.get("lexical_weight", 0.3),
+                    lexical_index_path=lexical_index_path(self.config) if hybrid.get("enabled", False) else None,
+                    rrf_k=hybrid.get("rrf_k", 60),
+                    extract_filters=retriever_cfg.get("metadata_filters", True),
+                    card_store=card_store_from_config(self.config),
+                )
+                print("Score-filtered retriever loaded")
+                return self.retriever
+
             mmr_retriever = self.vstore.as_retriever(
                 search_type="mmr",
-                search_kwargs={"k": top_k, "fetch_k": 20,
+                search_kwargs={"k": top_k, "fetch_k": fetch_k,
                 "lambda_mult": 0.7,
                 "score_threshold": 0.3
                 })
             print("MMR Retriever loaded")
 
+            if mode == "none":
+                self.retriever = mmr_retriever
+                return self.retriever
+
             llm = self.model_loader.load_llm()
             print("LLM loaded")
 
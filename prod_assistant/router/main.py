@@ -1,14 +1,27 @@
-
+import json
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from langchain_core.messages import HumanMessage
-from workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+from utils.config_loader import load_config
+from workflow.workflow_pool import WorkflowPool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the AgenticRAG pool once at startup instead of per request."""
+    pool_size = load_config().get("workflow_pool", {}).get("size", 2)
+    app.state.rag_pool = WorkflowPool(size=pool_size)
+    await app.state.rag_pool.start()
+    yield
+    await app.state.rag_pool.close()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
@@ -27,7 +40,28 @@ async def index(request: Request):
 
 
 @app.post("/get")
-async def chat(msg: str = Form(...)):
-    rag_agent = AgenticRAG()
-    answer = await rag_agent.run(msg)
-    return answer
\ No newline at end of file
+async def chat(request: Request, msg: str = Form(...)):
+    answer = await request.app.state.rag_pool.run(msg)
+    return answer
+
+
+@app.get("/stream")
+async def chat_stream(request: Request, msg: str):
+    """Server-Sent Events: node progress, Generator tokens, then the final answer."""
+    async def event_source():
+        try:
+            async for event in request.app.state.rag_pool.astream(msg):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/health")
+async def health(request: Request):
+    return request.app.state.rag_pool.status()
@@ -0,0 +1,101 @@
+"""
+Token-budgeted context assembly for the generator prompt.
+
+The retriever (or web search) hands the generator one block per product:
+a Title/Price/Rating header followed by the reviews. ``assemble_context``
+fits those blocks into ``context_assembly.max_tokens``:
+
+* every product keeps its header (most relevant products first), so the
+  LLM still sees each candidate's price and rating;
+* review text is split into sentences and scored by overlap with the
+  question's terms; the best sentences across all products fill the rest
+  of the budget, and each product lists its chosen sentences best-first;
+* products are ordered by their best sentence, ties keeping retrieval order.
+
+    text, stats = assemble_context(question, context, max_tokens=400)
+    stats  # {"tokens_before": 820, "tokens_after": 396, "sentences_kept": 9, ...}
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from prod_assistant.retriever.lexical import tokenize
+from prod_assistant.utils.context_cards import estimate_tokens
+
+BLOCK_SEPARATOR = "\n\n---\n\n"
+_REVIEWS_MARKER = "Reviews:\n"
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_block(block: str) -> Tuple[str, str]:
+    """(header, body) of a product block; blocks without a Reviews: line are all body."""
+    head, marker, body = block.partition(_REVIEWS_MARKER)
+    if not marker:
+        return "", block
+    return head + marker, body
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if s.strip(" \t…-")]
+
+
+def score_sentence(sentence: str, query_terms: set) -> float:
+    """Share of the question's terms the sentence mentions (0 when the question has none)."""
+    if not query_terms:
+        return 0.0
+    return len(query_terms.intersection(tokenize(sentence))) / len(query_terms)
+
+
+def assemble_context(question: str, context: str, max_tokens: int = 400) -> Tuple[str, Dict[str, int]]:
+    """
+    Fit ``context`` (product blocks joined by ``BLOCK_SEPARATOR``) into about
+    ``max_tokens``, keeping the review sentences that overlap most with
+    ``question``. Returns the assembled text and its token metrics.
+    """
+    tokens_before = estimate_tokens(context)
+    stats = {"tokens_before": tokens_before, "tokens_after": tokens_before,
+             "sentences_total": 0, "sentences_kept": 0}
+    if not context or max_tokens <= 0 or tokens_before <= max_tokens:
+        return context, stats
+
+    query_terms = set(tokenize(question))
+    blocks = [split_block(b) for b in context.split(BLOCK_SEPARATOR) if b.strip()]
+
+    # Headers come first: a product that cannot show its header is dropped
+    budget = max_tokens
+    products = []
+    for rank, (header, body) in enumerate(blocks):
+        cost = estimate_tokens(header) + estimate_tokens(BLOCK_SEPARATOR)
+        if header and cost > budget:
+            break
+        budget -= cost if header else 0
+        products.append({"rank": rank, "header": header, "body": body, "kept": [], "best": float("-inf")})
+
+    candidates = []
+    for product in products:
+        seen = set()
+        for position, sentence in enumerate(split_sentences(product["body"])):
+            if sentence.lower() in seen:  # scraped reviews repeat themselves
+                continue
+            seen.add(sentence.lower())
+            candidates.append((score_sentence(sentence, query_terms), -position, -product["rank"], sentence, product))
+    stats["sentences_total"] = len(candidates)
+
+    # Best overlap first; on a tie, earlier sentences round-robin across products in
+    # retrieval order. A sentence that does not fit is skipped, a shorter one may still fit.
+    candidates.sort(key=lambda c: c[:3], reverse=True)
+    for score, _, _, sentence, product in candidates:
+        cost = estimate_tokens(sentence) + 1
+        if cost > budget:
+            continue
+        budget -= cost
+        if not product["kept"]:
+            product["best"] = score
+        product["kept"].append(sentence)
+        stats["sentences_kept"] += 1
+
+    products = [p for p in products if p["header"] or p["kept"]]
+    products.sort(key=lambda p: (-p["best"], p["rank"]))
+    text = BLOCK_SEPARATOR.join(p["header"] + " ".join(p["kept"]) for p in products)
+    stats["tokens_after"] = estimate_tokens(text)
+    return text, stats
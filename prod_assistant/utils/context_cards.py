@@ -0,0 +1,109 @@
+"""
+Pre-rendered, token-budgeted prompt context per product.
+
+Ingestion renders each product's Title/Price/Rating/Reviews card once, with
+the reviews trimmed to ``context_cards.max_tokens``, and stores it in a
+local SQLite key-value store keyed by product_id (the card id). The
+retriever attaches the ready card to each hit as ``metadata["context_card"]``
+and ``format_docs`` uses it verbatim, so popular products are no longer
+re-formatted on every query.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prod_assistant.utils.product_record import ProductRecord
+
+CHARS_PER_TOKEN = 4  # rough average for English text with Gemini / GPT tokenizers
+_SENTENCE_END = re.compile(r"[.!?](?=\s)")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency); errs on the high side for short strings."""
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text to about ``max_tokens``, at a sentence (or else word) boundary, marking the cut with "…"."""
+    text = (text or "").strip()
+    if max_tokens <= 0:
+        return ""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    head = text[:limit - 1]
+    sentences = [m.end() for m in _SENTENCE_END.finditer(head)]
+    if sentences and sentences[-1] > limit // 2:
+        return head[:sentences[-1]] + " …"
+    space = head.rfind(" ")
+    return (head[:space] if space > limit // 2 else head).rstrip() + "…"
+
+
+def render_card(record: ProductRecord, max_tokens: int = 200) -> str:
+    """The product's prompt block, with its reviews (or their summary) cut so the whole card fits ``max_tokens``."""
+    header = record.header()
+    return header + truncate_to_tokens(record.review_text(), max_tokens - estimate_tokens(header))
+
+
+class ContextCardStore:
+    """SQLite card_id -> (card, tokens) store with an in-memory LRU for hot products."""
+
+    def __init__(self, path: str, max_memory_entries: int = 5000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS cards (card_id TEXT PRIMARY KEY, card TEXT, tokens INTEGER)")
+        self._db.commit()
+
+    def put_many(self, cards: Iterable[Tuple[str, str]]):
+        rows = [(str(card_id), card, estimate_tokens(card)) for card_id, card in cards]
+        if not rows:
+            return
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO cards VALUES (?, ?, ?)", rows)
+            for card_id, _, _ in rows:
+                self._memory.pop(card_id, None)
+
+    def get_many(self, card_ids: List[str]) -> Dict[str, str]:
+        found, missing = {}, []
+        with self._lock:
+            for card_id in card_ids:
+                card = self._memory.get(card_id)
+                if card is None:
+                    missing.append(card_id)
+                else:
+                    self._memory.move_to_end(card_id)
+                    found[card_id] = card
+            if missing:
+                marks = ",".join("?" * len(missing))
+                for card_id, card in self._db.execute(
+                    f"SELECT card_id, card FROM cards WHERE card_id IN ({marks})", missing
+                ):
+                    found[card_id] = card
+                    self._memory[card_id] = card
+                while len(self._memory) > self.max_memory_entries:
+                    self._memory.popitem(last=False)
+        return found
+
+    def remove(self, card_ids: Iterable[str]):
+        card_ids = [str(card_id) for card_id in card_ids]
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM cards WHERE card_id = ?", [(card_id,) for card_id in card_ids])
+            for card_id in card_ids:
+                self._memory.pop(card_id, None)
+
+
+def card_store_from_config(config: dict) -> Optional[ContextCardStore]:
+    """The configured card store (context_cards.enabled), or None."""
+    cards_cfg = config.get("context_cards", {})
+    if not cards_cfg.get("enabled", False):
+        return None
+    return ContextCardStore(cards_cfg.get("path", os.path.join("data", "context_cards.sqlite")),
+                            max_memory_entries=cards_cfg.get("max_memory_entries", 5000))
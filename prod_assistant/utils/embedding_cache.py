@@ -0,0 +1,219 @@
+"""
+Caching wrapper for LangChain embedding models.
+
+Vectors are keyed by (model name, query/document mode, normalized text) and
+looked up in two tiers:
+  1. a bounded in-memory LRU of float32 arrays, private to the process;
+  2. an on-disk store shared by every process using the same cache_dir:
+     raw float32 rows in ``vectors.f32`` (read through a memory map) plus a
+     SQLite index mapping key -> row.
+
+Usage:
+    embeddings = CachedEmbeddings(GoogleGenerativeAIEmbeddings(...), model_name, cache_dir="data/cache/embeddings")
+    embeddings.embed_query("budget iphone")
+    embeddings.stats()
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class _DiskTier:
+    """Append-only float32 vector file with a SQLite key index."""
+
+    def __init__(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, row INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS vectors_row ON vectors (row)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._mmap = None
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim = row[0] if row else None
+
+    def _rows_on_disk(self) -> int:
+        if not self.dim or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _view(self, max_row: int):
+        """Memory map of the vector file, re-opened when other writers have grown it."""
+        if self._mmap is None or max_row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                   shape=(self._rows_on_disk(), self.dim))
+        return self._mmap
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        if not keys or not self.dim:
+            return {}
+        with self._lock:
+            found = {}
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                found.update(self._db.execute(
+                    f"SELECT key, row FROM vectors WHERE key IN ({marks})", chunk
+                ).fetchall())
+            if not found:
+                return {}
+            view = self._view(max(found.values()))
+            # Copied out of the map, so cached rows do not keep old maps alive
+            return {key: np.array(view[row]) for key, row in found.items()}
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            # BEGIN IMMEDIATE takes the SQLite write lock, serializing appends across processes
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self.dim is None:
+                    row = self._db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+                    self.dim = row[0] if row else len(next(iter(items.values())))
+                    self._db.execute("INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (self.dim,))
+
+                keys = list(items)
+                marks = ",".join("?" * len(keys))
+                existing = {k for (k,) in self._db.execute(
+                    f"SELECT key FROM vectors WHERE key IN ({marks})", keys)}
+                new_keys = [k for k in keys if k not in existing and len(items[k]) == self.dim]
+                if new_keys:
+                    # Rows past the last indexed one are a torn or rolled-back append: cut them off
+                    # so the new rows start exactly where the index says
+                    first_row = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM vectors").fetchone()[0]
+                    block = np.asarray([items[k] for k in new_keys], dtype=np.float32)
+                    with open(self.vectors_path, "ab") as f:
+                        f.truncate(first_row * self.dim * 4)
+                        f.write(block.tobytes())
+                    self._db.executemany(
+                        "INSERT INTO vectors VALUES (?, ?)",
+                        [(k, first_row + i) for i, k in enumerate(new_keys)],
+                    )
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper with an in-memory LRU and an optional shared disk tier.
+    Vectors are cached as float32 arrays (12 KB each at 3072 dims, a quarter of
+    a list of Python floats) and converted to lists only when returned.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str, cache_dir: str | None = None,
+                 max_memory_entries: int = 10000):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(cache_dir) if cache_dir else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str, mode: str) -> str:
+        # Query and document embeddings differ (task type), so they are cached separately
+        raw = f"{self.model_name}\x00{mode}\x00{_normalize(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+        self.memory_hits += len(found)
+
+        if self._disk is not None:
+            remaining = [k for k in dict.fromkeys(keys) if k not in found]
+            from_disk = self._disk.get_many(remaining)
+            self.disk_hits += len(from_disk)
+            self._remember(from_disk)
+            found.update(from_disk)
+        return found
+
+    def _store(self, items: Dict[str, Sequence[float]]) -> Dict[str, np.ndarray]:
+        items = {key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()}
+        self._remember(items)
+        if self._disk is not None:
+            self._disk.put_many(items)
+        return items
+
+    def _split(self, texts: List[str], mode: str):
+        keys = [self._key(t, mode) for t in texts]
+        found = self._lookup(keys)
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.misses += len(missing)
+        return keys, found, missing
+
+    def prime(self, texts: List[str], vectors: Sequence[Sequence[float]], mode: str = "document"):
+        """Seed the cache with precomputed vectors (e.g. from an embedding snapshot)."""
+        self._store({self._key(t, mode): v for t, v in zip(texts, vectors)})
+
+    # ---------- Embeddings interface ----------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._split(texts, "document")
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            found.update(self._store(dict(zip(missing, vectors))))
+        return [found[k].tolist() for k in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._split(texts, "document")
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            found.update(self._store(dict(zip(missing, vectors))))
+        return [found[k].tolist() for k in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._split([text], "query")
+        if missing:
+            found.update(self._store({keys[0]: self.underlying.embed_query(text)}))
+        return found[keys[0]].tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._split([text], "query")
+        if missing:
+            found.update(self._store({keys[0]: await self.underlying.aembed_query(text)}))
+        return found[keys[0]].tolist()
+
+    def stats(self) -> dict:
+        total = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": sum(v.nbytes for v in self._memory.values()),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / total, 3) if total else 0.0,
+        }
@@ -3,6 +3,7 @@ import sys
 import json
 from dotenv import load_dotenv
 from prod_assistant.utils.config_loader import load_config
+from prod_assistant.utils.embedding_cache import CachedEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
@@ -46,7 +47,8 @@ class ModelLoader:
 
     def load_embeddings(self):
         """
-        Load and return embedding model from Google Generative AI.
+        Load and return embedding model from Google Generative AI,
+        wrapped in CachedEmbeddings when embedding_cache is enabled.
         """
         try:
             model_name = self.config["embedding_model"]["model_name"]
@@ -58,10 +60,21 @@ class ModelLoader:
             except RuntimeError:
                 asyncio.set_event_loop(asyncio.new_event_loop())
 
-            return GoogleGenerativeAIEmbeddings(
+            embeddings = GoogleGenerativeAIEmbeddings(
                 model=model_name,
                 google_api_key=self.api_key_mgr.get("GOOGLE_API_KEY")  # type: ignore
             )
+
+            cache_cfg = self.config.get("embedding_cache", {})
+            if not cache_cfg.get("enabled", False):
+                return embeddings
+            log.info("Embedding cache enabled", cache_dir=cache_cfg.get("cache_dir"))
+            return CachedEmbeddings(
+                embeddings,
+                model_name,
+                cache_dir=cache_cfg.get("cache_dir"),
+                max_memory_entries=cache_cfg.get("max_memory_entries", 10000),
+            )
         except Exception as e:
             log.error("Error loading embedding model", error=str(e))
             raise ProductAssistantException("Failed to load embedding model", sys)
@@ -0,0 +1,161 @@
+"""
+Compact product record shared by the scraper, ingestion, the local vector
+store and prompt-context formatting.
+
+A ``ProductRecord`` holds the catalog fields in ``__slots__`` instead of a
+per-product metadata dict (less than half the memory per product), and
+converts to and from LangChain Documents by reference: strings and values
+are shared, never copied.
+
+    record = ProductRecord.from_row(csv_row)
+    doc = record.to_document()                 # metadata as written by DataIngestion
+    ProductRecord.from_document(doc).render()  # "Title: ...\nPrice: ...\n..."
+    format_docs(docs)                          # context block for the LLM prompt
+"""
+
+from typing import Iterable, Optional
+
+from langchain_core.documents import Document
+
+from prod_assistant.retriever.query_constraints import parse_price, parse_rating
+
+# Metadata keys in the order DataIngestion writes them
+METADATA_FIELDS = ("product_id", "product_title", "rating", "total_reviews", "price",
+                   "price_numeric", "rating_numeric")
+_FIELDS = frozenset(METADATA_FIELDS)
+_MISSING = object()  # field absent from the source metadata (not the same as None)
+
+NO_DOCUMENTS = "No relevant documents found."
+
+
+class ProductRecord:
+    __slots__ = METADATA_FIELDS + ("reviews", "extra")
+
+    def __init__(self, product_id=None, product_title=None, rating=None, total_reviews=None, price=None,
+                 price_numeric=None, rating_numeric=None, reviews: str = "", extra: Optional[dict] = None):
+        self.product_id = product_id
+        self.product_title = product_title
+        self.rating = rating
+        self.total_reviews = total_reviews
+        self.price = price
+        self.price_numeric = price_numeric
+        self.rating_numeric = rating_numeric
+        self.reviews = reviews
+        # Any other metadata (aliases, relevance_score, ...); None when there is none
+        self.extra = extra
+
+    # ---------- Construction ----------
+    @classmethod
+    def from_row(cls, row: dict) -> "ProductRecord":
+        """
+        From a product row (product_id, product_title, rating, total_reviews, price, top_reviews).
+        Values are kept as text whatever the reader parsed them as, so a product hashes the
+        same from a CSV, a DataFrame or a live scrape.
+        """
+        row = {key: None if value is None else str(value) for key, value in row.items()}
+        return cls(
+            row["product_id"], row["product_title"], row["rating"], row["total_reviews"], row["price"],
+            # Numeric copies so price/rating constraints can be pushed down as filters
+            parse_price(row["price"]), parse_rating(row["rating"]),
+            reviews=row["top_reviews"] or "",
+        )
+
+    @classmethod
+    def from_book(cls, book: dict) -> "ProductRecord":
+        """From a BooksToScrapeScraper book record."""
+        # The site has no real reviews: the description stands in for them
+        return cls.from_row({
+            "product_id": book.get("upc", "N/A"),
+            "product_title": book.get("title", "N/A"),
+            "rating": f"{book.get('rating', 0)}/5",
+            "total_reviews": "0",
+            "price": book.get("price", "N/A"),
+            "top_reviews": book.get("description", "") or "No description available.",
+        })
+
+    @classmethod
+    def from_metadata(cls, metadata: dict, reviews: str = "") -> "ProductRecord":
+        record = cls.__new__(cls)
+        for field in METADATA_FIELDS:
+            setattr(record, field, metadata.get(field, _MISSING))
+        record.reviews = reviews
+        record.extra = {k: v for k, v in metadata.items() if k not in _FIELDS} or None
+        return record
+
+    @classmethod
+    def from_document(cls, doc: Document) -> "ProductRecord":
+        return cls.from_metadata(doc.metadata or {}, doc.page_content)
+
+    # ---------- Conversion ----------
+    def get(self, key: str, default=None):
+        """dict-style metadata lookup, so records work wherever metadata dicts did."""
+        if key in _FIELDS:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def to_metadata(self) -> dict:
+        metadata = {field: value for field in METADATA_FIELDS
+                    if (value := getattr(self, field)) is not _MISSING}
+        if self.extra:
+            metadata.update(self.extra)
+        return metadata
+
+    def to_document(self) -> Document:
+        return Document(page_content=self.reviews, metadata=self.to_metadata())
+
+    def to_row(self) -> dict:
+        """The CSV / ingestion row for this product."""
+        return {
+            "product_id": self.get("product_id"),
+            "product_title": self.get("product_title"),
+            "rating": self.get("rating"),
+            "total_reviews": self.get("total_reviews"),
+            "price": self.get("price"),
+            "top_reviews": self.reviews,
+        }
+
+    # ---------- Formatting ----------
+    def header(self) -> str:
+        return (
+            f"Title: {self.get('product_title', 'N/A')}\n"
+            f"Price: {self.get('price', 'N/A')}\n"
+            f"Rating: {self.get('rating', 'N/A')}\n"
+            f"Reviews:\n"
+        )
+
+    def review_text(self) -> str:
+        """What the prompt shows for the reviews: the ingestion-time summary if there is one."""
+        summary = self.get("review_summary")
+        if not summary:
+            return (self.reviews or "").strip()
+        parts = [summary.strip()]
+        if self.get("review_pros"):
+            parts.append("Pros: " + "; ".join(self.get("review_pros")) + ".")
+        if self.get("review_cons"):
+            parts.append("Cons: " + "; ".join(self.get("review_cons")) + ".")
+        return "\n".join(parts)
+
+    def render(self) -> str:
+        """The product's block in the prompt context."""
+        return self.header() + self.review_text()
+
+    def __repr__(self):
+        return f"ProductRecord(product_id={self.get('product_id')!r}, product_title={self.get('product_title')!r})"
+
+
+def render_context(doc) -> str:
+    """A document's (or ProductRecord's) prompt block: its pre-rendered context card if it has one."""
+    record = doc if isinstance(doc, ProductRecord) else None
+    card = record.get("context_card") if record is not None else (doc.metadata or {}).get("context_card")
+    if card:
+        return card
+    return (record or ProductRecord.from_document(doc)).render()
+
+
+def format_docs(docs: Iterable, empty: str = NO_DOCUMENTS) -> str:
+    """Format retrieved documents (or ProductRecords) into a structured text block for the prompt."""
+    blocks = [render_context(d) for d in docs or []]
+    if not blocks:
+        return empty
+    return "\n\n---\n\n".join(blocks)
@@ -0,0 +1,106 @@
+"""
+Rate limiting and retry helpers shared by ingestion and the scraper.
+
+    bucket = TokenBucket(rate=100 / 60)           # 100 requests per minute
+    bucket.acquire()                              # blocking
+    await bucket.aacquire()                       # asyncio
+    retry_with_backoff(embeddings.embed_documents, texts, max_retries=5)
+    retry_with_backoff(embeddings.embed_documents, texts, bucket=bucket)   # a token per attempt
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_TEXT = re.compile(
+    r"\b(429|500|502|503|504)\b|resource.?exhausted|rate.?limit|quota|unavailable|deadline.?exceeded|timed? ?out",
+    re.IGNORECASE,
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens now (possibly going negative) and return how long to wait for them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: float = 1.0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for HTTP 429/5xx style failures (rate limits, quota, transient server errors)."""
+    for attr in ("status_code", "status", "code"):
+        value = getattr(exc, attr, None)
+        value = value() if callable(value) else value
+        if isinstance(value, int) and value in _RETRYABLE_STATUS:
+            return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) in _RETRYABLE_STATUS:
+        return True
+    return bool(_RETRYABLE_TEXT.search(str(exc)))
+
+
+def _backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def retry_with_backoff(fn, *args, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 30.0,
+                       bucket: TokenBucket | None = None, **kwargs):
+    """
+    Call ``fn`` until it succeeds, backing off on retryable errors. With a
+    ``bucket``, every attempt (retries included) first takes a token, so
+    retries count against the same request budget as first attempts.
+    """
+    for attempt in range(max_retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff(attempt, base_delay, max_delay)
+            log.warning("Retryable error, backing off", attempt=attempt + 1, delay=round(delay, 2), error=str(e))
+            time.sleep(delay)
+
+
+async def aretry_with_backoff(fn, *args, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 30.0,
+                              bucket: TokenBucket | None = None, **kwargs):
+    for attempt in range(max_retries + 1):
+        if bucket is not None:
+            await bucket.aacquire()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff(attempt, base_delay, max_delay)
+            log.warning("Retryable error, backing off", attempt=attempt + 1, delay=round(delay, 2), error=str(e))
+            await asyncio.sleep(delay)
@@ -0,0 +1,230 @@
+"""
+Semantic answer cache.
+
+Answers are keyed by the query embedding: a new query whose cosine similarity
+to a cached query is above the threshold reuses that answer. The price /
+rating constraints parsed from the query (``extract_constraints``) must match
+exactly as well, so "iphone under 50k" never reuses the answer to "iphone
+under 60k" however close their embeddings are. Entries expire
+after a TTL and the least recently used entry is evicted when the cache is
+full. Everything is dropped when the catalog version changes, i.e. when
+DataIngestion writes new products (see ``bump_catalog_version``).
+
+Usage:
+    cache = build_answer_cache(model_loader)
+    answer, vector = await cache.alookup(query)
+    if answer is None:
+        ...
+        cache.put(query, vector, answer)
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from prod_assistant.retriever.query_constraints import extract_constraints
+
+CATALOG_VERSION_FILE = os.path.join("data", ".catalog_version")
+
+
+def read_catalog_version(path: str = CATALOG_VERSION_FILE) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def bump_catalog_version(path: str = CATALOG_VERSION_FILE) -> str:
+    """Mark the catalog as changed; every answer cache sees it on its next lookup."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    version = uuid.uuid4().hex
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, path)
+    return version
+
+
+def _normalize(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+def constraint_scope(query: str) -> str:
+    """Canonical form of the query's metadata filter; answers are only shared within one scope."""
+    return json.dumps(extract_constraints(query).to_filter(), sort_keys=True)
+
+
+class SemanticCache:
+    """In-memory LRU/TTL answer cache with an optional SQLite backing file."""
+
+    def __init__(self, embeddings, similarity_threshold: float = 0.95, ttl_seconds: float = 3600,
+                 max_entries: int = 1000, persist_path: str | None = None,
+                 version_file: str = CATALOG_VERSION_FILE):
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_file = version_file
+
+        # key -> (unit vector, answer, created_at, constraint scope)
+        self._entries: "OrderedDict[str, tuple[np.ndarray, str, float, str]]" = OrderedDict()
+        self._matrix = None
+        self._keys: list[str] = []
+        self._scopes: np.ndarray | None = None
+        self._lock = threading.Lock()
+        self._version = read_catalog_version(version_file)
+        self.hits = 0
+        self.misses = 0
+
+        self._db = None
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(answers)")]
+            if columns and "constraints" not in columns:
+                # Written before answers were scoped by constraints
+                self._db.execute("DROP TABLE answers")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, vector BLOB, answer TEXT, created_at REAL, catalog_version TEXT, "
+                "constraints TEXT)"
+            )
+            self._load()
+
+    # ---------- Persistence ----------
+    def _load(self):
+        cutoff = time.time() - self.ttl_seconds
+        self._db.execute(
+            "DELETE FROM answers WHERE created_at < ? OR catalog_version != ?", (cutoff, self._version)
+        )
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, vector, answer, created_at, constraints FROM answers ORDER BY created_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, blob, answer, created_at, scope in reversed(rows):
+            self._entries[key] = (np.frombuffer(blob, dtype=np.float32), answer, created_at, scope)
+        self._matrix = None
+
+    def _persist(self, key: str, vector: np.ndarray, answer: str, created_at: float, scope: str):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+            (key, vector.astype(np.float32).tobytes(), answer, created_at, self._version, scope),
+        )
+        self._db.commit()
+
+    def _forget(self, keys: list[str]):
+        for key in keys:
+            self._entries.pop(key, None)
+        self._matrix = None
+        if self._db is not None and keys:
+            self._db.executemany("DELETE FROM answers WHERE key = ?", [(k,) for k in keys])
+            self._db.commit()
+
+    # ---------- Invalidation ----------
+    def _check_version(self):
+        version = read_catalog_version(self.version_file)
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self._matrix = None
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._forget(list(self._entries))
+
+    # ---------- Lookup ----------
+    def _lookup(self, key: str, vector: np.ndarray | None, scope: str | None = None,
+                count_miss: bool = True) -> str | None:
+        with self._lock:
+            self._check_version()
+            now = time.time()
+
+            expired = [k for k, (_, _, created, _) in self._entries.items() if now - created > self.ttl_seconds]
+            if expired:
+                self._forget(expired)
+
+            match = key if key in self._entries else None
+            if match is None and vector is not None and self._entries:
+                if self._matrix is None:
+                    self._keys = list(self._entries)
+                    self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+                    self._scopes = np.array([self._entries[k][3] for k in self._keys], dtype=object)
+                sims = np.where(self._scopes == scope, self._matrix @ vector, -np.inf)
+                best = int(np.argmax(sims))
+                if sims[best] >= self.similarity_threshold:
+                    match = self._keys[best]
+
+            if match is None:
+                self.misses += count_miss
+                return None
+            self.hits += 1
+            self._entries.move_to_end(match)
+            return self._entries[match][1]
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    async def alookup(self, query: str) -> tuple[str | None, np.ndarray | None]:
+        """
+        Return (answer, query_vector). An exact repeat of a cached query is
+        answered without embedding it; the vector is None in that case.
+        """
+        key = _normalize(query)
+        answer = self._lookup(key, None, count_miss=False)
+        if answer is not None:
+            return answer, None
+        vector = self._unit(await self.embeddings.aembed_query(query))
+        return self._lookup(key, vector, constraint_scope(query)), vector
+
+    def put(self, query: str, vector: np.ndarray, answer: str):
+        key = _normalize(query)
+        scope = constraint_scope(query)
+        created_at = time.time()
+        with self._lock:
+            self._entries[key] = (vector, answer, created_at, scope)
+            self._entries.move_to_end(key)
+            self._matrix = None
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._forget(list(self._entries)[:overflow])
+            self._persist(key, vector, answer, created_at, scope)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def build_answer_cache(model_loader) -> SemanticCache | None:
+    """Create the answer cache from the ``answer_cache`` config block (None if disabled)."""
+    cache_cfg = model_loader.config.get("answer_cache", {})
+    if not cache_cfg.get("enabled", False):
+        return None
+    return SemanticCache(
+        model_loader.load_embeddings(),
+        similarity_threshold=cache_cfg.get("similarity_threshold", 0.95),
+        ttl_seconds=cache_cfg.get("ttl_seconds", 3600),
+        max_entries=cache_cfg.get("max_entries", 1000),
+        persist_path=cache_cfg.get("persist_path"),
+    )
@@ -5,12 +5,13 @@ from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 
-from prompt_library.prompts import PROMPT_REGISTRY, PromptType
+from prompts_library.prompts import PROMPT_REGISTRY, PromptType
 from retriever.retrieval import Retriever
 from utils.model_loader import ModelLoader
+from utils.product_record import format_docs
 from langgraph.checkpoint.memory import MemorySaver
 import asyncio
-from evaluation.ragas_eval import evaluate_context_precision, evaluate_response_relevancy
+from evaluation.ragas_evaluation import evaluate_context_precision, evaluate_response_relevancy
 
 
 class AgenticRAG:
@@ -27,22 +28,6 @@ class AgenticRAG:
         self.workflow = self._build_workflow()
         self.app = self.workflow.compile(checkpointer=self.checkpointer)
 
-    # ---------- Helpers ----------
-    def _format_docs(self, docs) -> str:
-        if not docs:
-            return "No relevant documents found."
-        formatted_chunks = []
-        for d in docs:
-            meta = d.metadata or {}
-            formatted = (
-                f"Title: {meta.get('product_title', 'N/A')}\n"
-                f"Price: {meta.get('price', 'N/A')}\n"
-                f"Rating: {meta.get('rating', 'N/A')}\n"
-                f"Reviews:\n{d.page_content.strip()}"
-            )
-            formatted_chunks.append(formatted)
-        return "\n\n---\n\n".join(formatted_chunks)
-
     # ---------- Nodes ----------
     def _ai_assistant(self, state: AgentState):
         print("--- CALL ASSISTANT ---")
@@ -65,7 +50,7 @@ class AgenticRAG:
         query = state["messages"][-1].content
         retriever = self.retriever_obj.load_retriever()
         docs = retriever.invoke(query)
-        context = self._format_docs(docs)
+        context = format_docs(docs)
         return {"messages": [HumanMessage(content=context)]}
 
     def _grade_documents(self, state: AgentState) -> Literal["generator", "rewriter"]:
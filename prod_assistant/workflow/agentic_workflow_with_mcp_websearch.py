@@ -6,42 +6,114 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import MemorySaver
 
-from prompt_library.prompts import PROMPT_REGISTRY, PromptType
+from prompts_library.prompts import PROMPT_REGISTRY, PromptType
 from retriever.retrieval import Retriever
 from utils.model_loader import ModelLoader
-from evaluation.ragas_eval import evaluate_context_precision, evaluate_response_relevancy
+from utils.semantic_cache import build_answer_cache
+from utils.context_assembly import assemble_context
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from collections import Counter
 import asyncio
+import json
+import time
+
+MCP_SERVERS = {
+    "hybrid_search": {
+        "transport": "streamable_http",
+        "url": "http://localhost:8000/mcp"
+    }
+}
+
+# Graph runnables reported to streaming clients as progress steps
+PROGRESS_STEPS = {
+    "Assistant": "Assistant",
+    "Retriever": "Retriever",
+    "_grade_documents": "Grader",
+    "Rewriter": "Rewriter",
+    "WebSearch": "WebSearch",
+    "Generator": "Generator",
+}
+
+# How often each grading path fires (shared by every instance in the process)
+GRADE_PATHS = Counter()
+
+# Prompt-context tokens before/after assembly and generation latency (same scope), per arm:
+# "assembled" generations use the token-budgeted context, "full" ones (every
+# context_assembly.holdout_every-th, when that opt-in holdout is set) the raw context, as a latency baseline
+GENERATION_STATS = Counter()
+
+
+def generation_report() -> dict:
+    """Average context size and generation latency of the assembled and full-context arms."""
+    report = {}
+    for arm in ("assembled", "full"):
+        count = GENERATION_STATS[f"{arm}_generations"]
+        report[arm] = {
+            "generations": count,
+            "avg_context_tokens_before": round(GENERATION_STATS[f"{arm}_tokens_before"] / count) if count else None,
+            "avg_context_tokens": round(GENERATION_STATS[f"{arm}_tokens_after"] / count) if count else None,
+            "avg_generation_ms": round(GENERATION_STATS[f"{arm}_generation_ms"] / count) if count else None,
+        }
+    return report
 
 class AgenticRAG:
     """Agentic RAG pipeline using LangGraph + MCP (Retriever + WebSearch)."""
 
     class AgentState(TypedDict):
         messages: Annotated[Sequence[BaseMessage], add_messages]
+        retrieval_scores: list[float] | None
 
     # ---------- Initialization ----------
-    def __init__(self):
-        self.retriever_obj = Retriever()
-        self.model_loader = ModelLoader()
-        self.llm = self.model_loader.load_llm()
+    def __init__(self, llm=None, model_loader=None, retriever_obj=None, mcp_client=None, mcp_tools=None,
+                 answer_cache=None):
+        """
+        Shared resources (LLM, retriever, MCP client/tools, answer cache) may be
+        injected so that a warm pool of instances can reuse them instead of
+        rebuilding per request.
+        """
+        self.model_loader = model_loader or ModelLoader()
+        self.retriever_obj = retriever_obj or Retriever()
+        self.llm = llm or self.model_loader.load_llm()
+        if answer_cache is None:
+            answer_cache = build_answer_cache(self.model_loader)
+        self.answer_cache = answer_cache
         self.checkpointer = MemorySaver()
+        # MCP tool calls that raised; a pool replaces the instance (and re-discovers tools)
+        self.tool_errors = 0
+
+        grader_cfg = self.model_loader.config.get("grader", {})
+        self.grade_high = grader_cfg.get("high_threshold", 0.8)
+        self.grade_low = grader_cfg.get("low_threshold", 0.65)
+        compression_cfg = self.model_loader.config.get("retriever", {}).get("compression", {})
+        if compression_cfg.get("mode", "similarity") == "similarity":
+            # Retrieval already drops everything under similarity_threshold, so a lower
+            # grader threshold would never route anything to the rewriter
+            floor = compression_cfg.get("similarity_threshold", 0.6)
+            if self.grade_low <= floor:
+                raise ValueError(f"grader.low_threshold ({self.grade_low}) must be above "
+                                 f"retriever.compression.similarity_threshold ({floor})")
+
+        assembly_cfg = self.model_loader.config.get("context_assembly", {})
+        self.context_budget = assembly_cfg.get("max_tokens", 400) if assembly_cfg.get("enabled", True) else 0
+        self.holdout_every = assembly_cfg.get("holdout_every", 0) if self.context_budget else 0
+        retrieved = (self.model_loader.config.get("retriever", {}).get("top_k", 4)
+                     * self.model_loader.config.get("context_cards", {}).get("max_tokens", 200))
+        if self.context_budget >= retrieved:
+            print(f"Warning: context_assembly.max_tokens ({self.context_budget}) is not below "
+                  f"retriever.top_k x context_cards.max_tokens ({retrieved}); retrieved context is never trimmed")
 
         # Initialize MCP client
-        self.mcp_client = MultiServerMCPClient(
-            {
-                "hybrid_search": {
-                    "transport": "streamable_http",
-                    "url": "http://localhost:8000/mcp"
-                }
-            }
-        )
+        self.mcp_client = mcp_client or MultiServerMCPClient(MCP_SERVERS)
 
         # Build workflow
         self.workflow = self._build_workflow()
         self.app = self.workflow.compile(checkpointer=self.checkpointer)
 
-        # Load MCP tools asynchronously
-        asyncio.run(self._safe_async_init())
+        # Load MCP tools asynchronously (skipped when a shared tool set is injected)
+        if mcp_tools is not None:
+            self.mcp_tools = mcp_tools
+        else:
+            asyncio.run(self._safe_async_init())
 
     async def async_init(self):
         """Load MCP tools asynchronously."""
@@ -56,8 +128,12 @@ class AgenticRAG:
             print(f"Warning: Failed to load MCP tools — {e}")
             self.mcp_tools = []
 
+    def is_healthy(self) -> bool:
+        """An instance is usable only if MCP tool discovery succeeded and no tool call has failed since."""
+        return bool(self.mcp_tools) and not self.tool_errors
+
     # ---------- Nodes ----------
-    def _ai_assistant(self, state: AgentState):
+    async def _ai_assistant(self, state: AgentState):
         print("--- CALL ASSISTANT ---")
         messages = state["messages"]
         last_message = messages[-1].content
@@ -69,7 +145,7 @@ class AgenticRAG:
                 "You are a helpful assistant. Answer the user directly.\n\nQuestion: {question}\nAnswer:"
             )
             chain = prompt | self.llm | StrOutputParser()
-            response = chain.invoke({"question": last_message}) or "I'm not sure about that."
+            response = await chain.ainvoke({"question": last_message}) or "I'm not sure about that."
             return {"messages": [HumanMessage(content=response)]}
 
     async def _vector_retriever(self, state: AgentState):
@@ -80,38 +156,69 @@ class AgenticRAG:
         if not tool:
             return {"messages": [HumanMessage(content="Retriever tool not found in MCP client.")]}
 
+        scores = None  # unknown: the grader LLM decides
         try:
-            result = await tool.ainvoke({"query": query})
+            result = await tool.ainvoke({"query": query, "with_scores": True})
+            try:
+                payload = json.loads(result)
+                result, scores = payload["context"], payload["scores"]
+            except (TypeError, ValueError, KeyError):
+                pass
             context = result or "No relevant product data found."
         except Exception as e:
+            self.tool_errors += 1
             context = f"Error invoking retriever: {e}"
 
-        return {"messages": [HumanMessage(content=context)]}
+        return {"messages": [HumanMessage(content=context)], "retrieval_scores": scores}
 
     async def _web_search(self, state: AgentState):
         print("--- WEB SEARCH (MCP) ---")
         query = state["messages"][-1].content
-        tool = next(t for t in self.mcp_tools if t.name == "web_search")
-        result = await tool.ainvoke({"query": query})  # ✅
+        try:
+            tool = next(t for t in self.mcp_tools if t.name == "web_search")
+            result = await tool.ainvoke({"query": query})  # ✅
+        except Exception:
+            self.tool_errors += 1
+            raise
         context = result if result else "No data from web"
         return {"messages": [HumanMessage(content=context)]}
 
 
-    def _grade_documents(self, state: AgentState) -> Literal["generator", "rewriter"]:
+    async def _grade_documents(self, state: AgentState) -> Literal["generator", "rewriter"]:
         print("--- GRADER ---")
         question = state["messages"][0].content
         docs = state["messages"][-1].content
 
+        # Fast path: confident retrieval scores skip the LLM grader entirely
+        scores = state.get("retrieval_scores")
+        if scores == []:
+            # The retriever answered but found nothing above its threshold
+            GRADE_PATHS["fast_rewriter"] += 1
+            print("Grader fast path: rewriter (nothing retrieved)")
+            return "rewriter"
+        if scores:
+            best = max(scores)
+            if best >= self.grade_high:
+                GRADE_PATHS["fast_generator"] += 1
+                print(f"Grader fast path: generator (score={best:.3f})")
+                return "generator"
+            if best < self.grade_low:
+                GRADE_PATHS["fast_rewriter"] += 1
+                print(f"Grader fast path: rewriter (score={best:.3f})")
+                return "rewriter"
+
         prompt = PromptTemplate(
             template="""You are a grader. Question: {question}\nDocs: {docs}\n
             Are docs relevant to the question? Answer yes or no.""",
             input_variables=["question", "docs"],
         )
         chain = prompt | self.llm | StrOutputParser()
-        score = chain.invoke({"question": question, "docs": docs}) or ""
-        return "generator" if "yes" in score.lower() else "rewriter"
+        score = await chain.ainvoke({"question": question, "docs": docs}) or ""
+        route = "generator" if "yes" in score.lower() else "rewriter"
+        GRADE_PATHS[f"llm_{route}"] += 1
+        return route
 
-    def _generate(self, state: AgentState):
+    async def _generate(self, state: AgentState):
         print("--- GENERATE ---")
         question = state["messages"][0].content
         docs = state["messages"][-1].content
@@ -121,14 +228,30 @@ class AgenticRAG:
         )
         chain = prompt | self.llm | StrOutputParser()
 
+        # Best review sentences for this question first, within the token budget; with
+        # holdout_every set, a share of generations keeps the full context as the latency baseline
+        GENERATION_STATS["generations"] += 1
+        full = bool(self.holdout_every) and GENERATION_STATS["generations"] % self.holdout_every == 0
+        context, stats = assemble_context(question, docs, 0 if full else self.context_budget)
+        arm = "full" if full else "assembled"
+        started = time.perf_counter()
         try:
-            response = chain.invoke({"context": docs, "question": question}) or "No response generated."
+            response = await chain.ainvoke({"context": context, "question": question}) or "No response generated."
         except Exception as e:
             response = f"Error generating response: {e}"
+        elapsed = time.perf_counter() - started
+
+        GENERATION_STATS[f"{arm}_generations"] += 1
+        GENERATION_STATS[f"{arm}_tokens_before"] += stats["tokens_before"]
+        GENERATION_STATS[f"{arm}_tokens_after"] += stats["tokens_after"]
+        GENERATION_STATS[f"{arm}_generation_ms"] += round(elapsed * 1000)
+        saved = 1 - stats["tokens_after"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        print(f"Context ({arm}): {stats['tokens_before']} -> {stats['tokens_after']} tokens (-{saved:.0%}), "
+              f"generation {elapsed:.2f}s")
 
         return {"messages": [HumanMessage(content=response)]}
 
-    def _rewrite(self, state: AgentState):
+    async def _rewrite(self, state: AgentState):
         print("--- REWRITE ---")
         question = state["messages"][0].content
 
@@ -139,7 +262,7 @@ class AgenticRAG:
         chain = prompt | self.llm | StrOutputParser()
 
         try:
-            new_q = chain.invoke({"question": question}).strip()
+            new_q = (await chain.ainvoke({"question": question})).strip()
         except Exception as e:
             new_q = f"Error rewriting query: {e}"
 
@@ -172,17 +295,68 @@ class AgenticRAG:
 
         return workflow
 
+    # ---------- Answer Cache ----------
+    async def _cache_lookup(self, query: str):
+        if self.answer_cache is None:
+            return None, None
+        try:
+            return await self.answer_cache.alookup(query)
+        except Exception as e:
+            print(f"Warning: answer cache lookup failed — {e}")
+            return None, None
+
+    def _cache_store(self, query: str, vector, answer: str):
+        if self.answer_cache is None or vector is None or answer.startswith("Error"):
+            return
+        self.answer_cache.put(query, vector, answer)
+
     # ---------- Public Run ----------
     async def run(self, query: str, thread_id: str = "default_thread") -> str:
         """Run the workflow for a given query and return the final answer."""
+        cached, vector = await self._cache_lookup(query)
+        if cached is not None:
+            return cached
+
         result = await self.app.ainvoke(
             {"messages": [HumanMessage(content=query)]},
             config={"configurable": {"thread_id": thread_id}}
         )
-        return result["messages"][-1].content
+        answer = result["messages"][-1].content
+        self._cache_store(query, vector, answer)
+        return answer
+
+    async def astream(self, query: str, thread_id: str = "default_thread"):
+        """
+        Run the workflow and yield events as they happen:
+        {"type": "node"} when a step starts, {"type": "token"} for every
+        Generator token and a final {"type": "done"} with the full answer.
+        """
+        cached, vector = await self._cache_lookup(query)
+        if cached is not None:
+            yield {"type": "done", "answer": cached, "cached": True}
+            return
+
+        config = {"configurable": {"thread_id": thread_id}}
+        async for event in self.app.astream_events(
+            {"messages": [HumanMessage(content=query)]}, config=config, version="v2"
+        ):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chain_start" and event["name"] in PROGRESS_STEPS:
+                yield {"type": "node", "node": PROGRESS_STEPS[event["name"]]}
+            elif kind == "on_chat_model_stream" and node == "Generator":
+                token = event["data"]["chunk"].content
+                if isinstance(token, str) and token:
+                    yield {"type": "token", "content": token}
+
+        state = await self.app.aget_state(config)
+        answer = state.values["messages"][-1].content
+        self._cache_store(query, vector, answer)
+        yield {"type": "done", "answer": answer}
 
 # ---------- Standalone Test ----------
 if __name__ == "__main__":
     rag_agent = AgenticRAG()
-    answer = rag_agent.run("What is the price of iPhone 16?")
+    answer = asyncio.run(rag_agent.run("What is the price of iPhone 16?"))
     print("\nFinal Answer:\n", answer)
\ No newline at end of file
@@ -2,34 +2,16 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
-from prompt_library.prompts import PROMPT_REGISTRY, PromptType
+from prompts_library.prompts import PROMPT_REGISTRY, PromptType
 from retriever.retrieval import Retriever
 from utils.model_loader import ModelLoader
-from evaluation.ragas_eval import evaluate_context_precision, evaluate_response_relevancy
+from utils.product_record import format_docs
+from evaluation.ragas_evaluation import evaluate_context_precision, evaluate_response_relevancy
 
 retriever_obj = Retriever()
 model_loader = ModelLoader()
 
 
-def format_docs(docs) -> str:
-    """Format retrieved documents into a structured text block for the prompt."""
-    if not docs:
-        return "No relevant documents found."
-
-    formatted_chunks = []
-    for d in docs:
-        meta = d.metadata or {}
-        formatted = (
-            f"Title: {meta.get('product_title', 'N/A')}\n"
-            f"Price: {meta.get('price', 'N/A')}\n"
-            f"Rating: {meta.get('rating', 'N/A')}\n"
-            f"Reviews:\n{d.page_content.strip()}"
-        )
-        formatted_chunks.append(formatted)
-
-    return "\n\n---\n\n".join(formatted_chunks)
-
-
 def build_chain(query):
     """Build the RAG pipeline chain with retriever, prompt, LLM, and parser."""
     retriever = retriever_obj.load_retriever()
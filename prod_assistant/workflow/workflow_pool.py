@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from retriever.retrieval import Retriever
+from utils.model_loader import ModelLoader
+from utils.semantic_cache import build_answer_cache
+from workflow.agentic_workflow_with_mcp_websearch import AgenticRAG, GRADE_PATHS, MCP_SERVERS, generation_report
+
+
+class WorkflowPool:
+    """
+    Warm pool of AgenticRAG instances created once at application startup.
+
+    All instances share one LLM fallback chain, one Retriever, one MCP
+    client/tool set and the semantic answer cache, so a request only pays for the graph run.
+    A graph run keeps its state under its own checkpoint thread, so instances are not
+    checked out: requests are spread round-robin and any number run concurrently.
+    An instance is rebuilt (with freshly discovered MCP tools) only when it fails its
+    health check, i.e. tool discovery or a tool call failed; other errors, including
+    cancelled requests, leave it in place.
+    """
+
+    def __init__(self, size: int = 2):
+        self.size = max(1, size)
+        self._agents: list[AgenticRAG] = []
+        self._next = 0
+        self._rebuild_lock = asyncio.Lock()
+        self.in_flight = 0
+        self.rebuilds = 0
+
+    # ---------- Lifecycle ----------
+    async def start(self):
+        """Build shared clients, discover MCP tools and warm every instance."""
+        self.model_loader = ModelLoader()
+        self.llm = self.model_loader.load_llm()
+        self.retriever_obj = Retriever()
+        self.mcp_client = MultiServerMCPClient(MCP_SERVERS)
+        self.mcp_tools = await self._load_tools()
+        self.answer_cache = build_answer_cache(self.model_loader)
+        self.warm()
+
+    def warm(self):
+        self._agents = [self._build() for _ in range(self.size)]
+        print(f"Workflow pool ready with {self.size} instances.")
+
+    async def close(self):
+        self._agents = []
+
+    async def _load_tools(self):
+        try:
+            tools = await self.mcp_client.get_tools()
+            print("MCP tools loaded successfully.")
+            return tools
+        except Exception as e:
+            print(f"Warning: Failed to load MCP tools — {e}")
+            return []
+
+    def _build(self) -> AgenticRAG:
+        return AgenticRAG(
+            llm=self.llm,
+            model_loader=self.model_loader,
+            retriever_obj=self.retriever_obj,
+            mcp_client=self.mcp_client,
+            mcp_tools=self.mcp_tools,
+            answer_cache=self.answer_cache,
+        )
+
+    async def _rebuild(self, slot: int, broken: AgenticRAG) -> AgenticRAG:
+        """Replace an unhealthy instance, re-discovering MCP tools; concurrent callers share one rebuild."""
+        async with self._rebuild_lock:
+            if self._agents[slot] is not broken:
+                return self._agents[slot]
+            if broken.tool_errors or not self.mcp_tools:
+                self.mcp_tools = await self._load_tools()
+            self._agents[slot] = self._build()
+            self.rebuilds += 1
+            return self._agents[slot]
+
+    # ---------- Usage ----------
+    @asynccontextmanager
+    async def acquire(self):
+        """The next instance round-robin, rebuilt first if it is unhealthy; never waits for another request."""
+        slot = self._next % len(self._agents)
+        self._next += 1
+        agent = self._agents[slot]
+        if not agent.is_healthy():
+            agent = await self._rebuild(slot, agent)
+        self.in_flight += 1
+        try:
+            yield agent
+        finally:
+            self.in_flight -= 1
+
+    async def run(self, query: str, thread_id: str | None = None) -> str:
+        """Run one query on a pooled instance with its own checkpoint thread."""
+        thread_id = thread_id or uuid.uuid4().hex
+        async with self.acquire() as agent:
+            try:
+                return await agent.run(query, thread_id=thread_id)
+            finally:
+                agent.checkpointer.delete_thread(thread_id)
+
+    async def astream(self, query: str, thread_id: str | None = None):
+        """Stream workflow events for one query from a pooled instance."""
+        thread_id = thread_id or uuid.uuid4().hex
+        async with self.acquire() as agent:
+            try:
+                async for event in agent.astream(query, thread_id=thread_id):
+                    yield event
+            finally:
+                agent.checkpointer.delete_thread(thread_id)
+
+    def status(self) -> dict:
+        return {
+            "size": self.size,
+            "in_flight": self.in_flight,
+            "healthy": sum(agent.is_healthy() for agent in self._agents),
+            "mcp_tools": [t.name for t in self.mcp_tools],
+            "rebuilds": self.rebuilds,
+            "grader_paths": dict(GRADE_PATHS),
+            "generation": generation_report(),
+            "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+        }
@@ -2,6 +2,7 @@
 import streamlit as st
 from prod_assistant.etl.data_ingestion import DataIngestion
 from prod_assistant.etl.data_scrapper import BooksToScrapeScraper
+from prod_assistant.etl.crawler import CatalogCrawler
 import os
 
 scraper = BooksToScrapeScraper()
@@ -22,6 +23,11 @@ selected_category = st.selectbox(
 )
 
 max_books = st.slider("How many books to scrape?", min_value=1, max_value=50, value=5)
+if selected_category == "All":
+    st.caption("With **All**, the limit applies per category.")
+    resume_crawl = st.checkbox("Resume an interrupted crawl", value=True)
+stream_to_db = st.checkbox("🧠 Store in Vector DB while scraping", value=False,
+                           help="Books are embedded and stored as they are scraped; no CSV is written.")
 
 if st.button("🚀 Start Scraping"):
     if not selected_category:
@@ -34,15 +40,43 @@ if st.button("🚀 Start Scraping"):
         def status_callback(msg, _):
             status_placeholder.info(msg)
             
+        if stream_to_db:
+            # Progress comes from the ingestion side: the scrape runs on a background thread
+            if selected_category == "All":
+                scraped = CatalogCrawler(scraper).iter_books(max_books_per_category=max_books, resume=resume_crawl)
+            else:
+                scraped = scraper.iter_category(selected_category, max_books=max_books)
+            books = []
+
+            def product_rows():
+                for book in scraped:
+                    books.append(book)
+                    yield scraper.to_product_row(book)
+
+            try:
+                DataIngestion(streaming=True, require_csv=False).ingest_stream(
+                    product_rows(), status_callback=lambda msg: status_placeholder.info(msg)
+                )
+                if books:
+                    st.session_state["scraped_data"] = books
+                    st.success(f"✅ Scraped and stored {len(books)} books!")
+                    st.dataframe(books)
+                else:
+                    st.error("❌ No books found or error occurred.")
+            except Exception as e:
+                st.error("❌ Ingestion failed!")
+                st.exception(e)
+            st.stop()
+
         if selected_category == "All":
-             # iterating all categories logic would go here, for now just show warning
-             st.warning("All categories scraping not fully implemented in UI demo. Please pick a specific category.")
-             books = []
+            crawler = CatalogCrawler(scraper)
+            books = crawler.crawl(max_books_per_category=max_books, resume=resume_crawl,
+                                  status_callback=status_callback)
         else:
             books = scraper.scrape_category(selected_category, max_books=max_books, status_callback=status_callback)
         
         if books:
-            scraper.save_to_csv(books, output_path)
+            scraper.save_to_csv(books, os.path.basename(output_path))
             st.session_state["scraped_data"] = books
             
             st.success(f"✅ Scraped {len(books)} books!")
@@ -54,9 +88,11 @@ if st.button("🚀 Start Scraping"):
 if "scraped_data" in st.session_state and st.button("🧠 Store in Vector DB (AstraDB)"):
     with st.spinner("📡 Initializing ingestion pipeline..."):
         try:
-            ingestion = DataIngestion()
+            ingestion = DataIngestion(streaming=True, require_csv=False)
             st.info("🚀 Running ingestion pipeline...")
-            ingestion.run_pipeline()
+            # Straight from the scraped records, without reading the CSV back
+            rows = (scraper.to_product_row(book) for book in st.session_state["scraped_data"])
+            ingestion.ingest_stream(rows)
             st.success("✅ Data successfully ingested to AstraDB!")
         except Exception as e:
             st.error("❌ Ingestion failed!")
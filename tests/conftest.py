@@ -0,0 +1,93 @@
+import hashlib
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BOOKS_SITE = os.path.join(os.path.dirname(__file__), "fixtures", "books_site")
+
+
+class SiteServer:
+    """
+    Local books.toscrape mirror serving tests/fixtures/books_site. Records every
+    request and the peak number in flight; ``failures[path]`` lists statuses to
+    answer with before the page is served. Pages carry an ETag (a hash of the
+    file) and Last-Modified, and matching conditional GETs get a 304.
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.failures: dict = {}
+        self.requests: list = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Handler, self, directory=BOOKS_SITE))
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_port}/"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def hits(self, path: str) -> list:
+        return [headers for p, headers in self.requests if p == path]
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    def __init__(self, server_state, *args, **kwargs):
+        self.site = server_state
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        site = self.site
+        with site._lock:
+            site.requests.append((self.path, dict(self.headers)))
+            site.in_flight += 1
+            site.peak = max(site.peak, site.in_flight)
+            pending = site.failures.get(self.path)
+            status = pending.pop(0) if pending else None
+        try:
+            time.sleep(site.delay)
+            if status is not None:
+                self.send_error(status)
+            elif self._etag() and self._etag() == self.headers.get("If-None-Match"):
+                self.send_response(304)
+                self.end_headers()
+            else:
+                super().do_GET()
+        finally:
+            with site._lock:
+                site.in_flight -= 1
+
+    def _etag(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            return '"' + hashlib.sha1(f.read()).hexdigest() + '"'
+
+    def end_headers(self):
+        etag = self._etag() if self.command == "GET" else None
+        if etag:
+            self.send_header("ETag", etag)
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site_server():
+    server = SiteServer().start()
+    yield server
+    server.stop()
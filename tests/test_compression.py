@@ -0,0 +1,73 @@
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from prod_assistant.retriever.compression import ScoredRetriever
+from prod_assistant.retriever.lexical import InvertedIndex
+from prod_assistant.retriever.local_store import LocalVectorStore
+
+
+def product(product_id, title, reviews):
+    return Document(page_content=reviews, metadata={"product_id": product_id, "product_title": title})
+
+
+def hits():
+    return [
+        (product("p1", "Samsung Galaxy S23", "Bright screen and a fast processor."), 0.90),
+        (product("p2", "Google Pixel 8", "The battery easily lasts two days."), 0.72),
+        (product("p3", "Pixel battery case", "Adds battery life to any Pixel."), 0.55),
+    ]
+
+
+def make_retriever(**kwargs):
+    return ScoredRetriever(vectorstore=LocalVectorStore(None, autopersist=False),
+                           embeddings=DeterministicFakeEmbedding(size=8), extract_filters=False, **kwargs)
+
+
+def test_hits_below_the_threshold_are_dropped():
+    docs = make_retriever(lexical_rerank=False)._compress("pixel battery", hits())
+
+    assert [d.metadata["product_id"] for d in docs] == ["p1", "p2"]
+    assert [d.metadata["relevance_score"] for d in docs] == [0.90, 0.72]
+    assert make_retriever()._compress("pixel battery", hits()[2:]) == []
+
+
+def test_bm25_rerank_blends_into_the_order_but_keeps_vector_scores():
+    # p2: 0.7 * 0.72 + 0.3 * 1.0 beats p1: 0.7 * 0.90 + 0.3 * 0.0
+    docs = make_retriever(lexical_weight=0.3)._compress("pixel battery", hits())
+    assert [d.metadata["product_id"] for d in docs] == ["p2", "p1"]
+    assert [d.metadata["relevance_score"] for d in docs] == [0.72, 0.90]
+
+    docs = make_retriever(lexical_weight=0.05)._compress("pixel battery", hits())
+    assert [d.metadata["product_id"] for d in docs] == ["p1", "p2"]
+
+
+def lexical_index(tmp_path):
+    path = str(tmp_path / "lexical.json")
+    InvertedIndex().add_documents([doc for doc, _ in hits()] + [
+        product("p4", "Google Pixel 8 Pro", "The zoom camera is the best part."),
+        product("p5", "OnePlus 12", "Charges very quickly."),
+    ]).save(path)
+    return path
+
+
+def test_fusion_ranks_products_found_by_both_searches_first(tmp_path):
+    retriever = make_retriever(lexical_rerank=False, lexical_index_path=lexical_index(tmp_path), k=3)
+    docs = retriever._compress("google pixel 8 pro", hits())
+
+    # p2 is in both rankings; p1 is only a vector hit, p4 only a lexical one
+    assert [d.metadata["product_id"] for d in docs][:1] == ["p2"]
+    assert {d.metadata["product_id"] for d in docs} == {"p1", "p2", "p4"}
+
+
+def test_lexical_only_hits_get_a_relevance_score(tmp_path):
+    retriever = make_retriever(lexical_rerank=False, lexical_index_path=lexical_index(tmp_path), k=4)
+
+    docs = retriever._compress("google pixel 8 pro", hits())
+    scores = {d.metadata["product_id"]: d.metadata["relevance_score"] for d in docs}
+    assert scores["p1"] == 0.90 and scores["p2"] == 0.72
+    # The weakest kept vector score, not the 0.55 the vector search gave p3
+    assert scores["p4"] == scores["p3"] == 0.72
+
+    # Nothing kept by the vector search: lexical hits sit at the threshold
+    docs = retriever._compress("google pixel 8 pro", [])
+    assert docs and all(d.metadata["relevance_score"] == retriever.score_threshold for d in docs)
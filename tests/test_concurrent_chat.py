@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+from utils.config_loader import load_config
+
+DELAY = 0.2  # per awaited call: one MCP retrieval and one LLM generation per chat
+N = 8
+
+
+class SlowChatModel(FakeListChatModel):
+    """Answers after an asyncio sleep, like a remote LLM awaited on the event loop."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(DELAY)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.responses[0]))])
+
+
+async def get_product_info(query: str, with_scores: bool = False) -> str:
+    await asyncio.sleep(DELAY)
+    context = "Title: Phone X\nPrice: ₹20,000\nRating: 4.5/5\nReviews:\nGreat battery."
+    return json.dumps({"context": context, "scores": [0.95]})
+
+
+async def web_search(query: str) -> str:
+    await asyncio.sleep(DELAY)
+    return "Title: Phone X\nPrice: ₹21,000"
+
+
+def mcp_tools(product_search=get_product_info, search=web_search):
+    return [StructuredTool.from_function(coroutine=product_search, name="get_product_info",
+                                         description="product search"),
+            StructuredTool.from_function(coroutine=search, name="web_search", description="web search")]
+
+
+class FakeMCPClient:
+    def __init__(self):
+        self.discoveries = 0
+
+    async def get_tools(self):
+        self.discoveries += 1
+        return mcp_tools()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # The app mounts static/ and templates/ relative to the working directory
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), os.pardir))
+    from workflow.workflow_pool import WorkflowPool
+
+    pool = WorkflowPool(size=1)  # one instance must still serve concurrent requests
+    pool.model_loader = SimpleNamespace(config={**load_config(), "answer_cache": {"enabled": False}})
+    pool.llm = SlowChatModel(responses=["Phone X fits your budget."])
+    pool.retriever_obj = object()
+    pool.mcp_client = FakeMCPClient()
+    pool.mcp_tools = mcp_tools()
+    pool.answer_cache = None
+    pool.warm()
+    return pool
+
+
+@pytest.fixture
+def app(pool):
+    from router.main import app
+
+    app.state.rag_pool = pool
+    return app
+
+
+async def _ask(client, i):
+    response = await client.post("/get", data={"msg": f"What is the price of phone {i}?"})
+    response.raise_for_status()
+    return response.json()
+
+
+def test_simultaneous_get_calls_overlap(app):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            await _ask(client, 0)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            answers = await asyncio.gather(*(_ask(client, i) for i in range(N)))
+            together = time.perf_counter() - start
+        return single, together, answers
+
+    single, together, answers = asyncio.run(main())
+    assert answers == ["Phone X fits your budget."] * N
+    assert single >= 2 * DELAY
+    # Sequential handling would take N * single; overlapping calls take about one
+    assert together < N * single / 3, (single, together)
+
+
+def test_cancelled_request_keeps_its_instance(pool):
+    async def main():
+        task = asyncio.create_task(pool.run("What is the price of phone 1?"))
+        await asyncio.sleep(DELAY / 2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await pool.run("What is the price of phone 2?")
+
+    agent = pool._agents[0]
+    assert asyncio.run(main()) == "Phone X fits your budget."
+    assert pool._agents[0] is agent
+    assert pool.rebuilds == 0
+    assert pool.status()["in_flight"] == 0
+
+
+def test_failed_tool_call_rebuilds_with_rediscovered_tools(pool):
+    async def broken(query: str, with_scores: bool = False) -> str:
+        raise ConnectionError("MCP server went away")
+
+    pool.mcp_tools = mcp_tools(broken)
+    pool.warm()
+    agent = pool._agents[0]
+
+    async def main():
+        await pool.run("What is the price of phone 1?")
+        assert not agent.is_healthy()
+        return await asyncio.gather(*(pool.run(f"What is the price of phone {i}?") for i in range(3)))
+
+    assert asyncio.run(main()) == ["Phone X fits your budget."] * 3
+    assert pool._agents[0] is not agent
+    assert pool.rebuilds == 1
+    assert pool.mcp_client.discoveries == 1
+
+
+def test_llm_errors_do_not_rebuild(pool):
+    class DownChatModel(SlowChatModel):
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise TimeoutError("LLM timed out")
+
+    agent = pool._agents[0]
+    agent.llm = DownChatModel(responses=[""])
+    with pytest.raises(TimeoutError):
+        asyncio.run(pool.run("hello"))
+    assert pool._agents[0] is agent
+    assert pool.rebuilds == 0
+
+
+def _frames(response):
+    return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+
+def test_stream_sends_tokens_then_the_answer(app):
+    response = TestClient(app).get("/stream", params={"msg": "What is the price of phone 1?"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = _frames(response)
+    steps = [f["node"] for f in frames if f["type"] == "node"]
+    assert steps[:3] == ["Assistant", "Retriever", "Grader"] and steps[-1] == "Generator"
+    tokens = [f["content"] for f in frames if f["type"] == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Phone X fits your budget."
+    assert frames[-1] == {"type": "done", "answer": "Phone X fits your budget."}
+
+
+def test_stream_reports_graph_errors(app, pool):
+    async def nothing_found(query: str, with_scores: bool = False) -> str:
+        return json.dumps({"context": "", "scores": []})
+
+    async def search_down(query: str) -> str:
+        raise ConnectionError("web search went away")
+
+    pool.mcp_tools = mcp_tools(nothing_found, search_down)
+    pool.warm()
+    response = TestClient(app).get("/stream", params={"msg": "What is the price of phone 1?"})
+
+    assert response.status_code == 200
+    frames = _frames(response)
+    assert "WebSearch" in [f.get("node") for f in frames]
+    assert not [f for f in frames if f["type"] in ("token", "done")]
+    assert frames[-1]["type"] == "error"
+    assert "web search went away" in frames[-1]["message"]
@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from prod_assistant.utils.context_assembly import BLOCK_SEPARATOR, assemble_context
+from prod_assistant.utils.context_cards import estimate_tokens, render_card
+from prod_assistant.utils.product_record import ProductRecord
+from utils.config_loader import load_config
+
+FILLER = [
+    "The box arrived on time and the packaging was neat.",
+    "Setup took a few minutes and the manual was clear enough.",
+    "The color looks exactly like the pictures on the listing.",
+    "Customer support answered my question within a day.",
+    "It feels solid in the hand and the buttons are well placed.",
+    "I bought it as a gift and my brother likes it.",
+]
+
+
+def retrieved_cards(k=4, card_tokens=200):
+    """What the retriever hands the generator: k pre-rendered cards of ``card_tokens`` each."""
+    cards = []
+    for i in range(k):
+        reviews = " ".join(FILLER * 3)
+        if i == 2:
+            reviews = "Battery life is excellent, easily two days of use. " + reviews
+        record = ProductRecord(product_id=f"p{i}", product_title=f"Phone {i}", rating="4.2/5",
+                               total_reviews="120", price=f"₹{15000 + i * 1000}", reviews=reviews)
+        cards.append(render_card(record, card_tokens))
+    return BLOCK_SEPARATOR.join(cards)
+
+
+def test_default_budget_trims_retrieved_cards():
+    context = retrieved_cards()
+    text, stats = assemble_context("phone with good battery life", context)
+
+    assert stats["tokens_before"] > 700
+    assert stats["tokens_after"] <= 400 < stats["tokens_before"]
+    assert stats["sentences_kept"] < stats["sentences_total"]
+    # Every product keeps its header; the matching product and sentence come first
+    assert [line for line in text.splitlines() if line.startswith("Title:")][0] == "Title: Phone 2"
+    assert all(f"Title: Phone {i}" in text for i in range(4))
+    assert "Battery life is excellent" in text
+
+
+def test_web_search_context_is_trimmed_too():
+    snippets = " ".join(f"Result {i}: the best budget phones of 2024 ranked by battery and camera. "
+                        f"{' '.join(FILLER)}" for i in range(8))
+    text, stats = assemble_context("best budget phone battery", snippets, max_tokens=200)
+    assert stats["tokens_before"] > 600
+    assert estimate_tokens(text) <= 200
+
+
+def test_small_contexts_pass_through_unchanged():
+    context = retrieved_cards(k=2, card_tokens=100)
+    assert assemble_context("battery", context) == (context, {
+        "tokens_before": estimate_tokens(context), "tokens_after": estimate_tokens(context),
+        "sentences_total": 0, "sentences_kept": 0,
+    })
+
+
+def make_agent(workflow, **assembly):
+    config = {**load_config(), "answer_cache": {"enabled": False}}
+    config["context_assembly"] = {**config["context_assembly"], **assembly}
+    return workflow.AgenticRAG(
+        llm=FakeListChatModel(responses=["Phone 2 has the best battery."]),
+        model_loader=SimpleNamespace(config=config),
+        retriever_obj=object(), mcp_client=object(), mcp_tools=[],
+    )
+
+
+@pytest.fixture
+def workflow(monkeypatch):
+    from workflow import agentic_workflow_with_mcp_websearch as workflow
+
+    monkeypatch.setattr(workflow, "GENERATION_STATS", workflow.Counter())
+    return workflow
+
+
+def generate(rag, n):
+    state = {"messages": [HumanMessage(content="phone with good battery life"),
+                          HumanMessage(content=retrieved_cards())]}
+
+    async def main():
+        for _ in range(n):
+            await rag._generate(state)
+
+    asyncio.run(main())
+
+
+def test_default_config_trims_every_generation(workflow):
+    generate(make_agent(workflow), 40)
+    report = workflow.generation_report()
+
+    assert report["assembled"]["generations"] == 40
+    assert report["full"]["generations"] == 0
+
+
+def test_holdout_generations_report_the_full_context_baseline(workflow):
+    generate(make_agent(workflow, max_tokens=400, holdout_every=4), 8)
+    report = workflow.generation_report()
+
+    assert report["assembled"]["generations"] == 6
+    assert report["full"]["generations"] == 2
+    assert report["assembled"]["avg_context_tokens"] <= 400
+    assert report["full"]["avg_context_tokens"] == report["full"]["avg_context_tokens_before"] > 700
+    assert report["assembled"]["avg_generation_ms"] is not None
@@ -0,0 +1,70 @@
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from prod_assistant.utils.embedding_cache import CachedEmbeddings
+
+DIM = 3072
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return super().embed_documents(texts)
+
+
+def test_memory_tier_holds_float32_arrays():
+    underlying = CountingEmbeddings(size=DIM)
+    cache = CachedEmbeddings(underlying, "fake", max_memory_entries=2)
+    texts = ["budget iphone", "gaming laptop", "wireless earbuds"]
+
+    vectors = cache.embed_documents(texts)
+    assert all(isinstance(v, list) and len(v) == DIM for v in vectors)
+    assert all(isinstance(v, np.ndarray) and v.dtype == np.float32 for v in cache._memory.values())
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["memory_bytes"] == 2 * DIM * 4
+
+    assert cache.embed_documents(texts[1:]) == vectors[1:]
+    assert underlying.calls == 1
+
+
+def test_disk_tier_round_trip(tmp_path):
+    underlying = CountingEmbeddings(size=DIM)
+    first = CachedEmbeddings(underlying, "fake", cache_dir=str(tmp_path))
+    expected = first.embed_documents(["budget iphone", "gaming laptop"])
+    query = first.embed_query("budget iphone")
+
+    # A second process sharing the directory reads the vectors back from disk
+    second = CachedEmbeddings(underlying, "fake", cache_dir=str(tmp_path))
+    assert second.embed_documents(["gaming laptop", "budget iphone"]) == expected[::-1]
+    assert second.embed_query("budget iphone") == query
+    assert second.stats()["disk_hits"] == 3
+    assert underlying.calls == 1
+    assert all(v.dtype == np.float32 for v in second._memory.values())
+
+
+def test_prime_skips_the_model():
+    underlying = CountingEmbeddings(size=8)
+    cache = CachedEmbeddings(underlying, "fake")
+    vectors = np.arange(16, dtype=np.float32).reshape(2, 8)
+    cache.prime(["a", "b"], vectors)
+    assert cache.embed_documents(["b", "a"]) == [vectors[1].tolist(), vectors[0].tolist()]
+    assert underlying.calls == 0
+
+
+def test_torn_append_does_not_shift_later_rows(tmp_path):
+    underlying = CountingEmbeddings(size=8)
+    cache = CachedEmbeddings(underlying, "fake", cache_dir=str(tmp_path))
+    first = cache.embed_documents(["budget iphone"])
+    # A crash mid-append: one row the index never recorded, then half a row
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.ones(8, dtype=np.float32).tobytes() + b"\0" * 14)
+
+    second = cache.embed_documents(["gaming laptop", "wireless earbuds"])
+
+    reader = CachedEmbeddings(underlying, "fake", cache_dir=str(tmp_path))
+    assert reader.embed_documents(["budget iphone", "gaming laptop", "wireless earbuds"]) == first + second
+    assert reader.stats()["disk_hits"] == 3
+    assert (tmp_path / "vectors.f32").stat().st_size == 3 * 8 * 4
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from utils.config_loader import load_config
+
+
+@pytest.fixture
+def grader(monkeypatch):
+    from workflow import agentic_workflow_with_mcp_websearch as workflow
+
+    monkeypatch.setattr(workflow, "GRADE_PATHS", workflow.Counter())
+    config = {**load_config(), "answer_cache": {"enabled": False},
+              "grader": {"high_threshold": 0.8, "low_threshold": 0.65}}
+    # Two replies, so ``llm.i`` counts the grader call instead of wrapping around to 0
+    llm = FakeListChatModel(responses=["yes", "no"])
+    rag = workflow.AgenticRAG(llm=llm, model_loader=SimpleNamespace(config=config),
+                              retriever_obj=object(), mcp_client=object(), mcp_tools=[])
+
+    def grade(scores):
+        state = {"messages": [HumanMessage(content="iphone under 50k"), HumanMessage(content="Title: iPhone 13")],
+                 "retrieval_scores": scores}
+        return asyncio.run(rag._grade_documents(state))
+
+    return workflow, llm, grade
+
+
+@pytest.mark.parametrize("scores, route, path", [
+    ([0.91, 0.7], "generator", "fast_generator"),
+    ([0.62, 0.61], "rewriter", "fast_rewriter"),
+    ([], "rewriter", "fast_rewriter"),
+])
+def test_confident_scores_skip_the_llm_grader(grader, scores, route, path):
+    workflow, llm, grade = grader
+
+    assert grade(scores) == route
+    assert workflow.GRADE_PATHS == {path: 1}
+    assert llm.i == 0
+
+
+@pytest.mark.parametrize("scores", [[0.7, 0.66], None])
+def test_uncertain_or_missing_scores_ask_the_llm(grader, scores):
+    workflow, llm, grade = grader
+
+    assert grade(scores) == "generator"
+    assert workflow.GRADE_PATHS == {"llm_generator": 1}
+    assert llm.i == 1
+
+
+def test_low_threshold_must_clear_the_retrieval_floor():
+    from workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+
+    config = {**load_config(), "answer_cache": {"enabled": False}, "grader": {"low_threshold": 0.5}}
+    with pytest.raises(ValueError, match="low_threshold"):
+        AgenticRAG(llm=FakeListChatModel(responses=["yes"]), model_loader=SimpleNamespace(config=config),
+                   retriever_obj=object(), mcp_client=object(), mcp_tools=[])
@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import BOOKS_SITE
+from prod_assistant.etl import parser_benchmark
+from prod_assistant.etl.data_scrapper import BooksToScrapeScraper
+from prod_assistant.etl.html_parsers import PARSER_BACKENDS, parse_html
+
+PAGES = parser_benchmark.load_pages(BOOKS_SITE)
+
+# Optional fields missing, entities and stray whitespace
+SPARSE_DETAIL = """<html><body><div class="product_main"><h1> Tea &amp; Biscuits </h1>
+<p class="price_color">£9.50</p></div>
+<table class="table table-striped"><tr><th>UPC</th><td> x1 </td></tr><tr><th>Number of reviews</th><td>3</td></tr></table>
+</body></html>"""
+
+
+def backend(name):
+    if name == "selectolax":
+        pytest.importorskip("selectolax")
+    return name
+
+
+def test_fixture_site_covers_every_page_kind():
+    kinds = [parser_benchmark.page_kind(html) for _, html in PAGES]
+    assert kinds.count("categories") == 1
+    assert kinds.count("listing") == 3
+    assert kinds.count("detail") == 6
+
+
+@pytest.mark.parametrize("name", PARSER_BACKENDS[1:])
+def test_backends_extract_identical_records(name):
+    reference = parser_benchmark._extract_all("html.parser", PAGES)
+    assert all(reference)
+    assert parser_benchmark._extract_all(backend(name), PAGES) == reference
+
+
+@pytest.mark.parametrize("name", PARSER_BACKENDS)
+def test_sparse_detail_page(name):
+    book = BooksToScrapeScraper.parse_book_detail(
+        parse_html(SPARSE_DETAIL, backend(name)), "https://books.toscrape.com/catalogue/tea_1/index.html"
+    )
+    assert (book["title"], book["price_numeric"], book["upc"], book["num_reviews"]) == ("Tea & Biscuits", 9.5, "x1", 3)
+    assert (book["rating"], book["availability"], book["description"], book["image_url"]) == (0, "Unknown", "", "")
+
+
+@pytest.mark.parametrize("name", PARSER_BACKENDS[1:])
+def test_crawls_match_across_backends(tmp_path, site_server, name):
+    def crawl(parser):
+        config = {"scraper": {"requests_per_second": None, "parser": parser, "http_cache": {"enabled": False},
+                              "category_cache_path": str(tmp_path / parser / "categories.json")}}
+        scraper = BooksToScrapeScraper(output_dir=str(tmp_path), base_url=site_server.base_url, config=config)
+        return [scraper.scrape_category(category, max_books=10) for category in ("Travel", "Poetry")]
+
+    reference = crawl("html.parser")
+    assert [len(books) for books in reference] == [5, 1]
+    assert crawl(backend(name)) == reference
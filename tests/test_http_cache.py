@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from prod_assistant.etl.data_scrapper import BooksToScrapeScraper
+from prod_assistant.etl.http_cache import HttpCache
+
+HIMALAYAS = "/catalogue/its-only-the-himalayas_981/index.html"
+
+
+def make_scraper(tmp_path, server, freshness_seconds=0):
+    config = {"scraper": {
+        "requests_per_second": None,
+        "category_cache_path": str(tmp_path / "categories.json"),
+        "http_cache": {"enabled": True, "dir": str(tmp_path / "http"), "freshness_seconds": freshness_seconds},
+    }}
+    return BooksToScrapeScraper(output_dir=str(tmp_path), base_url=server.base_url, config=config)
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_revalidation_serves_cached_body_on_304(tmp_path, site_server, concurrent):
+    first = make_scraper(tmp_path, site_server).scrape_category("Travel", max_books=10, concurrent=concurrent)
+    assert "If-None-Match" not in site_server.hits(HIMALAYAS)[0]
+    fetched = len(site_server.requests)
+
+    scraper = make_scraper(tmp_path, site_server)
+    again = scraper.scrape_category("Travel", max_books=10, concurrent=concurrent)
+
+    assert again == first
+    revalidation = site_server.hits(HIMALAYAS)[1]
+    assert revalidation["If-None-Match"].startswith('"')
+    assert "If-Modified-Since" in revalidation
+    # Every page came back 304 and its stored parse result was reused
+    stats = scraper.http_cache.stats()
+    assert stats["not_modified"] == len(site_server.requests) - fetched == 7
+    assert stats["changed"] == 0
+    assert stats["parse_skipped"] == 7
+
+
+def test_fresh_pages_are_not_requested(tmp_path, site_server):
+    make_scraper(tmp_path, site_server, freshness_seconds=3600).scrape_category("Travel", max_books=10)
+    fetched = len(site_server.requests)
+
+    scraper = make_scraper(tmp_path, site_server, freshness_seconds=3600)
+    assert len(scraper.scrape_category("Travel", max_books=10)) == 5
+    assert len(site_server.requests) == fetched
+    assert scraper.http_cache.stats()["fresh_hits"] == 7
+
+
+def _fill(cache_dir, urls, age_step=60):
+    cache = HttpCache(cache_dir)
+    for i, url in enumerate(urls):
+        cache.store(url, {"etag": f'"{i}"'}, f"<html>{i}</html>")
+        cache.set_parsed(url, "detail", {"n": i})
+        with cache._db:
+            # urls[0] is the most recently fetched
+            cache._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time() - i * age_step, url))
+    return cache
+
+
+def test_prune_drops_entries_past_max_age(tmp_path):
+    urls = [f"https://example.com/{i}" for i in range(5)]
+    _fill(str(tmp_path), urls)
+
+    cache = HttpCache(str(tmp_path), max_age_seconds=150)
+
+    assert cache.stats()["pruned"] == 2
+    assert [cache.lookup(url) is not None for url in urls] == [True, True, True, False, False]
+    assert cache.get_parsed(urls[2], "detail") == {"n": 2}
+    assert cache._db.execute("SELECT COUNT(*) FROM parsed").fetchone()[0] == 3
+
+
+def test_prune_keeps_the_newest_max_entries(tmp_path):
+    urls = [f"https://example.com/{i}" for i in range(5)]
+    _fill(str(tmp_path), urls)
+
+    cache = HttpCache(str(tmp_path), max_entries=2)
+
+    assert cache.pruned == 3
+    assert [cache.lookup(url) is not None for url in urls] == [True, True, False, False, False]
+    assert cache.get_parsed(urls[4], "detail") is None
@@ -0,0 +1,303 @@
+import csv
+import os
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from prod_assistant.etl import data_ingestion
+from prod_assistant.etl.data_ingestion import DataIngestion
+from prod_assistant.etl.embedding_snapshot import EmbeddingSnapshot
+from prod_assistant.etl.ingestion_state import IngestionState, document_id
+from prod_assistant.retriever.lexical import InvertedIndex
+from prod_assistant.retriever.local_store import LocalVectorStore
+
+ROWS = 40
+
+
+class FlakyEmbeddings(DeterministicFakeEmbedding):
+    """Fails (not retryably) once ``fail_after`` embed calls have succeeded."""
+    fail_after: int | None = None
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise RuntimeError("embedding service went away")
+        self.calls += 1
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    config = {
+        "astra_db": {"collection_name": "test"},
+        "vector_store": {"backend": "local", "local_path": str(tmp_path / "vector_index")},
+        "embedding_model": {"model_name": "fake"},
+        "ingestion": {
+            "state_path": str(tmp_path / "state.sqlite"),
+            "mode": "streaming",
+            "batch_size": 4,
+            "queue_size": 2,
+            "embedding": {"max_concurrency": 1, "max_retries": 0},
+            "dedup": {"enabled": False},
+            "snapshot": {"enabled": False},
+        },
+        "retriever": {"hybrid": {"enabled": True, "index_dir": str(tmp_path / "lexical")}},
+        "context_cards": {"enabled": False},
+    }
+    embeddings = FlakyEmbeddings(size=8)
+
+    class FakeModelLoader:
+        def __init__(self):
+            self.config = config
+
+        def load_embeddings(self):
+            return embeddings
+
+        def load_llm(self):
+            raise AssertionError("summaries are disabled")
+
+    monkeypatch.setattr(data_ingestion, "ModelLoader", FakeModelLoader)
+    monkeypatch.setattr(data_ingestion, "load_config", lambda: config)
+    monkeypatch.setattr(data_ingestion, "bump_catalog_version", lambda: None)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)
+
+    os.makedirs("data")
+    _write_csv(ROWS)
+    return config, embeddings
+
+
+def _write_csv(rows, reviews=None):
+    reviews = reviews or {}
+    with open(os.path.join("data", "product_reviews.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["product_id", "product_title", "rating", "total_reviews",
+                                               "price", "top_reviews"])
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow({"product_id": f"p{i}", "product_title": f"Product {i}", "rating": "4/5",
+                             "total_reviews": "10", "price": f"₹{1000 + i}",
+                             "top_reviews": reviews.get(i, f"Review number {i} says the product is fine.")})
+
+
+def _stored(config):
+    collection = config["astra_db"]["collection_name"]
+    store = LocalVectorStore(None, path=os.path.join(config["vector_store"]["local_path"], collection))
+    lexical = InvertedIndex.load(os.path.join(config["retriever"]["hybrid"]["index_dir"], f"{collection}.json"))
+    return len(store), len(lexical)
+
+
+@pytest.mark.parametrize("checkpoint_seconds", [0, 3600])
+def test_interrupted_stream_resumes_without_losing_rows(workspace, checkpoint_seconds):
+    config, embeddings = workspace
+    config["ingestion"]["checkpoint_seconds"] = checkpoint_seconds
+
+    embeddings.fail_after = 5  # dies after 5 of the 10 batches
+    with pytest.raises(RuntimeError):
+        DataIngestion().run_streaming(resume=True)
+
+    embeddings.fail_after = None
+    DataIngestion().run_streaming(resume=True)
+    assert _stored(config) == (ROWS, ROWS)
+
+    # A later run finds everything stored and unchanged
+    calls = embeddings.calls
+    DataIngestion().run_streaming(resume=True)
+    assert embeddings.calls == calls
+    assert _stored(config) == (ROWS, ROWS)
+
+
+def test_batch_ingestion_persists_the_local_store_once(workspace, monkeypatch):
+    config, embeddings = workspace
+    config["ingestion"]["mode"] = "batch"
+    config["ingestion"]["checkpoint_seconds"] = 3600
+    persists = []
+    persist = LocalVectorStore.persist
+    monkeypatch.setattr(LocalVectorStore, "persist", lambda self: (persists.append(len(self)), persist(self)))
+
+    ingestion = DataIngestion()
+    ingestion.store_in_vector_db(ingestion.transform_data())
+    assert persists == [ROWS]  # 10 batches, one write of the index
+    assert _stored(config) == (ROWS, ROWS)
+
+
+def test_streaming_looks_up_hashes_per_batch(workspace, monkeypatch):
+    config, embeddings = workspace
+    config["ingestion"]["prune_deleted"] = True
+    config["ingestion"]["dedup"] = {"enabled": True, "threshold": 0.95}
+    config["ingestion"]["snapshot"] = {"enabled": True, "dir": "snapshots"}
+
+    def load_everything(self):
+        raise AssertionError("streaming ingestion loaded every stored hash")
+
+    monkeypatch.setattr(IngestionState, "hashes", load_everything)
+    monkeypatch.setattr(EmbeddingSnapshot, "hashes", load_everything)
+
+    DataIngestion().run_streaming()
+    assert _stored(config) == (ROWS, ROWS)
+
+    # Five products disappear and one changes: one batch is embedded, the rest is pruned
+    _write_csv(ROWS - 5, reviews={0: "A brand new review that reads nothing like the old one."})
+    calls = embeddings.calls
+    DataIngestion().run_streaming()
+    assert embeddings.calls == calls + 1
+    assert _stored(config) == (ROWS - 5, ROWS - 5)
+    state = IngestionState(config["ingestion"]["state_path"], "local:test")
+    assert sorted(state.hashes_for(f"p{i}" for i in range(ROWS))) == sorted(f"p{i}" for i in range(ROWS - 5))
+    assert state._db.execute("SELECT COUNT(*) FROM run_products").fetchone() == (0,)
+
+
+def test_switching_from_batch_to_streaming_reembeds_nothing(workspace):
+    config, embeddings = workspace
+    config["ingestion"]["mode"] = "batch"
+    ingestion = DataIngestion()
+    ingestion.store_in_vector_db(ingestion.transform_data())
+
+    # pandas would read total_reviews as an int; the hashes must match the csv-module reader's
+    calls = embeddings.calls
+    config["ingestion"]["mode"] = "streaming"
+    DataIngestion().run_streaming()
+    assert embeddings.calls == calls
+    assert _stored(config) == (ROWS, ROWS)
+
+
+@pytest.fixture
+def snapshotted(workspace):
+    config, embeddings = workspace
+    config["ingestion"]["prune_deleted"] = True
+    config["ingestion"]["snapshot"] = {"enabled": True, "dir": "snapshots"}
+    DataIngestion().run_streaming()
+    # Restore into a fresh collection
+    config["astra_db"]["collection_name"] = "restored"
+    return config, embeddings
+
+
+def _load_snapshot(directory=None):
+    return DataIngestion(streaming=True, require_csv=False).load_from_snapshot(directory)
+
+
+def test_load_from_snapshot_embeds_nothing(snapshotted):
+    config, embeddings = snapshotted
+    calls = embeddings.calls
+
+    _, rows = _load_snapshot()
+
+    assert rows == ROWS
+    assert embeddings.calls == calls
+    assert _stored(config) == (ROWS, ROWS)
+    # The rebuilt ingestion state knows every product: a normal run afterwards embeds nothing either
+    DataIngestion().run_streaming()
+    assert embeddings.calls == calls
+
+
+def test_snapshot_of_another_embedding_model_is_not_used(snapshotted):
+    config, embeddings = snapshotted
+    config["embedding_model"]["model_name"] = "another-model"
+
+    # The default directory is per model, so the old snapshot is not even found...
+    with pytest.raises(FileNotFoundError):
+        _load_snapshot()
+    # ...and pointing at it explicitly is refused
+    with pytest.raises(ValueError, match="fake"):
+        _load_snapshot(os.path.join("snapshots", "fake"))
+
+
+def test_snapshot_loads_only_its_current_generation(snapshotted):
+    config, embeddings = snapshotted
+    _write_csv(ROWS - 5)
+    config["astra_db"]["collection_name"] = "test"
+    DataIngestion().run_streaming()
+    config["astra_db"]["collection_name"] = "restored"
+
+    snapshot = EmbeddingSnapshot(os.path.join("snapshots", "fake"), "fake")
+    snapshot.compact()
+    assert snapshot.generation == 1
+    # Leftovers of a compaction that died before switching meta.json are ignored
+    with open(os.path.join("snapshots", "fake", "records.2.jsonl"), "w", encoding="utf-8") as f:
+        f.write('{"product_id": "ghost", "doc_id": "x", "content": "", "metadata": {}, '
+                '"content_hash": "", "row": 0}\n')
+    with open(os.path.join("snapshots", "fake", "vectors.2.f32"), "wb") as f:
+        f.write(b"\0" * 32)
+
+    calls = embeddings.calls
+    _, rows = _load_snapshot()
+
+    assert rows == ROWS - 5
+    assert embeddings.calls == calls
+    assert _stored(config) == (ROWS - 5, ROWS - 5)
+
+
+DUPLICATE = ("Great sound and deep bass for the price. The battery lasts a whole week of commuting, "
+             "pairing with my laptop and phone is instant, and the ear cushions stay comfortable on long "
+             "flights. Call quality is average outdoors but fine indoors.")
+
+
+def _ingest(config, mode):
+    config["ingestion"]["mode"] = mode
+    ingestion = DataIngestion()
+    if mode == "batch":
+        ingestion.store_in_vector_db(ingestion.transform_data())
+    else:
+        ingestion.run_streaming()
+
+
+def _product(config, product_id):
+    store = LocalVectorStore(None, path=os.path.join(config["vector_store"]["local_path"], "test"))
+    docs = store.get_by_ids([document_id(product_id)])
+    return docs[0].metadata if docs else None
+
+
+@pytest.mark.parametrize("mode", ["batch", "streaming"])
+def test_near_duplicates_become_aliases_of_the_first_product(workspace, mode):
+    config, embeddings = workspace
+    config["ingestion"]["dedup"] = {"enabled": True, "threshold": 0.8}
+    # p3 and p30 land in different batches: streaming writes p3 before it meets p30
+    _write_csv(ROWS, reviews={3: DUPLICATE, 30: DUPLICATE})
+
+    _ingest(config, mode)
+    assert _stored(config) == (ROWS - 1, ROWS - 1)
+    assert _product(config, "p30") is None
+    canonical = _product(config, "p3")
+    assert canonical["aliases"] == ["p30"]
+    assert canonical["alias_titles"] == ["Product 30"]
+
+    # Both modes hash the canonical product alike, aliases included
+    calls = embeddings.calls
+    _ingest(config, "batch")
+    _ingest(config, "streaming")
+    assert embeddings.calls == calls
+
+    # p30 gets its own reviews: it is stored again and p3 loses the alias
+    _write_csv(ROWS, reviews={3: DUPLICATE})
+    _ingest(config, mode)
+    assert _stored(config) == (ROWS, ROWS)
+    assert "aliases" not in _product(config, "p3")
+    assert _product(config, "p30")["product_title"] == "Product 30"
+
+
+def test_partial_streams_keep_stored_aliases(workspace):
+    config, embeddings = workspace
+    config["ingestion"]["dedup"] = {"enabled": True, "threshold": 0.8}
+    _write_csv(ROWS, reviews={3: DUPLICATE, 30: DUPLICATE})
+    _ingest(config, "streaming")
+
+    calls = embeddings.calls
+    DataIngestion(streaming=True, require_csv=False).ingest_stream([
+        {"product_id": "p3", "product_title": "Product 3", "rating": "4/5", "total_reviews": "10",
+         "price": "₹1003", "top_reviews": DUPLICATE},
+    ])
+    assert embeddings.calls == calls
+    assert _product(config, "p3")["aliases"] == ["p30"]
+
+
+def test_snapshot_append_after_a_torn_write_stays_aligned(tmp_path):
+    snapshot = EmbeddingSnapshot(str(tmp_path / "snapshot"), "fake")
+    docs = [Document(page_content=f"reviews {i}", metadata={"product_id": f"p{i}"}) for i in range(3)]
+    snapshot.append(docs[:1], [[1.0] * 4], ["d0"], ["h0"])
+    with open(snapshot.vectors_path, "ab") as f:
+        f.write(b"\0" * 6)  # died half way through the next row
+    snapshot.append(docs[1:], [[2.0] * 4, [3.0] * 4], ["d1", "d2"], ["h1", "h2"])
+
+    (documents, vectors, ids, _), = snapshot.iter_batches()
+    assert ids == ["d0", "d1", "d2"]
+    assert vectors.tolist() == [[1.0] * 4, [2.0] * 4, [3.0] * 4]
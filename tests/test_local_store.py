@@ -0,0 +1,78 @@
+import numpy as np
+
+from prod_assistant.retriever.local_store import LocalVectorStore
+
+DIM = 8
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def _add(store, start, n, seed=0):
+    ids = [f"p{i}" for i in range(start, start + n)]
+    store.add_embeddings([f"text {i}" for i in ids], _vectors(n, seed),
+                         [{"product_id": i, "price_numeric": float(k)} for k, i in enumerate(ids, start)], ids)
+    return ids
+
+
+def test_batches_grow_capacity_geometrically():
+    store = LocalVectorStore(None, autopersist=False)
+    reallocations = 0
+    buffer = None
+    for batch in range(100):
+        _add(store, batch * 16, 16, seed=batch)
+        if store._buffer is not buffer:
+            reallocations += 1
+            buffer = store._buffer
+    assert len(store) == 1600
+    assert store._vectors.shape == (1600, DIM)
+    assert reallocations <= 6  # 64 -> 128 -> ... -> 2048
+
+
+def test_upsert_search_and_delete():
+    store = LocalVectorStore(None, autopersist=False)
+    _add(store, 0, 10)
+    target = _vectors(1, seed=99)[0]
+    store.add_embeddings(["replaced"], [target], [{"product_id": "p3", "price_numeric": 3.0}], ["p3"])
+    assert len(store) == 10
+
+    doc, score = store.similarity_search_with_score_by_vector(target.tolist(), k=1)[0]
+    assert (doc.id, doc.page_content) == ("p3", "replaced")
+    assert score > 0.999
+
+    hits = store.similarity_search_with_score_by_vector(target.tolist(), k=10,
+                                                       filter={"price_numeric": {"$lte": 2.0}})
+    assert {d.id for d, _ in hits} == {"p0", "p1", "p2"}
+
+    store.delete(["p3", "p5"])
+    assert len(store) == 8 and "p3" not in store._positions
+    _add(store, 10, 5, seed=1)
+    assert len(store) == 13
+    assert store.get_by_ids(["p12"])[0].page_content == "text p12"
+
+
+def test_persist_and_reload(tmp_path):
+    store = LocalVectorStore(None, path=str(tmp_path), autopersist=False)
+    _add(store, 0, 70)
+    store.persist()
+
+    loaded = LocalVectorStore(None, path=str(tmp_path))
+    assert len(loaded) == 70
+    np.testing.assert_allclose(loaded._vectors, store._vectors)
+
+    # The first write copies the read-only memory map into a writable buffer
+    _add(loaded, 65, 10, seed=3)
+    assert len(loaded) == 75
+    assert LocalVectorStore(None, path=str(tmp_path)).__len__() == 75
+
+
+def test_empty_batches_are_a_no_op(tmp_path):
+    store = LocalVectorStore(None, path=str(tmp_path / "store"))
+    assert store.add_embeddings([], [], [], []) == []
+    assert len(store) == 0 and store._buffer is None
+
+    _add(store, 0, 3)
+    assert store.add_embeddings([], []) == []
+    assert len(store) == 3
+    assert store._vectors.shape == (3, DIM)
@@ -0,0 +1,64 @@
+import pytest
+
+from prod_assistant.retriever.query_constraints import extract_constraints, parse_price, parse_rating
+
+
+@pytest.mark.parametrize("query, expected", [
+    # Module docstring example
+    ("budget iPhone under 1,00,000 INR with 4+ stars",
+     {"$and": [{"price_numeric": {"$lte": 100000.0}}, {"rating_numeric": {"$gte": 4.0}}]}),
+    ("phone under 20k", {"price_numeric": {"$lte": 20000.0}}),
+    ("laptops 50-60k", {"price_numeric": {"$gte": 50000.0, "$lte": 60000.0}}),
+    ("between 10k and 20k", {"price_numeric": {"$gte": 10000.0, "$lte": 20000.0}}),
+    ("around $300 headphones", {"price_numeric": {"$gte": 270.0, "$lte": 330.0}}),
+    ("max price 30000 phone", {"price_numeric": {"$lte": 30000.0}}),
+    ("max ₹500 earphones", {"price_numeric": {"$lte": 500.0}}),
+    ("iphone 15 pro max under 1.5 lakh", {"price_numeric": {"$lte": 150000.0}}),
+    ("phones under 50000 in india", {"price_numeric": {"$lte": 50000.0}}),
+    # A price word right before a small bare range makes it a price
+    ("earphones costing 50 to 80", {"price_numeric": {"$gte": 50.0, "$lte": 80.0}}),
+])
+def test_price_constraints(query, expected):
+    assert extract_constraints(query).to_filter() == expected
+
+
+@pytest.mark.parametrize("query", [
+    # _is_price docstring examples
+    "iphone 14 to 15",
+    "up to 2 years warranty",
+    # Specs and counts are not prices
+    "iphone 15 pro max 256gb",
+    "phone above 5000 mah battery",
+    "laptop with at least 512 gb ssd",
+    "oneplus 12 with over 100 reviews",
+    "minimum 8 gb ram",
+    "tv above 120 hz",
+    # A price word elsewhere in the query does not turn model numbers or counts into prices
+    "price of iphone 12 to 15",
+    "cheap phones with 2 to 3 cameras",
+])
+def test_specs_are_not_prices(query):
+    assert extract_constraints(query).to_filter() is None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("phone above 5000 mah battery under 20000", {"price_numeric": {"$lte": 20000.0}}),
+    ("phone 8gb ram 128 gb below 15k", {"price_numeric": {"$lte": 15000.0}}),
+    ("tv 55 inch under 40000", {"price_numeric": {"$lte": 40000.0}}),
+])
+def test_spec_does_not_hide_later_price(query, expected):
+    assert extract_constraints(query).to_filter() == expected
+
+
+def test_rating_floor():
+    constraints = extract_constraints("samsung 4.5 stars above 10000")
+    assert constraints.min_rating == 4.5
+    assert constraints.min_price == 10000.0
+
+
+def test_parse_catalog_values():
+    assert parse_price("₹1,29,999") == 129999.0
+    assert parse_price("Â£51.77") == 51.77
+    assert parse_price("N/A") is None
+    assert parse_rating("4.3 out of 5 stars") == 4.3
+    assert parse_rating("4/5") == 4.0
@@ -0,0 +1,92 @@
+import json
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from prod_assistant.etl.review_summaries import ReviewSummarizer
+
+REPLY = json.dumps({"summary": "Long battery life, average camera.",
+                    "pros": ["battery", " "], "cons": ["camera"]})
+LONG_REVIEWS = "Battery lasts two days. " * 30
+
+
+class RecordingLLM:
+    """Answers every prompt with ``reply`` and keeps the prompts it was sent."""
+
+    def __init__(self, reply=REPLY):
+        self.reply = reply
+        self.prompts = []
+
+    def invoke(self, text):
+        self.prompts.append(text)
+        return AIMessage(content=self.reply)
+
+
+def product(reviews=LONG_REVIEWS, product_id="p1"):
+    return Document(page_content=reviews, metadata={"product_id": product_id, "product_title": "Phone X"})
+
+
+def make_summarizer(tmp_path, llm, **kwargs):
+    return ReviewSummarizer(llm, str(tmp_path / "summaries.sqlite"), max_retries=0, **kwargs)
+
+
+def test_summary_is_written_into_metadata(tmp_path):
+    doc = product()
+    make_summarizer(tmp_path, RecordingLLM()).summarize([doc])
+
+    assert doc.metadata["review_summary"] == "Long battery life, average camera."
+    assert doc.metadata["review_pros"] == ["battery"]
+    assert doc.metadata["review_cons"] == ["camera"]
+    assert doc.page_content == LONG_REVIEWS
+
+
+def test_cached_summaries_cost_no_llm_call(tmp_path):
+    make_summarizer(tmp_path, RecordingLLM()).summarize([product()])
+
+    llm = RecordingLLM()
+    summarizer = make_summarizer(tmp_path, llm)
+    doc = product()
+    summarizer.summarize([doc])
+
+    assert llm.prompts == []
+    assert summarizer.stats() == {"generated": 0, "cached": 1, "failed": 0}
+    assert doc.metadata["review_summary"] == "Long battery life, average camera."
+
+
+def test_short_reviews_pass_through(tmp_path):
+    llm = RecordingLLM()
+    doc = product(reviews="Good phone.")
+    make_summarizer(tmp_path, llm, min_review_chars=400).summarize([doc])
+
+    assert llm.prompts == []
+    assert "review_summary" not in doc.metadata
+
+
+def test_long_reviews_are_truncated_in_the_prompt(tmp_path):
+    llm = RecordingLLM()
+    reviews = "Fine phone. " * 50 + "LAST REVIEW"
+    make_summarizer(tmp_path, llm, max_review_chars=500).summarize([product(reviews=reviews)])
+
+    assert reviews[:500] in llm.prompts[0]
+    assert "LAST REVIEW" not in llm.prompts[0]
+
+
+def test_malformed_reply_becomes_the_summary(tmp_path):
+    doc = product()
+    make_summarizer(tmp_path, RecordingLLM(reply="Mostly positive, some heating.")).summarize([doc])
+
+    assert doc.metadata["review_summary"] == "Mostly positive, some heating."
+    assert doc.metadata["review_pros"] == doc.metadata["review_cons"] == []
+
+
+def test_failed_calls_keep_the_raw_reviews(tmp_path):
+    class BrokenLLM:
+        def invoke(self, text):
+            raise ValueError("bad request")
+
+    doc = product()
+    summarizer = make_summarizer(tmp_path, BrokenLLM())
+    summarizer.summarize([doc])
+
+    assert summarizer.stats()["failed"] == 1
+    assert "review_summary" not in doc.metadata
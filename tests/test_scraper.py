@@ -0,0 +1,98 @@
+import pytest
+
+from prod_assistant.etl.crawler import CatalogCrawler
+from prod_assistant.etl.data_scrapper import BooksToScrapeScraper
+from prod_assistant.utils import rate_limit
+
+TRAVEL = [
+    ("It's Only the Himalayas", 45.17, 2, 19, "a22124811bfa8350"),
+    ("Full Moon over Noah's Ark: An Odyssey to Mount Ararat and Beyond", 49.43, 4, 15, "ce60436f52c5ee68"),
+    ("See America: A Celebration of Our National Parks & Treasured Sites", 48.87, 3, 14, "f9705c362f070608"),
+    ("Vagabonding: An Uncommon Guide to the Art of Long-Term World Travel", 36.94, 2, 8, "1809259a5a5f1d8d"),
+    ("Under the Tuscan Sun", 37.33, 3, 7, "a94350ee74deaa07"),
+]
+HIMALAYAS = "/catalogue/its-only-the-himalayas_981/index.html"
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_backoff", lambda attempt, base_delay, max_delay: 0.01)
+
+
+def make_scraper(tmp_path, server, per_host_limit=2, parser="lxml"):
+    config = {"scraper": {
+        "concurrent": True,
+        "concurrency": 8,
+        "per_host_limit": per_host_limit,
+        "requests_per_second": None,
+        "max_retries": 3,
+        "category_cache_path": str(tmp_path / "categories.json"),
+        "parser": parser,
+        "http_cache": {"enabled": False},
+    }}
+    return BooksToScrapeScraper(output_dir=str(tmp_path), base_url=server.base_url, config=config)
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_scrapes_category_products(tmp_path, site_server, concurrent):
+    scraper = make_scraper(tmp_path, site_server)
+    assert [c["name"] for c in scraper.get_categories()] == ["Travel", "Poetry"]
+
+    books = scraper.scrape_category("Travel", max_books=10, concurrent=concurrent)
+
+    assert [(b["title"], b["price_numeric"], b["rating"], b["stock_count"], b["upc"]) for b in books] == TRAVEL
+    first = books[0]
+    assert first["category"] == "Travel"
+    assert first["availability"] == "In stock (19 available)"
+    assert first["detail_url"] == site_server.base_url + HIMALAYAS.lstrip("/")
+    assert first["image_url"] == site_server.base_url + "media/cache/a22124811bfa8350.jpg"
+    assert first["description"].startswith("Wherever you go")
+    # Two listing pages, chained by the pager's next link
+    assert len(site_server.hits("/catalogue/category/books/travel_2/page-2.html")) == 1
+
+
+def test_max_books_stops_paginating(tmp_path, site_server):
+    books = make_scraper(tmp_path, site_server).scrape_category("Travel", max_books=2)
+    assert [b["title"] for b in books] == [t[0] for t in TRAVEL[:2]]
+    assert not site_server.hits("/catalogue/category/books/travel_2/page-2.html")
+
+
+def test_requests_per_host_stay_within_limit(tmp_path, site_server):
+    site_server.delay = 0.2
+    books = make_scraper(tmp_path, site_server, per_host_limit=2).scrape_category("Travel", max_books=10)
+    assert len(books) == 5
+    assert site_server.peak == 2
+
+
+def test_retries_rate_limits_and_server_errors(tmp_path, site_server):
+    site_server.failures = {
+        HIMALAYAS: [429, 503],
+        "/catalogue/category/books/travel_2/page-2.html": [500],
+    }
+    books = make_scraper(tmp_path, site_server).scrape_category("Travel", max_books=10)
+
+    assert [b["title"] for b in books] == [t[0] for t in TRAVEL]
+    assert len(site_server.hits(HIMALAYAS)) == 3
+    assert len(site_server.hits("/catalogue/category/books/travel_2/page-2.html")) == 2
+
+
+def test_client_errors_are_not_retried(tmp_path, site_server):
+    site_server.failures = {HIMALAYAS: [404]}
+    books = make_scraper(tmp_path, site_server).scrape_category("Travel", max_books=10)
+
+    assert [b["title"] for b in books] == [t[0] for t in TRAVEL[1:]]
+    assert len(site_server.hits(HIMALAYAS)) == 1
+
+
+def test_crawl_fetches_the_category_index_asynchronously(tmp_path, site_server, monkeypatch):
+    scraper = make_scraper(tmp_path, site_server)
+
+    def blocking(*args, **kwargs):
+        raise AssertionError("blocking request inside the crawl's event loop")
+
+    monkeypatch.setattr(scraper, "get_categories", blocking)
+    monkeypatch.setattr(scraper, "load_page", blocking)
+
+    books = CatalogCrawler(scraper).crawl(categories=["Travel", "Poetry"], max_books_per_category=10)
+    assert len(books) == 6
+    assert {upc for *_, upc in TRAVEL} <= {book["upc"] for book in books}
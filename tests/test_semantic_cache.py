@@ -0,0 +1,55 @@
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+
+from prod_assistant.utils.semantic_cache import SemanticCache
+
+
+class SameVector(Embeddings):
+    """Every query embeds to the same vector, i.e. looks like a paraphrase of every other."""
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticCache(SameVector(), version_file=str(tmp_path / ".catalog_version"), **kwargs)
+
+
+def ask(cache, query, answer=None):
+    cached, vector = asyncio.run(cache.alookup(query))
+    if cached is None and answer is not None:
+        cache.put(query, vector, answer)
+    return cached
+
+
+def test_different_price_caps_do_not_share_answers(tmp_path):
+    cache = make_cache(tmp_path)
+    ask(cache, "iphone under 50k", "answer for 50k")
+
+    assert ask(cache, "iphone under 60k") is None
+    assert ask(cache, "best iphone under 50k") == "answer for 50k"
+    assert ask(cache, "iphone") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_unconstrained_paraphrases_still_hit(tmp_path):
+    cache = make_cache(tmp_path)
+    ask(cache, "good phone for gaming", "gaming phones")
+    ask(cache, "phone with 4+ stars", "rated phones")
+
+    assert ask(cache, "a gaming phone") == "gaming phones"
+    assert ask(cache, "any phone rated 4 stars or above") == "rated phones"
+    assert ask(cache, "GOOD phone   for gaming") == "gaming phones"
+
+
+def test_scope_survives_persistence(tmp_path):
+    path = str(tmp_path / "answers.sqlite")
+    ask(make_cache(tmp_path, persist_path=path), "laptop between 40000 and 60000", "mid-range laptops")
+
+    cache = make_cache(tmp_path, persist_path=path)
+    assert ask(cache, "laptop from 40k to 60k") == "mid-range laptops"
+    assert ask(cache, "laptop under 60000") is None
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from langchain_core.documents import Document
+
+from prod_assistant.etl.embedding_stage import EmbeddingStage
+from prod_assistant.etl.streaming_pipeline import StreamingPipeline
+from prod_assistant.utils import rate_limit
+from prod_assistant.utils.rate_limit import TokenBucket, retry_with_backoff
+
+
+def docs(n, start=0):
+    return [Document(page_content=f"doc {i}") for i in range(start, start + n)]
+
+
+def test_finished_batches_reach_the_writer_while_input_is_slow():
+    resume_input = threading.Event()
+    written_at = []
+
+    def slow_source():
+        yield from docs(4)
+        # A live scrape: the next rows take a while to arrive
+        resume_input.wait(timeout=5)
+        yield from docs(4, start=4)
+
+    def write(batch, embedded):
+        written_at.append(time.perf_counter())
+        resume_input.set()
+
+    pipeline = StreamingPipeline(lambda batch: len(batch), write, batch_size=4, max_concurrency=4)
+    started = time.perf_counter()
+    stats = pipeline.run(slow_source())
+
+    assert stats.rows == 8
+    # The first batch was written without waiting for more input (or for the 5 s timeout)
+    assert written_at[0] - started < 1.0
+    assert written_at[-1] - started < 2.0
+
+
+def test_batches_are_written_in_input_order():
+    delays = [0.2, 0.0, 0.1, 0.0, 0.05, 0.0]
+    written = []
+
+    def embed(batch):
+        index = int(batch[0].page_content.split()[1]) // 2
+        time.sleep(delays[index])
+        return index
+
+    pipeline = StreamingPipeline(embed, lambda batch, index: written.append(index), batch_size=2,
+                                 max_concurrency=3)
+    pipeline.run(docs(12))
+    assert written == list(range(6))
+
+
+def test_embed_errors_stop_the_pipeline():
+    def embed(batch):
+        raise RuntimeError("embedding service went away")
+
+    with pytest.raises(RuntimeError):
+        StreamingPipeline(embed, lambda batch, embedded: None, batch_size=2, max_concurrency=2).run(docs(10))
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(rate=1000)
+        self.taken = 0
+
+    def acquire(self, tokens: float = 1.0):
+        self.taken += 1
+        super().acquire(tokens)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_every_retry_takes_a_token(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_backoff", lambda attempt, base_delay, max_delay: 0)
+    failures = [RateLimited(), RateLimited()]
+
+    def call():
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    bucket = CountingBucket()
+    assert retry_with_backoff(call, max_retries=3, bucket=bucket) == "ok"
+    assert bucket.taken == 3
+
+
+def test_embedding_stage_retries_within_the_request_budget(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_backoff", lambda attempt, base_delay, max_delay: 0)
+
+    class FlakyEmbeddings:
+        calls = 0
+
+        def embed_documents(self, texts):
+            self.calls += 1
+            if self.calls == 1:
+                raise RateLimited()
+            return [[0.0] for _ in texts]
+
+    stage = EmbeddingStage(FlakyEmbeddings(), requests_per_minute=60_000)
+    stage.bucket = CountingBucket()
+    assert stage(docs(2)) == [[0.0], [0.0]]
+    assert stage.bucket.taken == 2